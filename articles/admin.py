@@ -7,9 +7,9 @@ from thinktanks.models import ThinkTank  # ← ThinkTank 在 thinktanks 应用
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
     list_display = ['title', 'url', 'publish_date', 'crawl_date', 'thinktank', 'is_processed']
-    list_filter = ['publish_date', 'crawl_date', 'thinktank']
+    list_filter = ['publish_date', 'crawl_date', 'thinktank', 'detail_status', 'detail_last_error']
     search_fields = ['title', 'author', 'content']
-    readonly_fields = ['crawl_date', 'view_count']
+    readonly_fields = ['crawl_date', 'view_count', 'detail_attempts', 'detail_last_attempt_at']
 
 @admin.register(ThinkTank)
 class ThinkTankAdmin(admin.ModelAdmin):
@@ -23,5 +23,7 @@ class DigestAdmin(admin.ModelAdmin):
 
 @admin.register(Attachment)
 class AttachmentAdmin(admin.ModelAdmin):
-    list_display = ['filename', 'article', 'file_type', 'download_status']
-    search_fields = ['filename', 'article__title']
\ No newline at end of file
+    list_display = ['filename', 'article', 'file_type', 'download_status', 'text_status', 'file_size', 'downloaded_at']
+    list_filter = ['file_type', 'download_status', 'download_error', 'text_status']
+    search_fields = ['filename', 'article__title', 'original_url', 'content_hash']
+    readonly_fields = ['created_at', 'downloaded_at', 'content_hash', 'text_pages', 'text_error', 'text_extracted_at']
\ No newline at end of file
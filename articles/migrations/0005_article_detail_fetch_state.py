@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+def mark_fetched_articles(apps, schema_editor):
+    """已有正文的文章标记为 done，其余（包括 content 为 NULL 的）保持 pending"""
+    Article = apps.get_model("articles", "Article")
+    Article.objects.exclude(content__isnull=True).exclude(content="").update(detail_status="done")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0004_alter_digest_article"),
+        ("thinktanks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="detail_attempts",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="detail_last_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="detail_last_error",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="detail_next_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="detail_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("retry", "Retry"),
+                    ("done", "Done"),
+                    ("dead", "Dead"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(mark_fetched_articles, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["detail_status", "-publish_date"],
+                name="articles_detail_queue_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0005_article_detail_fetch_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attachment",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="attachment",
+            name="download_error",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="attachment",
+            constraint=models.UniqueConstraint(
+                fields=("article", "original_url"), name="attachment_article_url_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0006_attachment_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attachment",
+            name="extracted_text",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="attachment",
+            name="text_error",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="attachment",
+            name="text_extracted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="attachment",
+            name="text_pages",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="attachment",
+            name="text_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("done", "Done"),
+                    ("failed", "Failed"),
+                    ("unsupported", "Unsupported"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attachment",
+            index=models.Index(
+                fields=["download_status", "text_status"],
+                name="attachment_text_queue_idx",
+            ),
+        ),
+    ]
@@ -8,6 +8,14 @@ class Article(models.Model):
         ('press_release', 'Press Release'),
     ]
 
+    # 详情页抓取状态，由 fetch_article_detail 维护
+    DETAIL_STATUS_CHOICES = [
+        ('pending', 'Pending'),   # 尚未抓取
+        ('retry', 'Retry'),       # 抓取失败，detail_next_attempt_at 之后重试
+        ('done', 'Done'),         # 已取得正文
+        ('dead', 'Dead'),         # 永久失败（404/410 或重试次数用尽），不再抓取
+    ]
+
     title = models.CharField(max_length=255)
     url = models.URLField(max_length=255, unique=True)
     content = models.TextField(blank=True, null=True)
@@ -20,6 +28,11 @@ class Article(models.Model):
     view_count = models.IntegerField(default=0)
     is_processed = models.BooleanField(default=False)
     thinktank = models.ForeignKey('thinktanks.ThinkTank', on_delete=models.CASCADE)
+    detail_status = models.CharField(max_length=20, choices=DETAIL_STATUS_CHOICES, default='pending')
+    detail_attempts = models.IntegerField(default=0)
+    detail_last_error = models.CharField(max_length=100, blank=True, null=True)  # 错误类别，如 HTTPError 404、Timeout
+    detail_last_attempt_at = models.DateTimeField(blank=True, null=True)
+    detail_next_attempt_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
         return self.title
@@ -44,6 +57,10 @@ class Article(models.Model):
 
     class Meta:
         db_table = 'articles'
+        indexes = [
+            # fetch_article_detail 按状态筛选、按发布日期从新到旧取待抓文章
+            models.Index(fields=['detail_status', '-publish_date'], name='articles_detail_queue_idx'),
+        ]
 
 
 
@@ -63,12 +80,28 @@ class Attachment(models.Model):
         ('failed', 'Failed'),
     ]
 
+    TEXT_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('unsupported', 'Unsupported'),
+    ]
+
     filename = models.CharField(max_length=255)
     original_url = models.URLField(max_length=500)
     local_path = models.CharField(max_length=500, blank=True, null=True)
     file_type = models.CharField(max_length=50, choices=FILE_TYPE_CHOICES)
     file_size = models.IntegerField(blank=True, null=True)  # 字节
     download_status = models.CharField(max_length=20, choices=DOWNLOAD_STATUS_CHOICES)
+    # 文件内容的 SHA-256，相同内容的附件共用一个文件（见 crawlers/utils/attachments.py）
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    download_error = models.CharField(max_length=100, blank=True, null=True)  # 错误类别，如 HTTPError 404、TooLarge
+    # 从附件中提取的文本（见 crawlers/utils/attachment_text.py），供搜索使用
+    extracted_text = models.TextField(blank=True, null=True)
+    text_status = models.CharField(max_length=20, choices=TEXT_STATUS_CHOICES, default='pending')
+    text_pages = models.IntegerField(blank=True, null=True)
+    text_error = models.CharField(max_length=100, blank=True, null=True)
+    text_extracted_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     downloaded_at = models.DateTimeField(blank=True, null=True)
     article = models.ForeignKey(Article, on_delete=models.CASCADE)
@@ -78,6 +111,13 @@ class Attachment(models.Model):
 
     class Meta:
         db_table = 'attachments'
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'original_url'], name='attachment_article_url_unique'),
+        ]
+        indexes = [
+            # extract_attachment_text 取已下载、未提取文本的附件
+            models.Index(fields=['download_status', 'text_status'], name='attachment_text_queue_idx'),
+        ]
 
 from django.contrib.auth.models import User
 
@@ -1,3 +1,26 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CrawlRun, LearnedSelector, PageSnapshot
+
+
+@admin.register(CrawlRun)
+class CrawlRunAdmin(admin.ModelAdmin):
+    list_display = ['task', 'started_at', 'status', 'pages', 'items', 'new_articles', 'duplicates', 'interval_hours']
+    list_filter = ['status', 'full']
+    search_fields = ['task__task_name']
+    raw_id_fields = ['task']
+
+
+@admin.register(LearnedSelector)
+class LearnedSelectorAdmin(admin.ModelAdmin):
+    list_display = ['host', 'field', 'selector', 'hits', 'misses', 'updated_at']
+    list_filter = ['field']
+    search_fields = ['host']
+
+
+@admin.register(PageSnapshot)
+class PageSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['url', 'kind', 'fetch_method', 'fetched_at', 'size_in_bytes', 'compressed_size', 'content_hash']
+    list_filter = ['kind', 'fetch_method', 'is_fragment']
+    search_fields = ['url', 'content_hash']
+    raw_id_fields = ['task', 'article']
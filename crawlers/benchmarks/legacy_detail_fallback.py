@@ -0,0 +1,20 @@
+"""
+改为文本密度提取前 generic_content_by_candidates 的兜底步骤：对每个 article/section/div 取一次完整文本，
+选文本最长的节点。每个节点的文本都要重新遍历其子树，耗时随嵌套深度成倍增长。
+
+仅作为 benchmark_crawler 的对比基线保留，爬虫本身使用 crawlers.utils.text_density。
+"""
+from crawlers.utils.detail_extractor import clean_text
+
+
+def largest_block_text(backend, doc) -> str:
+    backend.remove(doc, ['script', 'style', 'noscript'])
+    max_text = ''
+    max_len = 0
+    for node in backend.select(doc, 'article, section, div'):
+        text = backend.text(node, "\n").strip()
+        tlen = len(text)
+        if tlen > max_len:
+            max_len = tlen
+            max_text = text
+    return clean_text(max_text)
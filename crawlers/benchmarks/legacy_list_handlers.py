@@ -0,0 +1,354 @@
+"""
+重构前 crawl_thinktanks 中的 _crawl_handler1 ~ _crawl_handler7 实现（BeautifulSoup + html.parser）。
+
+仅作为 benchmark_crawler 的对比基线保留，爬虫本身使用 crawlers.utils.list_extractor。
+"""
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+
+class _SilentOutput:
+    def write(self, *args, **kwargs):
+        pass
+
+
+class LegacyListHandlers:
+    stdout = _SilentOutput()
+
+    def _crawl_handler1(self, task, html_content):
+        """处理handler1类型的网站（中国国际工程咨询有限公司）"""
+        items = []
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        
+        records = re.findall(r'<record><!\[CDATA\[(.*?)\]\]></record>', html_content, re.DOTALL)
+        self.stdout.write(f"  找到 {len(records)} 个 CDATA 记录")
+
+        if records:
+             # 如果找到了 CDATA，沿用之前的逻辑
+             for record_html in records:
+                try:
+                    # 解析每个record中的HTML内容
+                    record_soup = BeautifulSoup(record_html, 'html.parser')
+
+                    # 查找新闻列表容器 (根据 handler1 原逻辑)
+                    news_list = record_soup.select_one('div.news-list')
+                    if news_list is None:
+                        continue
+
+                    # 在每个新闻列表中查找内容 (根据 handler1 原逻辑)
+                    old_newscontent = news_list.select_one('div.newscontent')
+                    if old_newscontent is None:
+                        continue
+
+                    old_a = old_newscontent.select_one('a')
+                    if old_a is None:
+                        continue
+
+                    a_href = urljoin(task.start_url, old_a.get('href', ''))
+                    h3_element = old_a.select_one('h3')
+                    if h3_element is None:
+                        continue
+                    h3_text = h3_element.get_text(strip=True)
+
+                    # 查找日期信息 (根据 handler1 原逻辑)
+                    span_element = news_list.select_one('span.newsdate')
+                    span_text = span_element.get_text(strip=True) if span_element else ''
+
+                    # 获取摘要信息 (根据 handler1 原逻辑)
+                    summary_element = old_newscontent.select_one('p.newsinfo')
+                    summary_text = summary_element.get_text(strip=True)[:300] if summary_element else ''
+
+                    item = {
+                        'title': h3_text,
+                        'url': a_href,
+                        'publish_date_str': span_text,
+                        'content_type': task.task_name,
+                        'summary': summary_text,
+                        'author': '',
+                        'tags': f"{task.thinktank.name},{task.task_name}"
+                    }
+                    items.append(item)
+                except Exception as e:
+                    self.stdout.write(f"  解析单个 CDATA 记录失败: {e}")
+                    continue
+        else:
+            
+            self.stdout.write("  未找到 CDATA 记录，尝试直接解析 HTML...")
+            
+            container = soup.select_one('div.default_pgContainer')
+            if container:
+                 
+                 news_contents = container.select('div.newscontent')
+                 self.stdout.write(f"  在 default_pgContainer 中找到 {len(news_contents)} 个 newscontent 元素")
+                 for newscontent in news_contents:
+                     try:
+                         old_a = newscontent.select_one('a')
+                         if old_a is None:
+                             continue
+
+                         a_href = urljoin(task.start_url, old_a.get('href', ''))
+                         # 尝试获取标题，可能在 h3 或 a 标签文本中
+                         h3_element = old_a.select_one('h3')
+                         if h3_element:
+                             h3_text = h3_element.get_text(strip=True)
+                         else:
+                             h3_text = old_a.get_text(strip=True) # 备选方案
+
+                         if not h3_text:
+                             continue
+
+                         # 查找日期信息，可能在同级或父级元素中
+                         # 根据网页示例，日期紧跟在标题后面，可能是纯文本或在 span 中
+                         # 这里简化处理，尝试从父元素或附近查找
+                         span_element = newscontent.select_one('span.newsdate') # 如果存在
+                         span_text = span_element.get_text(strip=True) if span_element else ''
+
+                         # 获取摘要信息
+                         summary_element = newscontent.select_one('p.newsinfo') # 如果存在
+                         summary_text = summary_element.get_text(strip=True)[:300] if summary_element else ''
+
+                         item = {
+                             'title': h3_text,
+                             'url': a_href,
+                             'publish_date_str': span_text,
+                             'content_type': task.task_name,
+                             'summary': summary_text,
+                             'author': '',
+                             'tags': f"{task.thinktank.name},{task.task_name}"
+                         }
+                         items.append(item)
+                     except Exception as e:
+                         self.stdout.write(f"  直接解析 HTML 时单个条目失败: {e}")
+                         continue
+            else:
+                 self.stdout.write("  未找到 default_pgContainer 容器")
+
+        return items
+
+    def _crawl_handler2(self, task, html_content):
+        """处理handler2类型的网站（中国人民大学国家发展与战略研究院）"""
+        items = []
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        for old_briefItem in soup.select('div.briefItem'):
+            try:
+                old_a = old_briefItem.select_one('a')
+                if old_a is None:
+                    continue
+
+                a_href = urljoin(task.start_url, old_a.get('href', ''))
+                h3_element = old_a.select_one('h3')
+                if h3_element is None:
+                    continue
+                h3_text = h3_element.get_text(strip=True)
+
+                span_element = old_a.select_one('span')
+                span_text = span_element.get_text(strip=True) if span_element else ''
+
+                item = {
+                    'title': h3_text,
+                    'url': a_href,
+                    'publish_date_str': span_text,
+                    'content_type': task.task_name,
+                    'summary': '',
+                    'author': '',
+                    'tags': f"{task.thinktank.name},{task.task_name}"
+                }
+                items.append(item)
+            except Exception as e:
+                self.stdout.write(f"  解析单个简报项失败: {e}")
+                continue
+        return items
+
+    def _crawl_handler3(self, task, html_content):
+        """处理handler3类型的网站（国务院发展研究中心）"""
+        items = []
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        for re_box in soup.select('div.re_box'):
+            try:
+                old_a = re_box.select_one('a')
+                if old_a is None:
+                    continue
+
+                a_href = urljoin(task.start_url, old_a.get('href', ''))
+                h3_text = old_a.get('title', '')
+                if not h3_text:
+                    h3_text = old_a.get_text(strip=True)
+
+                span_element = re_box.select_one('span')
+                span_text = span_element.get_text(strip=True) if span_element else ''
+
+                item = {
+                    'title': h3_text,
+                    'url': a_href,
+                    'publish_date_str': span_text,
+                    'content_type': task.task_name,
+                    'summary': '',
+                    'author': '',
+                    'tags': f"{task.thinktank.name},{task.task_name}"
+                }
+                items.append(item)
+            except Exception as e:
+                self.stdout.write(f"  解析单个结果项失败: {e}")
+                continue
+        return items
+
+    def _crawl_handler4(self, task, html_content):
+        """处理handler4类型的网站（中国科学院）"""
+        items = []
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        gl_list2 = soup.select_one('ul.gl_list2')
+        if gl_list2 is None:
+            return items
+
+        for old_li in gl_list2.select('li'):
+            try:
+                old_a = old_li.select_one('a')
+                if old_a is None:
+                    continue
+
+                a_href = urljoin(task.start_url, old_a.get('href', ''))
+                h3_text = old_a.get('title', '')
+                if not h3_text:
+                    h3_text = old_a.get_text(strip=True)
+
+                span_element = old_li.select_one('span')
+                span_text = span_element.get_text(strip=True) if span_element else ''
+
+                item = {
+                    'title': h3_text,
+                    'url': a_href,
+                    'publish_date_str': span_text,
+                    'content_type': task.task_name,
+                    'summary': '',
+                    'author': '',
+                    'tags': f"{task.thinktank.name},{task.task_name}"
+                }
+                items.append(item)
+            except Exception as e:
+                self.stdout.write(f"  解析单个列表项失败: {e}")
+                continue
+        return items
+
+    def _crawl_handler5(self, task, html_content):
+        """处理handler5类型的网站（中国宏观经济研究院）"""
+        items = []
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        u_list = soup.select_one('ul.u-list')
+        if u_list is None:
+            return items
+
+        for old_li in u_list.select('li'):
+            try:
+                old_a = old_li.select_one('a')
+                if old_a is None:
+                    continue
+
+                a_href = urljoin(task.start_url, old_a.get('href', ''))
+                h3_text = old_a.get('title', '')
+                if not h3_text:
+                    h3_text = old_a.get_text(strip=True)
+
+                span_element = old_li.select_one('span')
+                span_text = span_element.get_text(strip=True) if span_element else ''
+
+                item = {
+                    'title': h3_text,
+                    'url': a_href,
+                    'publish_date_str': span_text,
+                    'content_type': task.task_name,
+                    'summary': '',
+                    'author': '',
+                    'tags': f"{task.thinktank.name},{task.task_name}"
+                }
+                items.append(item)
+            except Exception as e:
+                self.stdout.write(f"  解析单个列表项失败: {e}")
+                continue
+        return items
+
+    def _crawl_handler6(self, task, html_content):
+        """处理handler6类型的网站（CCiD赛迪研究院）"""
+        items = []
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        new_list = soup.select_one('div.new_list.new0')
+        if new_list is None:
+            return items
+
+        ul_container = new_list.select_one('ul')
+        if ul_container is None:
+            return items
+
+        for old_li in ul_container.select('li'):
+            try:
+                old_a = old_li.select_one('a')
+                if old_a is None:
+                    continue
+
+                a_href = urljoin(task.start_url, old_a.get('href', ''))
+                h3_text = old_a.get_text(strip=True)
+                if not h3_text:
+                    continue
+
+                span_element = old_li.select_one('span')
+                span_text = span_element.get_text(strip=True) if span_element else ''
+
+                item = {
+                    'title': h3_text,
+                    'url': a_href,
+                    'publish_date_str': span_text,
+                    'content_type': task.task_name,
+                    'summary': '',
+                    'author': '',
+                    'tags': f"{task.thinktank.name},{task.task_name}"
+                }
+                items.append(item)
+            except Exception as e:
+                self.stdout.write(f"  解析单个列表项失败: {e}")
+                continue
+        return items
+
+    def _crawl_handler7(self, task, html_content):
+        """处理handler7类型的网站（上海社会科学院）"""
+        items = []
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        cols_list = soup.select_one('ul.cols_list.clearfix')
+        if cols_list is None:
+            return items
+
+        for old_li in cols_list.select('li'):
+            try:
+                old_a = old_li.select_one('a')
+                if old_a is None:
+                    continue
+
+                a_href = urljoin(task.start_url, old_a.get('href', ''))
+                h3_text = old_a.get_text(strip=True)
+                if not h3_text:
+                    continue
+
+                span_element = old_li.select_one('span.cols_meta')
+                span_text = span_element.get_text(strip=True) if span_element else ''
+
+                item = {
+                    'title': h3_text,
+                    'url': a_href,
+                    'publish_date_str': span_text,
+                    'content_type': task.task_name,
+                    'summary': '',
+                    'author': '',
+                    'tags': f"{task.thinktank.name},{task.task_name}"
+                }
+                items.append(item)
+            except Exception as e:
+                self.stdout.write(f"  解析单个列表项失败: {e}")
+                continue
+        return items
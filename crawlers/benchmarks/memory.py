@@ -0,0 +1,43 @@
+"""在独立进程中测量解析页面样本的内存占用，不依赖 Django，可用 spawn 方式启动"""
+import os
+import tracemalloc
+
+try:
+    import psutil
+except ImportError:  # psutil 为可选依赖，缺失时在 Linux 上读取 /proc
+    psutil = None
+
+from crawlers.utils.html_parser import get_parser_backend
+
+
+def _current_rss_in_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def measure_parse_memory(backend_name: str, page_paths: list) -> tuple:
+    """
+    解析所有页面并同时持有解析结果，返回 (常驻内存增量, Python 堆峰值)，单位字节。
+    lxml 的文档树分配在 C 堆上，tracemalloc 统计不到，因此同时给出进程级的常驻内存增量。
+    """
+    backend = get_parser_backend(backend_name)
+    pages = [open(path, encoding='utf-8').read() for path in page_paths]
+
+    # 先在不开启 tracemalloc 的情况下测常驻内存，避免统计开销混入
+    baseline_rss = _current_rss_in_bytes()
+    documents = [backend.parse(html_content) for html_content in pages]
+    loaded_rss = _current_rss_in_bytes()
+    del documents
+    rss_delta = loaded_rss - baseline_rss if baseline_rss is not None and loaded_rss is not None else None
+
+    tracemalloc.start()
+    documents = [backend.parse(html_content) for html_content in pages]
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del documents
+    return rss_delta, python_peak
@@ -2,21 +2,34 @@
 from django.core.management.base import BaseCommand
 # import sys
 # import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import re
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from django.conf import settings
-from django.db import transaction
+from django.db import DatabaseError, connections, transaction
 from django.utils import timezone
 
 
 # 导入 Django 模型
 from thinktanks.models import ThinkTank
-from crawlers.models import CrawlTask
+from crawlers.models import CrawlRun, CrawlTask
 from articles.models import Article
 
-from crawlers.utils.browser_renderer import ChromePageRender, Options
+from crawlers.utils.browser_renderer import BrowserPool, ChromePageRender, LaunchProfile, Options, parse_render_options
+from crawlers.utils.host_scheduler import HostScheduler
+from crawlers.utils.html_parser import available_backends, get_parser_backend
+from crawlers.utils.list_extractor import get_fragment_selectors, get_list_rule
+from crawlers.utils.page_archive import PageArchive
+from crawlers.utils.page_fetcher import TaskPageFetcher
+from crawlers.utils.parse_pool import ListParseStage, StageMeter
+from crawlers.utils.pagination import ListPaginator, parse_pagination
+from crawlers.utils.static_fetcher import DEFAULT_HEADERS, StaticPageFetcher
+from crawlers.utils.task_schedule import AdaptiveInterval, TaskLeases
+
+# 每批查重/插入的文章数
+SAVE_BATCH_SIZE = 500
 
 def clean_text(text):
     """清理文本内容，去除多余空白字符"""
@@ -40,26 +53,68 @@ class Command(BaseCommand):
             action='store_true',
             help='运行所有激活的爬虫任务 (默认行为)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='并行执行任务的工作线程数，每个线程使用独立的浏览器 (默认 1，即顺序执行)',
+        )
+        parser.add_argument(
+            '--max-pages-per-browser',
+            type=int,
+            default=50,
+            help='单个浏览器会话打开多少页面后重启 (默认 50)',
+        )
+        parser.add_argument(
+            '--max-browser-rss-mb',
+            type=float,
+            default=1024,
+            help='浏览器进程内存超过该值 (MB) 时重启，需要安装 psutil (默认 1024)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='全量爬取：忽略增量水位线，访问配置中的所有页面',
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            help='每个任务最多访问的列表页数，覆盖任务配置中的 max_pages（用于回溯历史文章）',
+        )
+        parser.add_argument(
+            '--host-rate',
+            type=float,
+            help='每个网站每秒最多请求数 (默认 settings.CRAWLER_HOST_SCHEDULER 中的 rate_per_second)',
+        )
+        parser.add_argument(
+            '--parser',
+            choices=available_backends(),
+            help='HTML 解析后端 (默认 settings.CRAWLER_HTML_PARSER，即 lxml)',
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='不存档本次抓取的列表页 HTML (默认按 settings.CRAWLER_PAGE_ARCHIVE 存档)',
+        )
+        parser.add_argument(
+            '--parse-processes',
+            type=int,
+            default=0,
+            help='列表页解析进程数，多个任务并行 (--workers) 时可用满多核 (默认 0，在任务线程中解析)',
+        )
 
     def handle(self, *args, **options):
         task_id = options.get('task_id')
         run_all = options.get('all') or (task_id is None)
 
-        # 设置请求头
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-
         self.stdout.write("=" * 60)
         self.stdout.write("智库内容管理系统 - Django 爬虫")
         self.stdout.write(f"开始时间: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.stdout.write("=" * 60)
 
+        workers = max(1, options.get('workers') or 1)
+        self.open_pipeline(options, workers)
+
         try:
             if task_id:
                 task = CrawlTask.objects.filter(id=task_id).first()
@@ -69,35 +124,25 @@ class Command(BaseCommand):
                 if not task.is_active:
                     self.stdout.write(self.style.WARNING(f"[跳过] 任务 {task.task_name} 未激活，跳过"))
                     return
-                self._crawl_single_task(task)
+                if not self.leases.acquire(task.id):
+                    self.stdout.write(self.style.WARNING(f"[跳过] 任务 {task.task_name} 正在其他进程中执行"))
+                    return
+                try:
+                    self._crawl_single_task(task)
+                finally:
+                    self.leases.release(task.id)
             elif run_all:
-                active_tasks = CrawlTask.objects.filter(is_active=True)
-                if not active_tasks.exists():
+                active_tasks = list(CrawlTask.objects.filter(is_active=True))
+                if not active_tasks:
                     self.stdout.write(self.style.ERROR("[错误] 没有找到激活的爬取任务"))
                     return
-                self.stdout.write(f"[信息] 找到 {active_tasks.count()} 个激活的爬取任务")
-
-                success_count = 0
-                failed_count = 0
-                total_saved = 0
+                self.stdout.write(f"[信息] 找到 {len(active_tasks)} 个激活的爬取任务")
 
-                for i, task in enumerate(active_tasks, 1):
-                    self.stdout.write(f"\n{'='*40}")
-                    self.stdout.write(f"进度: [{i}/{active_tasks.count()}]")
-                    self.stdout.write(f"{'='*40}")
+                workers = min(workers, len(active_tasks))
+                if workers > 1:
+                    self.stdout.write(f"[并发] 使用 {workers} 个工作线程并行执行任务")
 
-                    try:
-                        saved_count = self._crawl_single_task(task)
-                        success_count += 1
-                        total_saved += saved_count
-                        # 更新任务状态 (在 _crawl_single_task 内部已更新)
-                    except Exception as e:
-                        failed_count += 1
-                        self.stdout.write(self.style.ERROR(f"[失败] 任务 {task.task_name} 执行失败: {e}"))
-                        task.last_run = timezone.now()
-                        task.last_run_status = 'failed'
-                        task.last_run_message = f'执行失败: {str(e)}'
-                        task.save(update_fields=['last_run', 'last_run_status', 'last_run_message'])
+                success_count, failed_count, total_saved = self._run_tasks(active_tasks, workers)
 
                 self.stdout.write(f"\n{'='*60}")
                 self.stdout.write("所有任务执行完毕")
@@ -112,7 +157,141 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"[异常] 爬虫执行异常: {e}"))
             raise
+        finally:
+            self.close_pipeline(workers)
 
+    def open_pipeline(self, options, workers):
+        """创建各任务共用的浏览器池、抓取器、解析阶段和写入线程（run_scheduler 也通过它执行任务）"""
+        # 设置请求头
+        self.headers = dict(DEFAULT_HEADERS)
+        self.incremental = not options.get('full')
+        self.max_pages = options.get('max_pages')
+        self.html = get_parser_backend(options.get('parser'))
+        self.page_archive = None if options.get('no_archive') else PageArchive.from_settings()
+
+        self.browser_pool = BrowserPool(
+            browser_factory=self._build_browser,
+            max_size=workers,
+            max_pages_per_session=options.get('max_pages_per_browser'),
+            max_rss_in_mb=options.get('max_browser_rss_mb'),
+        )
+        self.host_scheduler = HostScheduler.from_settings(rate_per_second=options.get('host_rate'))
+        self.static_fetcher = StaticPageFetcher(
+            headers=self.headers, pool_size=workers * 2, scheduler=self.host_scheduler
+        )
+        # 获取（任务线程）→ 解析（任务线程或进程池）→ 入库（单个写入线程，SQLite 不会因多个线程同时写入而锁库）
+        self.list_parse_stage = ListParseStage(self.html, max(0, options.get('parse_processes') or 0))
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='crawl-writer')
+        self.write_lock = threading.Lock()
+        self.pending_write_count = 0
+        self.meter = StageMeter()
+        # 同一任务不会被多个进程（定时调度、手动运行）同时执行
+        self.leases = TaskLeases.from_settings().start()
+        self.adaptive_interval = AdaptiveInterval.from_settings()
+        self.run_started = time.perf_counter()
+
+    def close_pipeline(self, workers):
+        self.leases.close()
+        self.static_fetcher.close()
+        self.browser_pool.close()
+        self.list_parse_stage.close()
+        # 写入线程持有自己的数据库连接
+        self.writer.submit(connections.close_all).result()
+        self.writer.shutdown()
+        for line in self.meter.report_lines(
+            time.perf_counter() - self.run_started, {'获取': workers, '解析': self.list_parse_stage.workers, '入库': 1}
+        ):
+            self.stdout.write(f"[流水线] {line}")
+        self.stdout.write(
+            f"[浏览器] 启动 {self.browser_pool.launched_count} 次，"
+            f"租用 {self.browser_pool.lease_count} 次，回收 {self.browser_pool.recycled_count} 次"
+        )
+        for line in self.host_scheduler.report_lines():
+            self.stdout.write(f"[主机] {line}")
+
+    @staticmethod
+    def _build_browser(profile: LaunchProfile):
+        """浏览器池的会话工厂，每次启动按任务的启动选项构造全新的 Options"""
+        chrome_options = Options()
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.page_load_strategy = profile.page_load_strategy
+        if profile.headless:
+            chrome_options.add_argument("--headless=new")
+        return ChromePageRender(
+            chrome_driver_filepath=None,
+            options=chrome_options,
+            use_undetected_chromedriver=True
+        )
+
+
+    def _run_tasks(self, tasks, workers):
+        """执行一组任务，返回 (成功数, 失败数, 新保存文章数)"""
+        success_count = 0
+        failed_count = 0
+        total_saved = 0
+        total = len(tasks)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crawl') as executor:
+            if workers > 1:
+                futures = [
+                    executor.submit(self._run_task_in_worker, task, i, total)
+                    for i, task in enumerate(tasks, 1)
+                ]
+                outcomes = (future.result() for future in as_completed(futures))
+            else:
+                outcomes = (self._run_task_safely(task, i, total) for i, task in enumerate(tasks, 1))
+
+            for ok, saved_count in outcomes:
+                if ok:
+                    success_count += 1
+                    total_saved += saved_count
+                else:
+                    failed_count += 1
+        return success_count, failed_count, total_saved
+
+    def _run_task_in_worker(self, task, index, total):
+        """在工作线程中执行任务，结束后关闭该线程持有的数据库连接"""
+        try:
+            return self._run_task_safely(task, index, total)
+        finally:
+            connections.close_all()
+
+    def _run_task_safely(self, task, index, total):
+        """执行单个任务并捕获异常，返回 (是否成功, 新保存文章数)"""
+        self.stdout.write(f"\n{'='*40}")
+        self.stdout.write(f"进度: [{index}/{total}] {task.task_name}")
+        self.stdout.write(f"{'='*40}")
+
+        # 数据库错误（如多线程写 SQLite 时锁库）只让本任务失败，不能传到 run_scheduler 的调度循环
+        try:
+            acquired = self.leases.acquire(task.id)
+        except DatabaseError as e:
+            # 未执行任务，不更新 last_run，下次检查时仍然到期
+            self.stdout.write(self.style.ERROR(f"[失败] 任务 {task.task_name} 获取租约失败: {e}"))
+            return False, 0
+        if not acquired:
+            self.stdout.write(self.style.WARNING(f"[跳过] 任务 {task.task_name} 正在其他进程中执行"))
+            return False, 0
+        try:
+            # 更新任务状态 (在 _crawl_single_task 内部已更新)
+            return True, self._crawl_single_task(task)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"[失败] 任务 {task.task_name} 执行失败: {e}"))
+            task.last_run = timezone.now()
+            task.last_run_status = 'failed'
+            task.last_run_message = f'执行失败: {str(e)}'
+            try:
+                task.save(update_fields=['last_run', 'last_run_status', 'last_run_message'])
+            except DatabaseError as save_error:
+                self.stdout.write(self.style.ERROR(f"[失败] 无法记录任务 {task.task_name} 的失败状态: {save_error}"))
+            return False, 0
+        finally:
+            try:
+                self.leases.release(task.id)
+            except DatabaseError as e:
+                # 租约到期后自动失效
+                self.stdout.write(self.style.WARNING(f"[警告] 任务 {task.task_name} 释放租约失败: {e}"))
 
     def _crawl_single_task(self, task):
         """爬取单个任务"""
@@ -125,77 +304,128 @@ class Command(BaseCommand):
         task.last_run_status = 'running'
         task.last_run_message = '任务正在执行中...'
         task.save(update_fields=['last_run', 'last_run_status', 'last_run_message'])
+        started_at = task.last_run
+        progress = {'pages': 0, 'items': 0, 'saved': 0, 'duplicates': 0}
 
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_driver_filepath = None
-            use_undetected = True
-            with ChromePageRender(
-                chrome_driver_filepath=chrome_driver_filepath,
-                options=chrome_options,
-                use_undetected_chromedriver=use_undetected
-            ) as browser:
-                self.stdout.write("[网络] 正在获取页面内容 (使用浏览器)...")
-
-                # --- 获取爬虫配置 ---
-                import json
-                try:
-                    config_data = json.loads(task.crawler_config)
-                    urls_to_crawl = config_data.get('urls', [task.start_url])
-                    crawler_settings = config_data.get('config', {})
-                    selectors_to_wait = crawler_settings.get('selectors', [])
-                    waiting_timeout = crawler_settings.get('waiting_timeout', 10) # 默认10秒
-                except (json.JSONDecodeError, TypeError):
-                    self.stdout.write(self.style.WARNING("[警告] 无法解析 crawler_config，使用默认值"))
-                    urls_to_crawl = [task.start_url]
-                    selectors_to_wait = []
-                    waiting_timeout = 10
-
-                all_items = []
-                for page_url in urls_to_crawl:
-                    try:
-                        # --- 导航到页面并等待元素 ---
-                        is_timed_out = browser.goto_url_waiting_for_selectors(
-                            url=page_url,
-                            selector_types_rules=selectors_to_wait, # 等待配置中指定的元素
-                            waiting_timeout_in_seconds=waiting_timeout,
-                            print_error_log_to_console=True # 可选：打印超时日志
-                        )
-                        if is_timed_out:
-                            self.stdout.write(self.style.WARNING(f"[警告] 等待元素超时: {page_url}"))
-
-                        # --- 获取渲染后的页面源码 ---
-                        html_content = browser.get_page_source()
-                        self.stdout.write(f"[成功] 页面获取成功，大小: {len(html_content)} 字符")
-
-                        # --- 根据爬虫类型解析内容 ---
-                        items = []
-                        crawler_method_name = f'_crawl_{task.crawler_type}'
-                        crawler_method = getattr(self, crawler_method_name, None)
-                        if crawler_method:
-                            self.stdout.write(f"[解析] 使用 {task.crawler_type} 解析器...")
-                            items = crawler_method(task, html_content)
-                            all_items.extend(items)
-                        else:
-                            raise Exception(f"不支持的爬虫类型: {task.crawler_type}")
-
-                        self.stdout.write(f"[数据] 从 {page_url} 解析到 {len(items)} 条数据")
-                        
-                    except Exception as e:
-                        self.stdout.write(self.style.ERROR(f"  处理页面 {page_url} 时出错: {e}"))
-                        # 继续处理下一个 URL
-                        continue
-
-                # --- 保存所有解析到的数据 ---
-                self.stdout.write(f"[总计] 所有页面共解析到 {len(all_items)} 条数据")
-                if all_items:
-                    saved_count, duplicate_count = self._save_articles(all_items, task.thinktank)
+            # --- 获取爬虫配置 ---
+            import json
+            try:
+                config_data = json.loads(task.crawler_config)
+                urls_to_crawl = config_data.get('urls', [task.start_url])
+                crawler_settings = config_data.get('config', {})
+                selectors_to_wait = crawler_settings.get('selectors', [])
+                waiting_timeout = crawler_settings.get('waiting_timeout', 10) # 默认10秒
+                wait_mode = crawler_settings.get('wait_mode', 'all') # 所有选择器出现即就绪
+            except (json.JSONDecodeError, TypeError):
+                self.stdout.write(self.style.WARNING("[警告] 无法解析 crawler_config，使用默认值"))
+                urls_to_crawl = [task.start_url]
+                crawler_settings = {}
+                selectors_to_wait = []
+                waiting_timeout = 10
+                wait_mode = 'all'
+            pagination = parse_pagination(crawler_settings)
+            incremental = self.incremental and crawler_settings.get('incremental', True) and pagination.stop_on_known
+
+            list_rule = get_list_rule(task.crawler_type, crawler_settings)
+            if list_rule is None:
+                raise Exception(f"不支持的爬虫类型: {task.crawler_type}")
+            launch_profile, blocked_url_patterns = parse_render_options(crawler_settings.get('render'))
+            # 浏览器渲染后只取回解析规则需要的节点，可通过 config.extract_fragments = false 关闭
+            fragment_selectors = get_fragment_selectors(list_rule) if crawler_settings.get('extract_fragments', True) else []
+
+            resolved_strategy = task.resolved_fetch_strategy
+            if task.fetch_strategy == 'auto' and resolved_strategy == 'browser' and self._strategy_recheck_due(task):
+                # 判定为 browser 之后，静态请求不会再被尝试，定期重新判定
+                self.stdout.write("[策略] 距上次判定已较久，重新尝试静态请求")
+                resolved_strategy = None
+
+            with TaskPageFetcher(
+                browser_pool=self.browser_pool,
+                static_fetcher=self.static_fetcher,
+                strategy=task.fetch_strategy,
+                resolved_strategy=resolved_strategy,
+                html_backend=self.html,
+                content_selector=crawler_settings.get('content_selector'),
+                selectors_to_wait=selectors_to_wait, # 等待配置中指定的元素
+                waiting_timeout=waiting_timeout,
+                wait_mode=wait_mode,
+                fragment_selectors=fragment_selectors,
+                launch_profile=launch_profile,
+                blocked_url_patterns=blocked_url_patterns
+            ) as fetcher:
+                self.stdout.write(f"[网络] 正在获取页面内容 (抓取策略: {task.fetch_strategy})...")
+
+                watermark_candidates = []
+                rendered_pages = []
+                previous_page_urls = None
+                task_started = time.perf_counter()
+                paginator = ListPaginator(fetcher, urls_to_crawl, pagination, max_pages=self.max_pages)
+
+                # 渲染 → 解析 → 保存：每页解析后立即入库，内存中只保留当前页
+                for page, items in self._parse_pages(task, paginator, fetcher, list_rule, rendered_pages):
+                    # --- 翻页规则生成的页面为空或与上一页相同，说明已经翻到底 ---
+                    page_urls = [item['url'] for item in items]
+                    if page.is_extra and (not items or page_urls == previous_page_urls):
+                        self.stdout.write("[翻页] 本页没有新的列表内容，停止翻页")
+                        break
+                    previous_page_urls = page_urls
+
+                    # 需在保存本页之前判断，保存后本页必然全部"已知"
+                    page_is_known = incremental and items and self._page_is_known(task, items)
+
+                    progress['pages'] += 1
+                    if items:
+                        progress['items'] += len(items)
+                        if not watermark_candidates:
+                            watermark_candidates.append(items[0])
+                        newest_item = self._newest_dated_item(items)
+                        if newest_item is not None:
+                            watermark_candidates.append(newest_item)
+
+                        saved_count, duplicate_count = self._write_articles(items, task.thinktank)
+                        if saved_count and not progress['saved']:
+                            self.stdout.write(
+                                f"[保存] 首批新文章已入库 (任务开始后 {time.perf_counter() - task_started:.1f} s)"
+                            )
+                        progress['saved'] += saved_count
+                        progress['duplicates'] += duplicate_count
+                        self.stdout.write(f"[保存] 本页新增 {saved_count} 条，重复 {duplicate_count} 条")
+                    self._update_progress(task, progress)
+
+                    # --- 增量爬取：本页没有新文章时不再翻页 ---
+                    if page_is_known:
+                        self.stdout.write("[增量] 本页全部为已知文章，停止翻页")
+                        break
+                else:
+                    if paginator.stop_reason:
+                        self.stdout.write(f"[翻页] {paginator.stop_reason}，停止翻页")
+
+                if rendered_pages:
+                    self._report_render_summary(rendered_pages, launch_profile, blocked_url_patterns)
+
+                # --- 缓存 auto 模式的抓取方式判定（判定为 browser 时记录时间，到期后重新判定） ---
+                changed = fetcher.resolved_strategy != task.resolved_fetch_strategy
+                if fetcher.strategy_decided and (changed or fetcher.resolved_strategy == 'browser'):
+                    task.resolved_fetch_strategy = fetcher.resolved_strategy
+                    task.resolved_fetch_strategy_at = timezone.now()
+                    task.save(update_fields=['resolved_fetch_strategy', 'resolved_fetch_strategy_at'])
+                    if changed:
+                        self.stdout.write(f"[策略] 任务抓取方式判定为: {fetcher.resolved_strategy}")
+
+                # --- 汇总 ---
+                saved_count = progress['saved']
+                duplicate_count = progress['duplicates']
+                self.stdout.write(f"[总计] 所有页面共解析到 {progress['items']} 条数据")
+                if progress['items']:
+                    self._advance_watermark(task, watermark_candidates)
                     task.last_run = timezone.now()
                     task.last_run_status = 'success'
                     task.last_run_message = f'成功保存 {saved_count} 条新数据，跳过 {duplicate_count} 条重复数据'
-                    task.save(update_fields=['last_run', 'last_run_status', 'last_run_message'])
+                    task.save(update_fields=[
+                        'last_run', 'last_run_status', 'last_run_message', 'watermark_url', 'watermark_publish_date'
+                    ])
+                    self._record_run(task, started_at, 'success', progress)
 
                     self.stdout.write(self.style.SUCCESS(f"[保存] 成功保存 {saved_count} 条新数据"))
                     if duplicate_count > 0:
@@ -206,59 +436,257 @@ class Command(BaseCommand):
                     task.last_run_status = 'success'
                     task.last_run_message = '页面解析成功但未找到新数据'
                     task.save(update_fields=['last_run', 'last_run_status', 'last_run_message'])
+                    self._record_run(task, started_at, 'success', progress)
                     self.stdout.write(self.style.WARNING("[警告] 未解析到任何数据"))
                     return 0
-                    
+
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"[失败] 任务执行失败: {e}"))
             task.last_run = timezone.now()
             task.last_run_status = 'failed'
             task.last_run_message = f'执行失败: {str(e)}'
+            if progress['saved']:
+                # 之前的页面已经入库，不会因失败丢失
+                task.last_run_message += f"（失败前已保存 {progress['saved']} 条新数据）"
             task.save(update_fields=['last_run', 'last_run_status', 'last_run_message'])
-            # 如果浏览器崩溃，可能需要特殊处理，但通常 __exit__ 会尝试关闭
+            self._record_run(task, started_at, 'failed', progress)
+            # 如果浏览器崩溃，浏览器池归还时会检测并回收该会话
             raise
             
 
-    def _save_articles(self, items, thinktank):
-        """保存文章到数据库 (使用 Django ORM)"""
+    @staticmethod
+    def _strategy_recheck_due(task):
+        recheck_hours = getattr(settings, 'CRAWLER_FETCH_STRATEGY_RECHECK_HOURS', 24 * 7)
+        decided_at = task.resolved_fetch_strategy_at
+        return decided_at is None or timezone.now() - decided_at >= timedelta(hours=recheck_hours)
+
+    def _parse_pages(self, task, paginator, fetcher, list_rule, rendered_pages):
+        """逐页获取并解析列表页，产出 (页面, 条目)；获取或解析失败的页面记录日志后跳过"""
+        for page in paginator:
+            page_url = page.url
+            if page.error is not None:
+                self.stdout.write(self.style.ERROR(f"  处理页面 {page_url} 时出错: {page.error}"))
+                # 继续处理下一个 URL
+                continue
+            try:
+                html_content = page.html
+                if fetcher.last_fallback_reason:
+                    self.stdout.write(self.style.WARNING(f"[回退] {fetcher.last_fallback_reason}，改用浏览器渲染"))
+                if fetcher.last_timed_out:
+                    self.stdout.write(self.style.WARNING(f"[警告] 等待元素超时: {page_url}"))
+                self.meter.add('获取', page.fetch_seconds)
+                page_size = f"大小: {len(html_content)} 字符"
+                if fetcher.last_fragment_only:
+                    page_length = (fetcher.last_page_metrics or {}).get('page_length')
+                    page_size += f" (仅目标节点，整页 {page_length} 字符)" if page_length else " (仅目标节点)"
+                self.stdout.write(
+                    f"[成功] 第 {page.number} 页获取成功 ({fetcher.last_method}, "
+                    f"{page.fetch_seconds * 1000:.0f} ms)，{page_size}"
+                )
+                if fetcher.last_page_metrics:
+                    rendered_pages.append(fetcher.last_page_metrics)
+                    self.stdout.write(f"[渲染] {self._format_page_metrics(fetcher.last_page_metrics)}")
+                self._archive_page(task, page, fetcher)
+
+                # --- 根据解析规则解析内容 ---
+                self.stdout.write(f"[解析] 使用 {task.crawler_type} 解析规则...")
+                items = self._parse_list_page(task, html_content, list_rule, base_url=page_url)
+                self.stdout.write(f"[数据] 从 {page_url} 解析到 {len(items)} 条数据")
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"  处理页面 {page_url} 时出错: {e}"))
+                # 继续处理下一个 URL
+                continue
+            yield page, items
+
+    def _archive_page(self, task, page, fetcher):
+        """存档列表页 HTML，存档失败不影响爬取"""
+        if self.page_archive is None:
+            return
+        try:
+            self.page_archive.snapshot(
+                page.url, page.html, 'list', fetcher.last_method,
+                is_fragment=fetcher.last_fragment_only, task=task,
+            ).save()
+        except OSError as e:
+            self.stdout.write(self.style.WARNING(f"[存档] 页面存档失败: {e}"))
+
+    def _record_run(self, task, started_at, status, progress):
+        """记录本次运行；adaptive 任务据此重新计算运行间隔"""
+        run = CrawlRun(
+            task=task, started_at=started_at, finished_at=timezone.now(), status=status, full=not self.incremental,
+            pages=progress['pages'], items=progress['items'],
+            new_articles=progress['saved'], duplicates=progress['duplicates'],
+        )
+        self.adaptive_interval.record(task, run)
+        if task.schedule_type == 'adaptive' and run.interval_hours is not None:
+            self.stdout.write(f"[调度] 下次运行间隔 {run.interval_hours:.1f} 小时")
+
+    @staticmethod
+    def _update_progress(task, progress):
+        """每处理完一页就更新任务的运行信息，前端可以看到实时进度"""
+        task.last_run_message = (
+            f"任务正在执行中: 已处理 {progress['pages']} 页，"
+            f"保存 {progress['saved']} 条新数据，跳过 {progress['duplicates']} 条重复数据"
+        )
+        task.save(update_fields=['last_run_message'])
+
+    @staticmethod
+    def _format_milliseconds(value):
+        return f"{value:.0f} ms" if value is not None else '未知'
+
+    def _format_page_metrics(self, metrics):
+        return (
+            f"传输 {metrics.get('transfer_bytes', 0) / 1024:.1f} KB "
+            f"({metrics.get('resource_count', 0)} 个资源)，"
+            f"导航耗时 {self._format_milliseconds(metrics.get('navigation_ms'))}，"
+            f"就绪耗时 {self._format_milliseconds(metrics.get('ready_ms'))}"
+        )
+
+    @staticmethod
+    def _average_metric(rendered_pages, key):
+        values = [metrics[key] for metrics in rendered_pages if metrics.get(key) is not None]
+        return sum(values) / len(values) if values else None
+
+    def _report_render_summary(self, rendered_pages, launch_profile, blocked_url_patterns):
+        """输出本任务浏览器渲染页面的传输量、导航耗时与等待元素就绪耗时汇总"""
+        total_bytes = sum(metrics.get('transfer_bytes', 0) for metrics in rendered_pages)
+        self.stdout.write(
+            f"[渲染] 浏览器渲染 {len(rendered_pages)} 页 (加载策略: {launch_profile.page_load_strategy}，"
+            f"屏蔽 {len(blocked_url_patterns)} 个 URL 模式)，共传输 {total_bytes / 1024:.1f} KB，"
+            f"平均导航耗时 {self._format_milliseconds(self._average_metric(rendered_pages, 'navigation_ms'))}，"
+            f"平均就绪耗时 {self._format_milliseconds(self._average_metric(rendered_pages, 'ready_ms'))}"
+        )
+
+    def _page_is_known(self, task, items):
+        """
+        判断一页解析结果是否全部为已知文章：URL 已入库，或发布日期早于任务水位线。
+        列表页按时间倒序排列，出现这种页面说明后续页面也不会有新文章。
+        """
+        known_urls = set(
+            Article.objects.filter(url__in={item['url'] for item in items}).values_list('url', flat=True)
+        )
+        for item in items:
+            if item['url'] in known_urls or item['url'] == task.watermark_url:
+                continue
+            publish_date = self._parse_date(item.get('publish_date_str', ''))
+            if task.watermark_publish_date and publish_date and publish_date < task.watermark_publish_date:
+                continue
+            return False
+        return True
+
+    def _newest_dated_item(self, items):
+        """返回发布日期最新的条目，都没有日期时返回 None"""
+        newest_item = None
+        newest_date = None
+        for item in items:
+            publish_date = self._parse_date(item.get('publish_date_str', ''))
+            if publish_date and (newest_date is None or publish_date > newest_date):
+                newest_item, newest_date = item, publish_date
+        return newest_item
+
+    def _advance_watermark(self, task, items):
+        """
+        把任务水位线推进到本次见到的最新文章（只前进不后退）。
+        items 只需包含第一页第一条和各页日期最新的条目，不必保留全部条目。
+        """
+        newest_item = self._newest_dated_item(items)
+        newest_date = self._parse_date(newest_item.get('publish_date_str', '')) if newest_item else None
+
+        if newest_item is None:
+            # 列表没有日期时，以第一页第一条作为最新文章
+            if task.watermark_publish_date is None:
+                task.watermark_url = items[0]['url']
+            return
+        if task.watermark_publish_date is None or newest_date >= task.watermark_publish_date:
+            task.watermark_url = newest_item['url']
+            task.watermark_publish_date = newest_date
+
+    def _write_articles(self, items, thinktank):
+        """交给写入线程入库并等待结果，返回 (新保存数, 重复数)"""
+        with self.write_lock:
+            self.pending_write_count += 1
+            self.meter.sample('待入库', self.pending_write_count)
+        return self.writer.submit(self._save_articles_timed, items, thinktank).result()
+
+    def _save_articles_timed(self, items, thinktank):
+        started = time.perf_counter()
+        try:
+            return self._save_articles(items, thinktank)
+        finally:
+            self.meter.add('入库', time.perf_counter() - started)
+            with self.write_lock:
+                self.pending_write_count -= 1
+
+    def _save_articles(self, items, thinktank, batch_size=SAVE_BATCH_SIZE):
+        """
+        批量保存文章到数据库 (使用 Django ORM)
+
+        每批只做一次 url__in 查重和一次 bulk_create，并放在同一个事务中提交；
+        返回 (新保存数, 重复数)。
+        """
         saved_count = 0
         duplicate_count = 0
 
-        for item in items:
-            try:
-                # 检查是否已存在 (Django ORM)
-                if Article.objects.filter(url=item['url']).exists():
-                    duplicate_count += 1
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            crawl_date = timezone.now()
+
+            with transaction.atomic():
+                # 检查是否已存在 (一次查询覆盖整批)
+                existing_urls = set(
+                    Article.objects.filter(url__in={item['url'] for item in batch}).values_list('url', flat=True)
+                )
+
+                new_articles = []
+                for item in batch:
+                    url = item['url']
+                    # 同一批次内重复出现的 URL 也按重复计
+                    if url in existing_urls:
+                        duplicate_count += 1
+                        continue
+                    existing_urls.add(url)
+                    try:
+                        new_articles.append(self._build_article(item, thinktank, crawl_date))
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR(f"  保存文章失败: {e}"))
+                        # 单篇文章数据有误不影响其他文章
+                        continue
+
+                if not new_articles:
                     continue
 
-                # 解析日期
-                publish_date = self._parse_date(item.get('publish_date_str', ''))
-
-                # 创建新文章 (Django ORM)
-                # 使用 transaction.atomic 确保单个文章创建的原子性
-                with transaction.atomic():
-                    new_article = Article(
-                        title=item['title'][:255],
-                        url=item['url'],
-                        summary=item.get('summary', '')[:500],
-                        author=item.get('author', '')[:100],
-                        publish_date=publish_date,
-                        content_type=item.get('content_type', ''),
-                        tags=item.get('tags', ''),
-                        thinktank=thinktank, # 直接关联对象
-                        crawl_date=timezone.now(),
-                        is_processed=False
-                    )
-                    new_article.save()
-                saved_count += 1
+                Article.objects.bulk_create(new_articles, batch_size=batch_size, ignore_conflicts=True)
 
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"  保存文章失败: {e}"))
-                # 单篇文章保存失败不影响其他文章
-                continue
+                # ignore_conflicts 不会告知哪些行真正插入了（并行任务可能抢先插入同一 URL），
+                # 用本批次的 crawl_date 回查实际插入的行数
+                new_urls = [article.url for article in new_articles]
+                inserted = Article.objects.filter(url__in=new_urls, crawl_date=crawl_date).count()
+                saved_count += inserted
+                duplicate_count += len(new_articles) - inserted
 
         return saved_count, duplicate_count
 
+    def _build_article(self, item, thinktank, crawl_date):
+        """由解析结果构造未保存的 Article 对象"""
+        if len(item['url']) > Article._meta.get_field('url').max_length:
+            raise ValueError(f"URL 过长: {item['url']}")
+
+        # 解析日期
+        publish_date = self._parse_date(item.get('publish_date_str', ''))
+
+        return Article(
+            title=item['title'][:255],
+            url=item['url'],
+            summary=item.get('summary', '')[:500],
+            author=item.get('author', '')[:100],
+            publish_date=publish_date,
+            content_type=item.get('content_type', ''),
+            tags=item.get('tags', ''),
+            thinktank=thinktank, # 直接关联对象
+            crawl_date=crawl_date,
+            is_processed=False
+        )
+
     def _parse_date(self, date_str):
         """解析日期字符串"""
         if not date_str:
@@ -284,340 +712,15 @@ class Command(BaseCommand):
                     continue
         return None
 
-    # --- 爬虫解析方法 (与原脚本逻辑基本一致，但使用 Django 模型和 self.stdout) ---
-
-    def _crawl_handler1(self, task, html_content):
-        """处理handler1类型的网站（中国国际工程咨询有限公司）"""
-        items = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        
-        records = re.findall(r'<record><!\[CDATA\[(.*?)\]\]></record>', html_content, re.DOTALL)
-        self.stdout.write(f"  找到 {len(records)} 个 CDATA 记录")
-
-        if records:
-             # 如果找到了 CDATA，沿用之前的逻辑
-             for record_html in records:
-                try:
-                    # 解析每个record中的HTML内容
-                    record_soup = BeautifulSoup(record_html, 'html.parser')
-
-                    # 查找新闻列表容器 (根据 handler1 原逻辑)
-                    news_list = record_soup.select_one('div.news-list')
-                    if news_list is None:
-                        continue
-
-                    # 在每个新闻列表中查找内容 (根据 handler1 原逻辑)
-                    old_newscontent = news_list.select_one('div.newscontent')
-                    if old_newscontent is None:
-                        continue
-
-                    old_a = old_newscontent.select_one('a')
-                    if old_a is None:
-                        continue
-
-                    a_href = urljoin(task.start_url, old_a.get('href', ''))
-                    h3_element = old_a.select_one('h3')
-                    if h3_element is None:
-                        continue
-                    h3_text = h3_element.get_text(strip=True)
-
-                    # 查找日期信息 (根据 handler1 原逻辑)
-                    span_element = news_list.select_one('span.newsdate')
-                    span_text = span_element.get_text(strip=True) if span_element else ''
-
-                    # 获取摘要信息 (根据 handler1 原逻辑)
-                    summary_element = old_newscontent.select_one('p.newsinfo')
-                    summary_text = summary_element.get_text(strip=True)[:300] if summary_element else ''
-
-                    item = {
-                        'title': h3_text,
-                        'url': a_href,
-                        'publish_date_str': span_text,
-                        'content_type': task.task_name,
-                        'summary': summary_text,
-                        'author': '',
-                        'tags': f"{task.thinktank.name},{task.task_name}"
-                    }
-                    items.append(item)
-                except Exception as e:
-                    self.stdout.write(f"  解析单个 CDATA 记录失败: {e}")
-                    continue
-        else:
-            
-            self.stdout.write("  未找到 CDATA 记录，尝试直接解析 HTML...")
-            
-            container = soup.select_one('div.default_pgContainer')
-            if container:
-                 
-                 news_contents = container.select('div.newscontent')
-                 self.stdout.write(f"  在 default_pgContainer 中找到 {len(news_contents)} 个 newscontent 元素")
-                 for newscontent in news_contents:
-                     try:
-                         old_a = newscontent.select_one('a')
-                         if old_a is None:
-                             continue
-
-                         a_href = urljoin(task.start_url, old_a.get('href', ''))
-                         # 尝试获取标题，可能在 h3 或 a 标签文本中
-                         h3_element = old_a.select_one('h3')
-                         if h3_element:
-                             h3_text = h3_element.get_text(strip=True)
-                         else:
-                             h3_text = old_a.get_text(strip=True) # 备选方案
-
-                         if not h3_text:
-                             continue
-
-                         # 查找日期信息，可能在同级或父级元素中
-                         # 根据网页示例，日期紧跟在标题后面，可能是纯文本或在 span 中
-                         # 这里简化处理，尝试从父元素或附近查找
-                         span_element = newscontent.select_one('span.newsdate') # 如果存在
-                         span_text = span_element.get_text(strip=True) if span_element else ''
-
-                         # 获取摘要信息
-                         summary_element = newscontent.select_one('p.newsinfo') # 如果存在
-                         summary_text = summary_element.get_text(strip=True)[:300] if summary_element else ''
-
-                         item = {
-                             'title': h3_text,
-                             'url': a_href,
-                             'publish_date_str': span_text,
-                             'content_type': task.task_name,
-                             'summary': summary_text,
-                             'author': '',
-                             'tags': f"{task.thinktank.name},{task.task_name}"
-                         }
-                         items.append(item)
-                     except Exception as e:
-                         self.stdout.write(f"  直接解析 HTML 时单个条目失败: {e}")
-                         continue
-            else:
-                 self.stdout.write("  未找到 default_pgContainer 容器")
-
-        return items
-
-    def _crawl_handler2(self, task, html_content):
-        """处理handler2类型的网站（中国人民大学国家发展与战略研究院）"""
-        items = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        for old_briefItem in soup.select('div.briefItem'):
-            try:
-                old_a = old_briefItem.select_one('a')
-                if old_a is None:
-                    continue
-
-                a_href = urljoin(task.start_url, old_a.get('href', ''))
-                h3_element = old_a.select_one('h3')
-                if h3_element is None:
-                    continue
-                h3_text = h3_element.get_text(strip=True)
-
-                span_element = old_a.select_one('span')
-                span_text = span_element.get_text(strip=True) if span_element else ''
-
-                item = {
-                    'title': h3_text,
-                    'url': a_href,
-                    'publish_date_str': span_text,
-                    'content_type': task.task_name,
-                    'summary': '',
-                    'author': '',
-                    'tags': f"{task.thinktank.name},{task.task_name}"
-                }
-                items.append(item)
-            except Exception as e:
-                self.stdout.write(f"  解析单个简报项失败: {e}")
-                continue
-        return items
-
-    def _crawl_handler3(self, task, html_content):
-        """处理handler3类型的网站（国务院发展研究中心）"""
-        items = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        for re_box in soup.select('div.re_box'):
-            try:
-                old_a = re_box.select_one('a')
-                if old_a is None:
-                    continue
-
-                a_href = urljoin(task.start_url, old_a.get('href', ''))
-                h3_text = old_a.get('title', '')
-                if not h3_text:
-                    h3_text = old_a.get_text(strip=True)
-
-                span_element = re_box.select_one('span')
-                span_text = span_element.get_text(strip=True) if span_element else ''
-
-                item = {
-                    'title': h3_text,
-                    'url': a_href,
-                    'publish_date_str': span_text,
-                    'content_type': task.task_name,
-                    'summary': '',
-                    'author': '',
-                    'tags': f"{task.thinktank.name},{task.task_name}"
-                }
-                items.append(item)
-            except Exception as e:
-                self.stdout.write(f"  解析单个结果项失败: {e}")
-                continue
-        return items
-
-    def _crawl_handler4(self, task, html_content):
-        """处理handler4类型的网站（中国科学院）"""
-        items = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        gl_list2 = soup.select_one('ul.gl_list2')
-        if gl_list2 is None:
-            return items
-
-        for old_li in gl_list2.select('li'):
-            try:
-                old_a = old_li.select_one('a')
-                if old_a is None:
-                    continue
-
-                a_href = urljoin(task.start_url, old_a.get('href', ''))
-                h3_text = old_a.get('title', '')
-                if not h3_text:
-                    h3_text = old_a.get_text(strip=True)
-
-                span_element = old_li.select_one('span')
-                span_text = span_element.get_text(strip=True) if span_element else ''
-
-                item = {
-                    'title': h3_text,
-                    'url': a_href,
-                    'publish_date_str': span_text,
-                    'content_type': task.task_name,
-                    'summary': '',
-                    'author': '',
-                    'tags': f"{task.thinktank.name},{task.task_name}"
-                }
-                items.append(item)
-            except Exception as e:
-                self.stdout.write(f"  解析单个列表项失败: {e}")
-                continue
-        return items
-
-    def _crawl_handler5(self, task, html_content):
-        """处理handler5类型的网站（中国宏观经济研究院）"""
-        items = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        u_list = soup.select_one('ul.u-list')
-        if u_list is None:
-            return items
-
-        for old_li in u_list.select('li'):
-            try:
-                old_a = old_li.select_one('a')
-                if old_a is None:
-                    continue
-
-                a_href = urljoin(task.start_url, old_a.get('href', ''))
-                h3_text = old_a.get('title', '')
-                if not h3_text:
-                    h3_text = old_a.get_text(strip=True)
-
-                span_element = old_li.select_one('span')
-                span_text = span_element.get_text(strip=True) if span_element else ''
-
-                item = {
-                    'title': h3_text,
-                    'url': a_href,
-                    'publish_date_str': span_text,
-                    'content_type': task.task_name,
-                    'summary': '',
-                    'author': '',
-                    'tags': f"{task.thinktank.name},{task.task_name}"
-                }
-                items.append(item)
-            except Exception as e:
-                self.stdout.write(f"  解析单个列表项失败: {e}")
-                continue
-        return items
-
-    def _crawl_handler6(self, task, html_content):
-        """处理handler6类型的网站（CCiD赛迪研究院）"""
-        items = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+    # --- 列表页解析 (规则见 crawlers.utils.list_extractor) ---
 
-        new_list = soup.select_one('div.new_list.new0')
-        if new_list is None:
-            return items
-
-        ul_container = new_list.select_one('ul')
-        if ul_container is None:
-            return items
-
-        for old_li in ul_container.select('li'):
-            try:
-                old_a = old_li.select_one('a')
-                if old_a is None:
-                    continue
-
-                a_href = urljoin(task.start_url, old_a.get('href', ''))
-                h3_text = old_a.get_text(strip=True)
-                if not h3_text:
-                    continue
-
-                span_element = old_li.select_one('span')
-                span_text = span_element.get_text(strip=True) if span_element else ''
-
-                item = {
-                    'title': h3_text,
-                    'url': a_href,
-                    'publish_date_str': span_text,
-                    'content_type': task.task_name,
-                    'summary': '',
-                    'author': '',
-                    'tags': f"{task.thinktank.name},{task.task_name}"
-                }
-                items.append(item)
-            except Exception as e:
-                self.stdout.write(f"  解析单个列表项失败: {e}")
-                continue
-        return items
-
-    def _crawl_handler7(self, task, html_content):
-        """处理handler7类型的网站（上海社会科学院）"""
-        items = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        cols_list = soup.select_one('ul.cols_list.clearfix')
-        if cols_list is None:
-            return items
-
-        for old_li in cols_list.select('li'):
-            try:
-                old_a = old_li.select_one('a')
-                if old_a is None:
-                    continue
-
-                a_href = urljoin(task.start_url, old_a.get('href', ''))
-                h3_text = old_a.get_text(strip=True)
-                if not h3_text:
-                    continue
-
-                span_element = old_li.select_one('span.cols_meta')
-                span_text = span_element.get_text(strip=True) if span_element else ''
-
-                item = {
-                    'title': h3_text,
-                    'url': a_href,
-                    'publish_date_str': span_text,
-                    'content_type': task.task_name,
-                    'summary': '',
-                    'author': '',
-                    'tags': f"{task.thinktank.name},{task.task_name}"
-                }
-                items.append(item)
-            except Exception as e:
-                self.stdout.write(f"  解析单个列表项失败: {e}")
-                continue
+    def _parse_list_page(self, task, html_content, rule, base_url=None):
+        """按规则解析列表页，并补充任务相关的字段；相对链接按 base_url（默认任务起始 URL）补全"""
+        items, seconds = self.list_parse_stage.parse(html_content, rule, base_url or task.start_url)
+        self.meter.add('解析', seconds)
+        tags = f"{task.thinktank.name},{task.task_name}"
+        for item in items:
+            item['content_type'] = task.task_name
+            item['author'] = ''
+            item['tags'] = tags
         return items
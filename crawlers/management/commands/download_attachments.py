@@ -0,0 +1,186 @@
+# crawlers/management/commands/download_attachments.py
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from articles.models import Attachment
+from crawlers.utils.attachments import AttachmentDownloader, AttachmentTooLarge
+from crawlers.utils.detail_fetcher import ConcurrentPageFetcher
+from crawlers.utils.detail_retry import classify_error
+from crawlers.utils.host_scheduler import HostParkedError, HostScheduler
+from crawlers.utils.static_fetcher import DEFAULT_HEADERS, StaticPageFetcher
+
+# 下载结果每攒够这么多条写一次库
+WRITE_BATCH_SIZE = 100
+DOWNLOAD_FIELDS = ['download_status', 'local_path', 'file_size', 'content_hash', 'download_error', 'downloaded_at']
+
+
+class Command(BaseCommand):
+    help = '下载文章附件（PDF/DOC/PPT/XLS），按内容哈希去重存放，中断的下载下次从断点继续'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='同时进行的下载数 (默认 4)',
+        )
+        parser.add_argument(
+            '--per-host',
+            type=int,
+            default=1,
+            help='同一网站同时进行的下载数 (默认 1)',
+        )
+        parser.add_argument(
+            '--host-rate',
+            type=float,
+            help='每个网站每秒最多请求数 (默认 settings.CRAWLER_HOST_SCHEDULER 中的 rate_per_second)',
+        )
+        parser.add_argument(
+            '--max-size-mb',
+            type=float,
+            help='单个附件的大小上限 (MB)，超过的不再下载 (默认 settings.CRAWLER_ATTACHMENTS 中的 max_size_mb)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='本次最多处理的附件数 (默认全部)',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='同时重试之前下载失败的附件',
+        )
+        parser.add_argument(
+            '--time-budget',
+            type=float,
+            help='本次运行的时间上限（秒），到期后不再开始新的下载 (默认不限)',
+        )
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['retry_failed'] else ['pending']
+        attachments = Attachment.objects.filter(download_status__in=statuses).order_by('id')
+        if options.get('limit'):
+            attachments = attachments[:options['limit']]
+        # 同一 URL 可能被多篇文章引用，只下载一次
+        by_url = defaultdict(list)
+        for attachment in attachments:
+            by_url[attachment.original_url].append(attachment)
+        if not by_url:
+            self.stdout.write("没有需要下载的附件")
+            return
+
+        concurrency = max(1, options['concurrency'])
+        scheduler = HostScheduler.from_settings(rate_per_second=options.get('host_rate'))
+        static_fetcher = StaticPageFetcher(headers=DEFAULT_HEADERS, pool_size=concurrency, scheduler=scheduler)
+        downloader = AttachmentDownloader.from_settings(static_fetcher, max_size_mb=options.get('max_size_mb'))
+        self.pending_writes = []
+        stats = {
+            'success': 0, 'reused': 0, 'deduplicated': 0, 'resumed': 0, 'failed': 0, 'too_large': 0, 'parked': 0,
+            'bytes': 0,
+        }
+
+        reused = self._reuse_downloaded(by_url, downloader)
+        stats['reused'] = sum(len(by_url.pop(url)) for url in reused)
+        self.stdout.write(
+            f"共 {len(by_url)} 个附件待下载 (并发 {concurrency}，每个网站 {max(1, options['per_host'])})，"
+            f"{stats['reused']} 个已由其他文章下载过"
+        )
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + options['time_budget'] if options.get('time_budget') else None
+        parked_hosts = set()
+        # 已有结果的 URL 数（stats 按附件记录计数，同一 URL 可能对应多条记录）
+        finished_urls = 0
+        page_fetcher = ConcurrentPageFetcher(static_fetcher, concurrency=concurrency, per_host=max(1, options['per_host']))
+        with static_fetcher:
+            jobs = ((url, url) for url in by_url)
+            for result in page_fetcher.run_all(jobs, downloader.download, deadline=deadline):
+                rows = by_url[result.key]
+                finished_urls += 1
+                if isinstance(result.error, HostParkedError):
+                    # 熔断主机的附件保持 pending，留待下次运行
+                    stats['parked'] += len(rows)
+                    if result.host not in parked_hosts:
+                        parked_hosts.add(result.host)
+                        self.stdout.write(self.style.WARNING(f"[熔断] {result.error}，跳过该网站剩余附件"))
+                    continue
+                if result.error is not None:
+                    if isinstance(result.error, AttachmentTooLarge):
+                        stats['too_large'] += len(rows)
+                        error_class = 'TooLarge'
+                    else:
+                        stats['failed'] += len(rows)
+                        error_class = classify_error(result.error)[0]
+                    self.stdout.write(self.style.ERROR(f"下载失败 {result.url}: {result.error}"))
+                    self._mark(rows, 'failed', download_error=error_class[:100])
+                    continue
+
+                stats['success'] += len(rows)
+                stats['bytes'] += result.size_in_bytes - result.resumed_bytes
+                stats['deduplicated'] += result.deduplicated
+                stats['resumed'] += bool(result.resumed_bytes)
+                self.stdout.write(self.style.SUCCESS(
+                    f"已下载 {rows[0].filename} ({result.size_in_bytes / 1024:.0f} KB"
+                    f"{f'，从 {result.resumed_bytes / 1024:.0f} KB 处继续' if result.resumed_bytes else ''}"
+                    f"{'，与已有文件相同' if result.deduplicated else ''})"
+                ))
+                self._mark(
+                    rows, 'success', local_path=result.local_path, file_size=result.size_in_bytes,
+                    content_hash=result.content_hash,
+                )
+        self._flush_writes()
+
+        elapsed = time.perf_counter() - started
+        unstarted = len(by_url) - finished_urls
+        self.stdout.write("=" * 60)
+        self.stdout.write(
+            f"成功 {stats['success']}（其中 {stats['deduplicated']} 个与已有文件内容相同，{stats['resumed']} 个断点续传），"
+            f"复用 {stats['reused']}，失败 {stats['failed']}，超过大小上限 {stats['too_large']}，网站熔断跳过 {stats['parked']}"
+        )
+        if deadline is not None and unstarted > 0:
+            self.stdout.write(self.style.WARNING(f"[时间预算] 已用完，{unstarted} 个附件留待下次运行"))
+        self.stdout.write(
+            f"耗时 {elapsed:.1f} s，下载 {stats['bytes'] / 1024 / 1024:.1f} MB "
+            f"({stats['bytes'] / 1024 / 1024 / elapsed if elapsed else 0:.2f} MB/s)，文件目录 {downloader.store.root}"
+        )
+        for line in scheduler.report_lines():
+            self.stdout.write(f"  {line}")
+
+    def _reuse_downloaded(self, by_url, downloader):
+        """其他文章已成功下载过、文件仍在的 URL 直接复用，返回这些 URL"""
+        urls = list(by_url)
+        reused = set()
+        for start in range(0, len(urls), 500):
+            downloaded = Attachment.objects.filter(
+                original_url__in=urls[start:start + 500], download_status='success'
+            ).values_list('original_url', 'local_path', 'file_size', 'content_hash')
+            for url, local_path, file_size, content_hash in downloaded:
+                if url in reused or not local_path or not downloader.store.path(local_path).exists():
+                    continue
+                reused.add(url)
+                self._mark(by_url[url], 'success', local_path=local_path, file_size=file_size, content_hash=content_hash)
+        return reused
+
+    def _mark(self, rows, status, **fields):
+        now = timezone.now()
+        for attachment in rows:
+            attachment.download_status = status
+            attachment.download_error = fields.get('download_error')
+            if status == 'success':
+                attachment.local_path = fields['local_path']
+                attachment.file_size = fields['file_size']
+                attachment.content_hash = fields['content_hash']
+                attachment.downloaded_at = now
+            self.pending_writes.append(attachment)
+        if len(self.pending_writes) >= WRITE_BATCH_SIZE:
+            self._flush_writes()
+
+    def _flush_writes(self):
+        if self.pending_writes:
+            with transaction.atomic():
+                Attachment.objects.bulk_update(self.pending_writes, DOWNLOAD_FIELDS)
+            self.pending_writes = []
@@ -0,0 +1,188 @@
+# crawlers/management/commands/extract_attachment_text.py
+import multiprocessing
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from articles.models import Attachment
+from crawlers.utils.attachment_text import EXTRACTORS, extract_file, file_extension, missing_package
+from crawlers.utils.attachments import AttachmentStore
+
+# 提取结果每攒够这么多条或这么多字写一次库，避免大量长文本积压在内存中
+WRITE_BATCH_SIZE = 100
+WRITE_BATCH_CHARS = 20_000_000
+TEXT_FIELDS = ['extracted_text', 'text_status', 'text_pages', 'text_error', 'text_extracted_at']
+
+
+class Command(BaseCommand):
+    help = '从已下载的附件（PDF/DOCX/PPTX/XLSX）中提取文本供搜索使用，只处理尚未提取过的附件'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='提取进程数，0 表示在当前进程中提取 (默认 CPU 核数)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='本次最多处理的附件数 (默认全部)',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='同时重试之前提取失败的附件',
+        )
+        parser.add_argument(
+            '--max-chars',
+            type=int,
+            help='每个附件最多保存的字数 (默认 settings.CRAWLER_ATTACHMENT_TEXT 中的 max_chars)',
+        )
+
+    def handle(self, *args, **options):
+        text_options = getattr(settings, 'CRAWLER_ATTACHMENT_TEXT', {})
+        max_chars = options.get('max_chars') or text_options.get('max_chars', 1_000_000)
+        store = AttachmentStore(getattr(settings, 'CRAWLER_ATTACHMENTS', {}).get('root', 'attachments'))
+        statuses = ['pending', 'failed'] if options['retry_failed'] else ['pending']
+        attachments = Attachment.objects.filter(
+            download_status='success', text_status__in=statuses, local_path__isnull=False
+        ).defer('extracted_text').order_by('id')
+        if options.get('limit'):
+            attachments = attachments[:options['limit']]
+        # 附件按内容寻址存放，同一文件被多篇文章引用时只提取一次
+        by_path = defaultdict(list)
+        for attachment in attachments:
+            by_path[attachment.local_path].append(attachment)
+        if not by_path:
+            self.stdout.write("没有需要提取文本的附件")
+            return
+
+        self.pending_writes = []
+        self.pending_chars = 0
+        stats = Counter()
+        stats['reused'] = sum(len(by_path.pop(path)) for path in self._reuse_extracted(by_path))
+
+        jobs = []
+        missing = Counter()
+        for path, rows in by_path.items():
+            extension = file_extension(path)
+            if extension not in EXTRACTORS:
+                # DOC/PPT/XLS/WPS 等旧的二进制格式
+                stats['unsupported'] += len(rows)
+                self._mark(rows, 'unsupported', error=extension or None)
+            elif package := missing_package(extension):
+                # 依赖未安装，保持 pending，安装后再运行即可补上
+                missing[package] += len(rows)
+            elif not store.path(path).exists():
+                stats['failed'] += len(rows)
+                self._mark(rows, 'failed', error='FileNotFound')
+            else:
+                jobs.append((path, str(store.path(path)), max_chars))
+        for package, count in missing.items():
+            self.stdout.write(self.style.WARNING(f"[缺少依赖] 未安装 {package}，{count} 个附件暂不提取"))
+
+        workers = max(0, options['workers'])
+        self.stdout.write(
+            f"共 {len(jobs)} 个文件待提取 ({f'{workers} 个进程' if workers else '当前进程'}，每个最多 {max_chars} 字)，"
+            f"{stats['reused']} 个附件的文件已提取过"
+        )
+        started = time.perf_counter()
+        for result in self._run(jobs, workers, text_options.get('max_tasks_per_child')):
+            rows = by_path[result.key]
+            stats['seconds'] += result.seconds
+            if result.error is not None:
+                stats['failed'] += len(rows)
+                self.stdout.write(self.style.ERROR(f"提取失败 {rows[0].filename}: {result.error}"))
+                self._mark(rows, 'failed', error=result.error)
+                continue
+            stats['done'] += len(rows)
+            stats['files'] += 1
+            stats['pages'] += result.pages
+            stats['chars'] += len(result.text)
+            stats['bytes'] += rows[0].file_size or 0
+            stats['truncated'] += result.truncated
+            self._mark(rows, 'done', text=result.text, pages=result.pages)
+        self._flush_writes()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write("=" * 60)
+        self.stdout.write(
+            f"完成 {stats['done']}（{stats['truncated']} 个文件超过字数上限只提取了前面部分），复用 {stats['reused']}，"
+            f"失败 {stats['failed']}，不支持的格式 {stats['unsupported']}，缺少依赖 {sum(missing.values())}"
+        )
+        if elapsed and stats['files']:
+            self.stdout.write(
+                f"耗时 {elapsed:.1f} s，{stats['files']} 个文件 ({stats['files'] / elapsed:.1f} 个/s)，"
+                f"{stats['pages']} 页 ({stats['pages'] / elapsed:.1f} 页/s)，"
+                f"{stats['bytes'] / 1024 / 1024:.1f} MB ({stats['bytes'] / 1024 / 1024 / elapsed:.2f} MB/s)，"
+                f"{stats['chars']} 字；单文件平均 {stats['seconds'] / stats['files'] * 1000:.0f} ms"
+            )
+
+    def _run(self, jobs, workers, max_tasks_per_child):
+        """按完成顺序产出 TextResult；进程池中同时最多在途 workers × 2 个文件，结果文本不会大量积压"""
+        if workers == 0:
+            yield from map(extract_file, jobs)
+            return
+        jobs = iter(jobs)
+        pending = set()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            # 定期重启子进程，释放解析库累积的内存（需要 spawn 方式启动）
+            mp_context=multiprocessing.get_context('spawn'),
+            max_tasks_per_child=max_tasks_per_child,
+        ) as executor:
+            for job in jobs:
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(extract_file, job))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def _reuse_extracted(self, by_path):
+        """同一文件已由其他附件记录提取过文本的，直接复制结果，返回这些文件路径"""
+        paths = list(by_path)
+        reused = set()
+        for start in range(0, len(paths), 500):
+            # 每个文件只取一条已提取的记录，不把重复的长文本都读出来
+            source_ids = Attachment.objects.filter(
+                local_path__in=paths[start:start + 500], text_status='done'
+            ).values('local_path').annotate(source_id=Min('id')).values_list('source_id', flat=True)
+            extracted = Attachment.objects.filter(id__in=list(source_ids)).values_list(
+                'local_path', 'extracted_text', 'text_pages'
+            )
+            for path, text, pages in extracted:
+                reused.add(path)
+                self._mark(by_path[path], 'done', text=text, pages=pages)
+        return reused
+
+    def _mark(self, rows, status, text=None, pages=None, error=None):
+        now = timezone.now()
+        for attachment in rows:
+            attachment.text_status = status
+            attachment.extracted_text = text
+            attachment.text_pages = pages
+            attachment.text_error = error[:100] if error else None
+            attachment.text_extracted_at = now
+            self.pending_writes.append(attachment)
+            self.pending_chars += len(text or '')
+        if len(self.pending_writes) >= WRITE_BATCH_SIZE or self.pending_chars >= WRITE_BATCH_CHARS:
+            self._flush_writes()
+
+    def _flush_writes(self):
+        if self.pending_writes:
+            with transaction.atomic():
+                Attachment.objects.bulk_update(self.pending_writes, TEXT_FIELDS)
+            self.pending_writes = []
+            self.pending_chars = 0
@@ -1,465 +1,270 @@
 # crawlers/management/commands/fetch_article_detail.py
 from django.core.management.base import BaseCommand
-from articles.models import Article
-import requests
-from bs4 import BeautifulSoup
-import re
-from datetime import datetime
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from articles.models import Article, Attachment
+from crawlers.models import PageSnapshot
+import time
+from collections import deque
 
-class Command(BaseCommand):
-    help = '为数据库中 content 为空的文章抓取详情页内容'
-
-    def handle(self, *args, **options):
-        # 获取所有 content 为空的文章
-        articles = Article.objects.filter(content='')
-
-        headers = {
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36 Edg/139.0.0.0'
-        }
-
-        for article in articles:
-            try:
-                self.stdout.write(f"正在处理: {article.title[:50]}...")
-
-                # 获取详情页HTML
-                response = requests.get(article.url, headers=headers, timeout=15)
-                response.raise_for_status()  # 检查HTTP错误
+from crawlers.utils.attachments import build_attachments
+from crawlers.utils.detail_extractor import get_detail_registry
+from crawlers.utils.detail_fetcher import ConcurrentPageFetcher
+from crawlers.utils.detail_retry import RetryPolicy, classify_error
+from crawlers.utils.host_scheduler import HostParkedError, HostScheduler
+from crawlers.utils.html_parser import available_backends, get_parser_backend
+from crawlers.utils.page_archive import PageArchive
+from crawlers.utils.parse_pool import DetailParser, DetailParseStage, StageMeter
+from crawlers.utils.selector_learning import SelectorLearner
+from crawlers.utils.static_fetcher import DEFAULT_HEADERS, StaticPageFetcher
 
-                soup = BeautifulSoup(response.text, 'lxml')
+# 文章抓取结果和页面存档记录每攒够这么多条写一次库
+WRITE_BATCH_SIZE = 100
+# 抓取结果写回的字段（content 只在成功时有变化）
+DETAIL_STATE_FIELDS = [
+    'detail_status', 'detail_attempts', 'detail_last_error', 'detail_last_attempt_at', 'detail_next_attempt_at',
+]
 
-                # 调用对应的解析函数
-                data = self.parse_article_by_url(soup, article.url, article.publish_date)
 
-                if data and data.get('content'):
-                    # 更新文章的 content 字段
-                    article.content = data['content']
-                    article.save(update_fields=['content'])
-                    self.stdout.write(self.style.SUCCESS(f"成功更新: {article.title[:50]}..."))
-                else:
-                    self.stdout.write(self.style.WARNING(f"未能提取内容: {article.title[:50]}..."))
-
-            except requests.RequestException as e:
-                self.stdout.write(self.style.ERROR(f"请求失败 {article.url}: {e}"))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"解析失败 {article.url}: {e}"))
-
-    def parse_article_by_url(self, soup, url, publish_date):
-        """
-        根据URL判断并调用相应的解析函数
-        """
-        try:
-            if 'www.ciecc.com.cn' in url:
-                return self.parse_ciecc_article(soup, url, publish_date)
-            elif 'nads.ruc.edu.cn' in url:
-                return self.parse_ruc_article(soup, url, publish_date)
-            elif 'www.drc.gov.cn' in url:
-                return self.parse_drc_article(soup, url, publish_date)
-            elif 'www.cas.cn' in url:
-                return self.parse_cas_article(soup, url, publish_date)
-            elif 'www.amr.org.cn' in url:
-                return self.parse_amr_article(soup, url, publish_date)
-            elif 'www.ccidgroup.com' in url:
-                return self.parse_ccid_article(soup, url, publish_date)
-            elif 'www.sass.org.cn' in url:
-                return self.parse_sass_article(soup, url, publish_date)
-            else:
-                self.stdout.write(f"未知网站，无法解析: {url}")
-                return None
-        except Exception as e:
-            self.stdout.write(f"解析页面 {url} 时发生错误: {e}")
-            return None
-
-    
-    def get_current_date():
-    """获取当前日期和时间"""
-    current_datetime = datetime.now()
-    current_date = current_datetime.date()
-    return current_date
-
-    def clean_text(self, text):
-        """清理文本内容，去除多余空白字符"""
-        if text:
-            text = re.sub(r'\s+', ' ', text.strip())
-            return text
-        return ''
+class Command(BaseCommand):
+    help = '为数据库中 content 为空的文章抓取详情页内容（失败的文章按指数退避重试）'
 
-    def generic_title_from_meta_or_h(self, soup: BeautifulSoup) -> str:
-        # meta 优先
-        meta_title = soup.select_one('meta[property="og:title"][content]') or soup.select_one('meta[name="title"][content]')
-        if meta_title and meta_title.get('content'):
-            return self.clean_text(meta_title['content'])
-        # h1/h2 次之
-        for sel in ['h1', '.title h1', '.article-title h1', '.arti_title', '.wp_article_title', 'h2']:
-            node = soup.select_one(sel)
-            if node and node.get_text(strip=True):
-                return self.clean_text(node.get_text())
-        # 最后用 <title>
-        if soup.title and soup.title.string:
-            return self.clean_text(soup.title.string)
-        return ''
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # HTML 解析后端，默认取 settings.CRAWLER_HTML_PARSER
+        self.html = get_parser_backend()
+        self.retry_policy = RetryPolicy.from_settings()
+        self.detail_registry = get_detail_registry()
+        # 各主机学到的标题/正文选择器，handle 中从数据库读入
+        self.selector_learner = None
+        # 页面存档（见 crawlers/utils/page_archive.py），handle 中按参数和配置创建
+        self.page_archive = None
+        # 主线程待批量写入的文章、存档记录和新发现的附件
+        self.pending_writes = []
+        self.pending_snapshots = []
+        self.pending_attachments = []
+        self.meter = None
 
-    def generic_content_by_candidates(self, soup: BeautifulSoup) -> str:
-        # 移除无关节点
-        for tag in soup(['script', 'style', 'noscript']):
-            tag.extract()
-        # 常见正文容器优先
-        candidate_selectors = [
-            '.TRS_Editor', '.v_news_content', '.wp_articlecontent', '.article-content',
-            '.content', '.article', '.text', '.detail-content', '#content', '.read', '.articleText'
-        ]
-        for sel in candidate_selectors:
-            node = soup.select_one(sel)
-            if node and node.get_text(strip=True):
-                return self.clean_text(node.get_text("\n"))
-        # 兜底：选择文本量最大的块级元素
-        max_text = ''
-        max_len = 0
-        for node in soup.find_all(['article', 'section', 'div']):
-            text = node.get_text("\n", strip=True)
-            tlen = len(text)
-            if tlen > max_len:
-                max_len = tlen
-                max_text = text
-        return self.clean_text(max_text)
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--parser',
+            choices=available_backends(),
+            help='HTML 解析后端 (默认 settings.CRAWLER_HTML_PARSER，即 lxml)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='同时进行的详情页请求数 (默认 8)',
+        )
+        parser.add_argument(
+            '--per-host',
+            type=int,
+            default=2,
+            help='同一网站同时进行的请求数 (默认 2)',
+        )
+        parser.add_argument(
+            '--host-rate',
+            type=float,
+            help='每个网站每秒最多请求数 (默认 settings.CRAWLER_HOST_SCHEDULER 中的 rate_per_second)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='本次最多处理的文章数 (默认全部)',
+        )
+        parser.add_argument(
+            '--time-budget',
+            type=float,
+            help='本次运行的时间上限（秒），到期后不再发起新请求，剩余文章留待下次运行 (默认不限)',
+        )
+        parser.add_argument(
+            '--parse-processes',
+            type=int,
+            default=0,
+            help='解析进程数，大批量补抓时设为 CPU 核数可用满多核 (默认 0，在一个解析线程中解析)',
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='不存档本次抓取的详情页 HTML (默认按 settings.CRAWLER_PAGE_ARCHIVE 存档)',
+        )
 
-    
-    def parse_ciecc_article(self, soup, url, publish_date):
-        """解析中国国际工程咨询有限公司的文章"""
-        try:
-            data = {}
-            data['title'] = soup.select('.comnewsl.fl tr')[0].text.strip()
-            data['url'] = url
-            data['publish_date'] = publish_date
-            data['authors'] = '中国国际工程咨询有限公司（智库建议）'
-            data['thinkank_name'] = '中国国际工程咨询有限公司'
-            data['summary'] = ''
-            data['content'] = soup.select('.bt_content')[0].text
-            data['attachments'] = ''
-            data['crawl_date'] = self.get_current_date()
-            return data
-        except (IndexError, AttributeError) as e:
-            self.stdout.write(f"解析中国国际工程咨询有限公司页面 {url} 失败: {e}")
-            return None
+    def handle(self, *args, **options):
+        if options.get('parser'):
+            self.html = get_parser_backend(options['parser'])
+        concurrency = max(1, options['concurrency'])
+        per_host = max(1, options['per_host'])
 
-    def parse_ruc_article(self, soup, url, publish_date):
-        """解析中国人民大学国家发展与战略研究院的文章"""
-        try:
-            data = {}
-            title_selectors = ['h1.title', '.article-title h1', '.content-title h1', 'h1', '.title']
-            content_selectors = ['.article-content', '.content-text', '.article-text', '.content', '.text']
+        # 待抓取（或已到重试时间）且 content 为空的文章，按发布日期从新到旧
+        now = timezone.now()
+        articles = Article.objects.filter(
+            Q(detail_next_attempt_at__isnull=True) | Q(detail_next_attempt_at__lte=now),
+            Q(content__isnull=True) | Q(content=''),
+            detail_status__in=['pending', 'retry'],
+        ).order_by(
+            F('publish_date').desc(nulls_last=True), '-id'
+        ).only('id', 'title', 'url', 'publish_date', 'content', *DETAIL_STATE_FIELDS)
+        if options.get('limit'):
+            articles = articles[:options['limit']]
+        articles = {article.id: article for article in articles}
+        if not articles:
+            self.stdout.write("没有需要抓取详情的文章")
+            return
+        parse_processes = max(0, options['parse_processes'])
+        self.stdout.write(
+            f"共 {len(articles)} 篇文章待抓取 (并发 {concurrency}，每个网站 {per_host}，"
+            f"{f'{parse_processes} 个解析进程' if parse_processes else '1 个解析线程'})"
+        )
 
-            title = ''
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
+        self.selector_learner = SelectorLearner.load()
+        self.page_archive = None if options.get('no_archive') else PageArchive.from_settings()
+        self.pending_snapshots = []
+        self.pending_writes = []
+        self.pending_attachments = []
+        self.meter = StageMeter()
+        stats = {
+            'success': 0, 'empty': 0, 'fetch_failed': 0, 'parse_failed': 0, 'parked': 0, 'dead': 0, 'bytes': 0,
+            'attachments': 0,
+        }
+        parked_hosts = set()
+        processed = 0
+        started = time.perf_counter()
+        deadline = time.monotonic() + options['time_budget'] if options.get('time_budget') else None
 
-            content = ''
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = self.clean_text(content_elem.get_text())
-                    break
+        scheduler = HostScheduler.from_settings(rate_per_second=options.get('host_rate'))
+        static_fetcher = StaticPageFetcher(headers=DEFAULT_HEADERS, pool_size=concurrency, scheduler=scheduler)
+        page_fetcher = ConcurrentPageFetcher(static_fetcher, concurrency=concurrency, per_host=per_host)
+        detail_parser = DetailParser(self.html, self.detail_registry, self.selector_learner, self.page_archive)
+        # 三个阶段：抓取线程只负责网络请求，解析在单独的线程或进程池中运行，数据库由主线程分批写入
+        pending_parses = deque()
+        with static_fetcher, DetailParseStage(detail_parser, parse_processes) as parse_stage:
+            jobs = ((article.id, article.url) for article in articles.values())
+            for result in page_fetcher.fetch_all(jobs, deadline=deadline):
+                article = articles[result.key]
+                processed += 1
+                if isinstance(result.error, HostParkedError):
+                    # 熔断主机的剩余文章留待下次运行（不计入失败次数），只提示一次
+                    stats['parked'] += 1
+                    if result.host not in parked_hosts:
+                        parked_hosts.add(result.host)
+                        self.stdout.write(self.style.WARNING(f"[熔断] {result.error}，跳过该网站剩余文章"))
+                    continue
+                self.meter.add('抓取', result.elapsed_in_seconds)
+                if result.error is not None:
+                    stats['fetch_failed'] += 1
+                    self.stdout.write(self.style.ERROR(f"请求失败 {article.url}: {result.error}"))
+                    self._record_failure(article, *classify_error(result.error), stats)
+                    continue
+                stats['bytes'] += result.size_in_bytes
 
-            if not title:
-                title = self.generic_title_from_meta_or_h(soup)
-            if not content:
-                content = self.generic_content_by_candidates(soup)
-            if not title or not content:
-                self.stdout.write(f"中国人民大学文章解析失败，标题或内容为空: {url}")
-                return None
+                pending_parses.append((article, parse_stage.submit(article.id, article.url, result.html)))
+                self.meter.sample('待解析', len(pending_parses))
+                # 已完成的解析结果立即处理；解析积压过多时等待，避免占用过多内存
+                while pending_parses and (
+                    pending_parses[0][1].done() or len(pending_parses) > parse_stage.workers * concurrency * 2
+                ):
+                    self._save_detail(*pending_parses.popleft(), stats)
 
-            data['title'] = title
-            data['url'] = url
-            data['publish_date'] = publish_date
-            data['authors'] = '中国人民大学国家发展与战略研究院'
-            data['thinkank_name'] = '中国人民大学国家发展与战略研究院'
-            data['summary'] = ''
-            data['content'] = content
-            data['attachments'] = ''
-            data['crawl_date'] = self.get_current_date()
-            return data
-        except Exception as e:
-            self.stdout.write(f"解析中国人民大学页面 {url} 失败: {e}")
-            return None
+            while pending_parses:
+                self._save_detail(*pending_parses.popleft(), stats)
+        self._flush_writes()
+        self.selector_learner.save()
 
-    def parse_drc_article(self, soup, url, publish_date):
-        """解析国务院发展研究中心的文章"""
-        try:
-            data = {}
-            # 尝试多种可能的选择器
-            title_selectors = [
-                '.article-title',
-                '.title',
-                'h1',
-                '.headline'
-            ]
-            
-            content_selectors = [
-                '.article-content',
-                '.content',
-                '.text',
-                '.article-text',
-                '.main-content'
-            ]
-            
-            # 获取标题
-            title = ''
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
-            
-            # 获取内容
-            content = ''
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = self.clean_text(content_elem.get_text())
-                    break
-            
-            if not title:
-                title = self.generic_title_from_meta_or_h(soup)
-            if not content:
-                content = self.generic_content_by_candidates(soup)
-            if not title or not content:
-                self.stdout.write(f"国务院发展研究中心文章解析失败，标题或内容为空: {url}")
-                return None
-                
-            data['title'] = title
-            data['url'] = url
-            data['publish_date'] = publish_date
-            data['authors'] = '国务院发展研究中心'
-            data['thinkank_name'] = '国务院发展研究中心'
-            data['summary'] = ''
-            data['content'] = content
-            data['attachments'] = ''
-            data['crawl_date'] = self.get_current_date()
-            return data
-        except Exception as e:
-            self.stdout.write(f"解析国务院发展研究中心页面 {url} 失败: {e}")
-            return None
+        unstarted = len(articles) - processed
+        if unstarted:
+            self.stdout.write(self.style.WARNING(f"[时间预算] 已用完，{unstarted} 篇文章留待下次运行"))
+        elapsed = time.perf_counter() - started
+        self._report_throughput(processed, stats, scheduler, elapsed)
+        for line in self.meter.report_lines(elapsed, {'抓取': concurrency, '解析': parse_stage.workers, '入库': 1}):
+            self.stdout.write(f"  [流水线] {line}")
 
-    def parse_cas_article(self, soup, url, publish_date):
-        """解析中国科学院的文章"""
-        try:
-            data = {}
-            # 尝试多种可能的选择器
-            title_selectors = [
-                '.article-title',
-                '.title',
-                'h1',
-                '.headline',
-                '.news-title'
-            ]
-            
-            content_selectors = [
-                '.article-content',
-                '.content',
-                '.text',
-                '.article-text',
-                '.news-content',
-                '.main-content'
-            ]
-            
-            # 获取标题
-            title = ''
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
-            
-            # 获取内容
-            content = ''
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = self.clean_text(content_elem.get_text())
-                    break
-            
-            if not title:
-                title = self.generic_title_from_meta_or_h(soup)
-            if not content:
-                content = self.generic_content_by_candidates(soup)
-            if not title or not content:
-                self.stdout.write(f"中国科学院文章解析失败，标题或内容为空: {url}")
-                return None
-                
-            data['title'] = title
-            data['url'] = url
-            data['publish_date'] = publish_date
-            data['authors'] = '中国科学院'
-            data['thinkank_name'] = '中国科学院'
-            data['summary'] = ''
-            data['content'] = content
-            data['attachments'] = ''
-            data['crawl_date'] = self.get_current_date()
-            return data
-        except Exception as e:
-            self.stdout.write(f"解析中国科学院页面 {url} 失败: {e}")
-            return None
-        def parse_amr_article(self, soup, url, publish_date):
-        """解析中国宏观经济研究院的文章"""
-        try:
-            data = {}
-            # 尝试多种可能的选择器
-            title_selectors = [
-                '.article-title',
-                '.title',
-                'h1',
-                '.headline',
-                '.news-title'
-            ]
-            
-            content_selectors = [
-                '.article-content',
-                '.content',
-                '.text',
-                '.article-text',
-                '.news-content',
-                '.main-content'
-            ]
-            
-            # 获取标题
-            title = ''
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
-            
-            # 获取内容
-            content = ''
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = self.clean_text(content_elem.get_text())
-                    break
-            
-            if not title:
-                title = self.generic_title_from_meta_or_h(soup)
-            if not content:
-                content = self.generic_content_by_candidates(soup)
-            if not title or not content:
-                self.stdout.write(f"中国宏观经济研究院文章解析失败，标题或内容为空: {url}")
-                return None
-                
-            data['title'] = title
-            data['url'] = url
-            data['publish_date'] = publish_date
-            data['authors'] = '中国宏观经济研究院'
-            data['thinkank_name'] = '中国宏观经济研究院'
-            data['summary'] = ''
-            data['content'] = content
-            data['attachments'] = ''
-            data['crawl_date'] = self.get_current_date()
-            return data
-        except Exception as e:
-            self.stdout.write(f"解析中国宏观经济研究院页面 {url} 失败: {e}")
-            return None
+    def _save_detail(self, article, parse_future, stats):
+        result = parse_future.result()
+        self.meter.add('解析', result.seconds)
+        self.selector_learner.apply_events(result.learner_events)
+        for message in result.messages:
+            self.stdout.write(self.style.WARNING(message))
+        if result.archived is not None:
+            self.pending_snapshots.append(self.page_archive.make_snapshot(
+                article.url, result.archived, 'detail', 'static', article_id=article.id
+            ))
+        if result.error is not None:
+            stats['parse_failed'] += 1
+            self._record_failure(article, result.error, False, stats)
+            return
 
-    def parse_ccid_article(self, soup, url, publish_date):
-        """解析CCiD赛迪研究院的文章"""
-        try:
-            data = {}
-            # 尝试多种可能的选择器
-            title_selectors = [
-                '.article-title',
-                '.title',
-                'h1',
-                '.headline',
-                '.news-title'
-            ]
-            
-            content_selectors = [
-                '.article-content',
-                '.content',
-                '.text',
-                '.article-text',
-                '.news-content',
-                '.main-content'
-            ]
-            
-            # 获取标题
-            title = ''
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
-            
-            # 获取内容
-            content = ''
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = self.clean_text(content_elem.get_text())
-                    break
-            
-            if not title:
-                title = self.generic_title_from_meta_or_h(soup)
-            if not content:
-                content = self.generic_content_by_candidates(soup)
-            if not title or not content:
-                self.stdout.write(f"CCiD赛迪研究院文章解析失败，标题或内容为空: {url}")
-                return None
-                
-            data['title'] = title
-            data['url'] = url
-            data['publish_date'] = publish_date
-            data['authors'] = 'CCiD赛迪研究院'
-            data['thinkank_name'] = 'CCiD赛迪研究院'
-            data['summary'] = ''
-            data['content'] = content
-            data['attachments'] = ''
-            data['crawl_date'] = self.get_current_date()
-            return data
-        except Exception as e:
-            self.stdout.write(f"解析CCiD赛迪研究院页面 {url} 失败: {e}")
-            return None
-            
-    def parse_sass_article(self, soup, url, publish_date):
-        """解析上海社会科学院的文章"""
-        try:
-            data = {}
-            title_selectors = ['.article-title', '.title', 'h1', '.headline', '.news-title']
-            content_selectors = ['.article-content', '.content', '.text', '.article-text', '.news-content', '.main-content']
+        if result.fields and result.fields.get('content'):
+            # 更新文章的 content 字段
+            article.content = result.fields['content']
+            article.detail_status = 'done'
+            article.detail_attempts += 1
+            article.detail_last_error = None
+            article.detail_last_attempt_at = timezone.now()
+            article.detail_next_attempt_at = None
+            attachments = build_attachments(article.id, result.fields['attachments'])
+            self.pending_attachments.extend(attachments)
+            stats['attachments'] += len(attachments)
+            self._queue_write(article)
+            stats['success'] += 1
+            self.stdout.write(self.style.SUCCESS(f"成功更新: {article.title[:50]}..."))
+        else:
+            stats['empty'] += 1
+            self.stdout.write(self.style.WARNING(f"未能提取内容: {article.title[:50]}..."))
+            self._record_failure(article, 'EmptyContent', False, stats)
 
-            title = ''
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = self.clean_text(title_elem.get_text())
-                    break
+    def _record_failure(self, article, error_class, permanent, stats):
+        """记录一次失败：按失败次数推迟下次抓取，永久失败或次数用尽时标记为 dead"""
+        now = timezone.now()
+        article.detail_attempts += 1
+        article.detail_last_error = error_class[:100]
+        article.detail_last_attempt_at = now
+        article.detail_next_attempt_at = None if permanent else self.retry_policy.next_attempt_at(
+            article.detail_attempts, now
+        )
+        article.detail_status = 'retry' if article.detail_next_attempt_at else 'dead'
+        if article.detail_status == 'dead':
+            stats['dead'] += 1
+        self._queue_write(article)
 
-            content = ''
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = self.clean_text(content_elem.get_text())
-                    break
+    def _queue_write(self, article):
+        self.pending_writes.append(article)
+        if len(self.pending_writes) + len(self.pending_snapshots) >= WRITE_BATCH_SIZE:
+            self._flush_writes()
 
-            if not title:
-                title = self.generic_title_from_meta_or_h(soup)
-            if not content:
-                content = self.generic_content_by_candidates(soup)
-            if not title or not content:
-                self.stdout.write(f"上海社会科学院文章解析失败，标题或内容为空: {url}")
-                return None
+    def _flush_writes(self):
+        """一个事务中批量写入文章的抓取结果、页面存档记录和新发现的附件"""
+        if not self.pending_writes and not self.pending_snapshots:
+            return
+        started = time.perf_counter()
+        with transaction.atomic():
+            if self.pending_writes:
+                Article.objects.bulk_update(self.pending_writes, ['content', *DETAIL_STATE_FIELDS])
+            if self.pending_snapshots:
+                PageSnapshot.objects.bulk_create(self.pending_snapshots)
+            if self.pending_attachments:
+                Attachment.objects.bulk_create(self.pending_attachments, ignore_conflicts=True)
+        self.meter.add('入库', time.perf_counter() - started, len(self.pending_writes))
+        self.pending_writes = []
+        self.pending_snapshots = []
+        self.pending_attachments = []
 
-            data['title'] = title
-            data['url'] = url
-            data['publish_date'] = publish_date
-            data['authors'] = '上海社会科学院'
-            data['thinkank_name'] = '上海社会科学院'
-            data['summary'] = ''
-            data['content'] = content
-            data['attachments'] = ''
-            data['crawl_date'] = self.get_current_date()
-            return data
-        except Exception as e:
-            self.stdout.write(f"解析上海社会科学院页面 {url} 失败: {e}")
-            return None
\ No newline at end of file
+    def _report_throughput(self, total, stats, scheduler, elapsed):
+        self.stdout.write("=" * 60)
+        self.stdout.write(
+            f"处理 {total} 篇: 成功 {stats['success']}，未提取到内容 {stats['empty']}，"
+            f"请求失败 {stats['fetch_failed']}，解析失败 {stats['parse_failed']}，网站熔断跳过 {stats['parked']}"
+        )
+        if stats['dead']:
+            self.stdout.write(f"其中 {stats['dead']} 篇永久失败或重试次数已用尽，今后不再抓取")
+        if stats['attachments']:
+            self.stdout.write(f"发现 {stats['attachments']} 个附件，运行 download_attachments 下载")
+        self.stdout.write(
+            f"耗时 {elapsed:.1f} s，{total / elapsed:.2f} 篇/秒，"
+            f"下载 {stats['bytes'] / 1024 / 1024:.1f} MB ({stats['bytes'] / 1024 / elapsed:.0f} KB/s)"
+        )
+        for line in scheduler.report_lines():
+            self.stdout.write(f"  {line}")
+        for line in self.selector_learner.report_lines():
+            self.stdout.write(f"  [选择器] {line}")
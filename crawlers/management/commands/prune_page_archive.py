@@ -0,0 +1,84 @@
+# crawlers/management/commands/prune_page_archive.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from crawlers.models import PageSnapshot
+from crawlers.utils.page_archive import PageArchive
+
+# 未被引用的存档文件和写入中断留下的临时文件超过该时间（秒）才删除：
+# 爬虫先写存档文件，PageSnapshot 记录攒够一批后才入库，避免误删正在运行的爬虫刚写入、尚未记录的文件
+STALE_TEMP_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = '清理页面存档：删除过期的抓取记录（每个 URL 保留最新一份）和不再被引用的存档文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='删除多少天之前的记录 (默认 settings.CRAWLER_PAGE_ARCHIVE 中的 retention_days)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='只统计将要删除的记录和文件，不实际删除',
+        )
+
+    def handle(self, *args, **options):
+        archive = PageArchive.from_settings()
+        if archive is None:
+            raise CommandError("页面存档未启用（settings.CRAWLER_PAGE_ARCHIVE）")
+        days = options.get('days')
+        if days is None:
+            days = getattr(settings, 'CRAWLER_PAGE_ARCHIVE', {}).get('retention_days', 180)
+        dry_run = options['dry_run']
+        cutoff = timezone.now() - timedelta(days=days)
+
+        # 过期记录中，同一 URL 最新的一份保留，保证每个页面至少能重新解析一次
+        latest_per_url = PageSnapshot.objects.filter(url=OuterRef('url')).order_by('-fetched_at', '-id').values('id')[:1]
+        expired = PageSnapshot.objects.filter(fetched_at__lt=cutoff).exclude(id=Subquery(latest_per_url))
+        expired_count = expired.count()
+        if not dry_run and expired_count:
+            expired.delete()
+        self.stdout.write(f"{'将删除' if dry_run else '已删除'} {expired_count} 条 {days} 天前的抓取记录")
+
+        # 没有任何记录引用的文件（dry-run 时按删除后的记录计算）
+        referenced = PageSnapshot.objects.all()
+        if dry_run:
+            referenced = referenced.exclude(id__in=expired.values('id'))
+        referenced = set(referenced.values_list('content_hash', flat=True).distinct().iterator())
+
+        orphan_count = orphan_bytes = recent_count = stale_count = 0
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        for digest, path in archive.iter_files():
+            if digest in referenced:
+                continue
+            stat = path.stat()
+            if stat.st_mtime >= stale_before:
+                recent_count += 1
+                continue
+            orphan_count += 1
+            orphan_bytes += stat.st_size
+            if not dry_run:
+                path.unlink(missing_ok=True)
+
+        if archive.root.exists():
+            for path in archive.root.glob('??/.tmp-*'):
+                if path.stat().st_mtime < stale_before:
+                    stale_count += 1
+                    orphan_bytes += path.stat().st_size
+                    if not dry_run:
+                        path.unlink(missing_ok=True)
+
+        self.stdout.write(
+            f"{'将删除' if dry_run else '已删除'} {orphan_count} 个未被引用的存档文件、{stale_count} 个残留临时文件，"
+            f"共 {orphan_bytes / 1024 / 1024:.1f} MB"
+        )
+        if recent_count:
+            self.stdout.write(f"{recent_count} 个未被引用的文件写入不到 {STALE_TEMP_SECONDS // 60} 分钟，可能属于正在运行的爬虫，本次保留")
@@ -0,0 +1,311 @@
+# crawlers/management/commands/reparse_articles.py
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from articles.models import Article, Attachment
+from crawlers.management.commands.crawl_thinktanks import Command as CrawlCommand
+from crawlers.models import CrawlTask, PageSnapshot
+from crawlers.utils.attachments import build_attachments
+from crawlers.utils.detail_extractor import DetailParserRegistry, get_detail_registry, normalize_host
+from crawlers.utils.html_parser import available_backends
+from crawlers.utils.list_extractor import get_list_rule
+from crawlers.utils.page_archive import PageArchive
+from crawlers.utils.reparse import init_worker, reparse_details, reparse_lists
+
+
+class Command(BaseCommand):
+    help = '从页面存档离线重新解析列表页和详情页，把解析结果写回已入库的文章（不访问网络）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            choices=['detail', 'list', 'all'],
+            default='all',
+            help='重新解析的页面类型: detail=详情页正文, list=列表页标题/日期/摘要, all=两者 (默认 all)',
+        )
+        parser.add_argument(
+            '--host',
+            help='只处理该网站的页面，如 www.cas.cn',
+        )
+        parser.add_argument(
+            '--handler',
+            help='只处理该解析规则（任务的 crawler_type，如 handler3）对应的页面；详情页按智库筛选，包括有任务使用该规则的智库的全部文章',
+        )
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='只处理该日期（含）之后存档的页面，格式 YYYY-MM-DD',
+        )
+        parser.add_argument(
+            '--until',
+            type=date.fromisoformat,
+            help='只处理该日期（含）之前存档的页面，格式 YYYY-MM-DD',
+        )
+        parser.add_argument(
+            '--parser',
+            choices=available_backends(),
+            help='HTML 解析后端 (默认 settings.CRAWLER_HTML_PARSER，即 lxml)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='解析进程数 (默认 CPU 核数)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50,
+            help='每次发给解析进程的页面数 (默认 50)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='每批写回数据库的文章数 (默认 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='只统计会有变化的文章，不写回数据库',
+        )
+
+    def handle(self, *args, **options):
+        archive = PageArchive.from_settings()
+        if archive is None:
+            raise CommandError("页面存档未启用（settings.CRAWLER_PAGE_ARCHIVE）")
+        parser_name = options.get('parser') or getattr(settings, 'CRAWLER_HTML_PARSER', 'lxml')
+        self.workers = max(1, options['workers'])
+        self.chunk_size = max(1, options['chunk_size'])
+        self.batch_size = max(1, options['batch_size'])
+        self.dry_run = options['dry_run']
+        self.host = normalize_host(options['host']) if options.get('host') else None
+
+        snapshots = PageSnapshot.objects.all()
+        if self.host:
+            # 先按子串粗筛，再按规范化后的主机名精确比较
+            snapshots = snapshots.filter(url__icontains=self.host)
+        if options.get('since'):
+            snapshots = snapshots.filter(fetched_at__date__gte=options['since'])
+        if options.get('until'):
+            snapshots = snapshots.filter(fetched_at__date__lte=options['until'])
+
+        self.stdout.write(
+            f"重新解析存档页面 (解析后端 {parser_name}，{self.workers} 个进程){'，仅统计不写回' if self.dry_run else ''}"
+        )
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            # 与 parse_pool 一致用 spawn，子进程不继承父进程的数据库连接和线程
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=(str(archive.root), archive.codec, parser_name),
+        ) as executor:
+            if options['kind'] in ('detail', 'all'):
+                detail_snapshots = snapshots.filter(kind='detail', article__isnull=False)
+                if options.get('handler'):
+                    # 详情页不记录来自哪个任务，按智库筛选：该智库有任一任务使用该规则即包括其全部文章；
+                    # 一个智库有多个任务时 JOIN 会产生重复行，需要 distinct
+                    detail_snapshots = detail_snapshots.filter(
+                        article__thinktank__crawltask__crawler_type=options['handler']
+                    ).distinct()
+                self._reparse_details(executor, detail_snapshots)
+            if options['kind'] in ('list', 'all'):
+                list_snapshots = snapshots.filter(kind='list', task__isnull=False)
+                if options.get('handler'):
+                    list_snapshots = list_snapshots.filter(task__crawler_type=options['handler'])
+                self._reparse_lists(executor, list_snapshots)
+
+    def _host_matches(self, url):
+        return self.host is None or DetailParserRegistry.host_key(url) == self.host
+
+    # --- 进程池调度 ---
+
+    def _run_in_pool(self, executor, function, jobs):
+        """
+        把任务按 chunk_size 分块提交给进程池，同时最多在途 workers × 2 块，避免一次性把所有任务排进队列；
+        按完成顺序产出每条结果
+        """
+        jobs = iter(jobs)
+        pending = set()
+        while True:
+            chunk = list(islice(jobs, self.chunk_size))
+            if not chunk:
+                break
+            if len(pending) >= self.workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            pending.add(executor.submit(function, chunk))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+    # --- 详情页 ---
+
+    def _detail_jobs(self, snapshots, stats):
+        """每篇文章只取最新一次存档"""
+        registry = get_detail_registry()
+        rows = snapshots.order_by('article_id', '-fetched_at', '-id').values_list('article_id', 'content_hash', 'url')
+        last_article_id = None
+        for article_id, digest, url in rows.iterator():
+            if article_id == last_article_id or not self._host_matches(url):
+                continue
+            last_article_id = article_id
+            profile = registry.get(url)
+            if profile is None:
+                stats['no_profile'] += 1
+                continue
+            yield article_id, digest, profile, url
+
+    def _reparse_details(self, executor, snapshots):
+        stats = {'pages': 0, 'changed': 0, 'unchanged': 0, 'empty': 0, 'errors': 0, 'no_profile': 0, 'attachments': 0}
+        started = time.perf_counter()
+        parsed = {}
+        for article_id, fields, error in self._run_in_pool(executor, reparse_details, self._detail_jobs(snapshots, stats)):
+            stats['pages'] += 1
+            if error is not None:
+                stats['errors'] += 1
+                self.stdout.write(self.style.ERROR(f"[详情] 文章 {article_id} 解析出错: {error}"))
+            elif fields is None:
+                stats['empty'] += 1
+            else:
+                parsed[article_id] = fields
+            if len(parsed) >= self.batch_size:
+                self._write_details(parsed, stats)
+                parsed = {}
+        self._write_details(parsed, stats)
+        self._report('详情页', stats, time.perf_counter() - started)
+        if stats['attachments']:
+            self.stdout.write(f"  {'将新增' if self.dry_run else '新增'} {stats['attachments']} 个附件，运行 download_attachments 下载")
+        if stats['no_profile']:
+            self.stdout.write(f"  {stats['no_profile']} 个存档页面没有对应的详情页配置，已跳过")
+
+    def _write_details(self, parsed, stats):
+        if not parsed:
+            return
+        changed = []
+        # 附件只新增不删除，已有的记录（按文章和 URL 唯一）保持原样
+        attachments = [
+            attachment
+            for article_id, fields in parsed.items()
+            for attachment in build_attachments(article_id, fields['attachments'])
+        ]
+        existing = set(Attachment.objects.filter(article_id__in=parsed).values_list('article_id', 'original_url'))
+        attachments = [a for a in attachments if (a.article_id, a.original_url) not in existing]
+        stats['attachments'] += len(attachments)
+        for article in Article.objects.filter(id__in=parsed).only('id', 'content', 'detail_status'):
+            content = parsed[article.id]['content']
+            if article.content == content and article.detail_status == 'done':
+                stats['unchanged'] += 1
+                continue
+            article.content = content
+            article.detail_status = 'done'
+            article.detail_last_error = None
+            article.detail_next_attempt_at = None
+            changed.append(article)
+        stats['changed'] += len(changed)
+        if (changed or attachments) and not self.dry_run:
+            with transaction.atomic():
+                Article.objects.bulk_update(
+                    changed, ['content', 'detail_status', 'detail_last_error', 'detail_next_attempt_at'],
+                    batch_size=self.batch_size,
+                )
+                Attachment.objects.bulk_create(attachments, batch_size=self.batch_size, ignore_conflicts=True)
+        self.stdout.write(f"[详情] 已解析 {stats['pages']} 页，{stats['changed']} 篇有变化")
+
+    # --- 列表页 ---
+
+    @staticmethod
+    def _task_rule(task):
+        """任务的列表页解析规则，同 crawl_thinktanks"""
+        try:
+            crawler_settings = json.loads(task.crawler_config).get('config', {})
+        except (json.JSONDecodeError, TypeError, AttributeError):
+            crawler_settings = {}
+        return get_list_rule(task.crawler_type, crawler_settings)
+
+    def _list_jobs(self, snapshots, stats):
+        """同一 URL 只取最新一次存档"""
+        rules = {task.id: self._task_rule(task) for task in CrawlTask.objects.all()}
+        rows = snapshots.order_by('url', '-fetched_at', '-id').values_list('id', 'url', 'content_hash', 'task_id')
+        last_url = None
+        for snapshot_id, url, digest, task_id in rows.iterator():
+            if url == last_url or not self._host_matches(url):
+                continue
+            last_url = url
+            rule = rules.get(task_id)
+            if rule is None:
+                stats['no_profile'] += 1
+                continue
+            yield snapshot_id, digest, rule, url
+
+    def _reparse_lists(self, executor, snapshots):
+        stats = {'pages': 0, 'items': 0, 'changed': 0, 'unchanged': 0, 'missing': 0, 'errors': 0, 'no_profile': 0}
+        started = time.perf_counter()
+        list_crawler = CrawlCommand(stdout=self.stdout, stderr=self.stderr)
+        parsed = {}
+        for snapshot_id, items, error in self._run_in_pool(executor, reparse_lists, self._list_jobs(snapshots, stats)):
+            stats['pages'] += 1
+            if error is not None:
+                stats['errors'] += 1
+                self.stdout.write(self.style.ERROR(f"[列表] 存档记录 {snapshot_id} 解析出错: {error}"))
+                continue
+            stats['items'] += len(items)
+            for item in items:
+                parsed[item['url']] = item
+            if len(parsed) >= self.batch_size:
+                self._write_list_items(parsed, list_crawler, stats)
+                parsed = {}
+        self._write_list_items(parsed, list_crawler, stats)
+        self._report('列表页', stats, time.perf_counter() - started)
+        if stats['missing']:
+            self.stdout.write(f"  {stats['missing']} 条不在数据库中，运行 crawl_thinktanks 入库")
+        if stats['no_profile']:
+            self.stdout.write(f"  {stats['no_profile']} 个存档页面的任务没有解析规则，已跳过")
+
+    def _write_list_items(self, parsed, list_crawler, stats):
+        """只更新列表页上能得到的字段（标题、发布日期、摘要），解析结果为空的字段保留原值"""
+        if not parsed:
+            return
+        changed = []
+        articles = Article.objects.filter(url__in=parsed).only('id', 'url', 'title', 'publish_date', 'summary')
+        found = 0
+        for article in articles:
+            found += 1
+            item = parsed[article.url]
+            title = item['title'][:255]
+            publish_date = list_crawler._parse_date(item.get('publish_date_str', ''))
+            summary = item.get('summary', '')[:500]
+            before = (article.title, article.publish_date, article.summary)
+            article.title = title or article.title
+            article.publish_date = publish_date or article.publish_date
+            article.summary = summary or article.summary
+            if (article.title, article.publish_date, article.summary) == before:
+                stats['unchanged'] += 1
+            else:
+                changed.append(article)
+        stats['missing'] += len(parsed) - found
+        stats['changed'] += len(changed)
+        if changed and not self.dry_run:
+            with transaction.atomic():
+                Article.objects.bulk_update(changed, ['title', 'publish_date', 'summary'], batch_size=self.batch_size)
+        self.stdout.write(f"[列表] 已解析 {stats['pages']} 页、{stats['items']} 条，{stats['changed']} 篇有变化")
+
+    def _report(self, label, stats, elapsed):
+        self.stdout.write("=" * 60)
+        self.stdout.write(
+            f"{label}: 解析 {stats['pages']} 页，耗时 {elapsed:.1f} s ({stats['pages'] / elapsed if elapsed else 0:.0f} 页/秒)，"
+            f"{'将更新' if self.dry_run else '已更新'} {stats['changed']} 篇，无变化 {stats['unchanged']} 篇，"
+            f"解析出错 {stats['errors']} 页"
+            + (f"，未提取到内容 {stats['empty']} 页" if 'empty' in stats else '')
+        )
@@ -0,0 +1,224 @@
+# crawlers/management/commands/run_scheduler.py
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+from django.utils import timezone
+
+from crawlers.models import CrawlTask
+from crawlers.management.commands.crawl_thinktanks import Command as CrawlCommand
+from crawlers.utils.html_parser import available_backends
+from crawlers.utils.task_schedule import SCHEDULE_TYPES, TaskSchedule
+
+
+class Command(BaseCommand):
+    help = (
+        '常驻运行的定时爬取：按任务的 schedule_type / schedule_time 到点执行（adaptive 任务按近期新文章数调整间隔），'
+        '停机期间错过的运行在启动后补跑一次'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='同时执行的任务数 (默认 2)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='检查到期任务的间隔（秒） (默认 settings.CRAWLER_SCHEDULER 中的 poll_seconds)',
+        )
+        parser.add_argument(
+            '--no-catch-up',
+            action='store_true',
+            help='启动时不补跑停机期间错过的运行，直接等待下一个时间点',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='执行完当前所有到期的任务后退出（可由 cron 定期调用）',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='列出各任务的下次运行时间后退出，不执行任务',
+        )
+        # 以下参数与 crawl_thinktanks 相同
+        parser.add_argument(
+            '--max-pages-per-browser',
+            type=int,
+            default=50,
+            help='单个浏览器会话打开多少页面后重启 (默认 50)',
+        )
+        parser.add_argument(
+            '--max-browser-rss-mb',
+            type=float,
+            default=1024,
+            help='浏览器进程内存超过该值 (MB) 时重启，需要安装 psutil (默认 1024)',
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            help='每个任务最多访问的列表页数，覆盖任务配置中的 max_pages（用于回溯历史文章）',
+        )
+        parser.add_argument(
+            '--host-rate',
+            type=float,
+            help='每个网站每秒最多请求数 (默认 settings.CRAWLER_HOST_SCHEDULER 中的 rate_per_second)',
+        )
+        parser.add_argument(
+            '--parser',
+            choices=available_backends(),
+            help='HTML 解析后端 (默认 settings.CRAWLER_HTML_PARSER，即 lxml)',
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='不存档本次抓取的列表页 HTML (默认按 settings.CRAWLER_PAGE_ARCHIVE 存档)',
+        )
+        parser.add_argument(
+            '--parse-processes',
+            type=int,
+            default=0,
+            help='列表页解析进程数，多个任务并行 (--workers) 时可用满多核 (默认 0，在任务线程中解析)',
+        )
+
+    def handle(self, *args, **options):
+        self.schedule = TaskSchedule.from_settings()
+        if options['list']:
+            self._list_schedule()
+            return
+
+        workers = max(1, options['workers'])
+        poll_seconds = options.get('poll_interval') or getattr(settings, 'CRAWLER_SCHEDULER', {}).get('poll_seconds', 60)
+        # 不补跑时，只执行启动之后才到的时间点
+        not_before = timezone.now() if options['no_catch_up'] else None
+        self.stop = threading.Event()
+        self.wake = threading.Event()
+        if not options['once']:
+            signal.signal(signal.SIGINT, self._request_stop)
+            signal.signal(signal.SIGTERM, self._request_stop)
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(
+            f"定时爬取已启动 (同时执行 {workers} 个任务，每 {poll_seconds:g} 秒检查一次"
+            f"{'，不补跑错过的运行' if not_before else ''})，Ctrl+C 或 SIGTERM 停止"
+        )
+        self.stdout.write("=" * 60)
+        self._list_schedule()
+
+        crawl = CrawlCommand()
+        crawl.stdout, crawl.stderr, crawl.style = self.stdout, self.stderr, self.style
+        crawl.open_pipeline(options, workers)
+        running = {}
+        # 本进程已派发过的 (任务, 时间点)，同一时间点不会因租约冲突等原因被反复派发
+        self.dispatched_slots = {}
+        stats = {'dispatched': 0, 'success': 0, 'failed': 0, 'saved': 0}
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scheduled') as executor:
+                while True:
+                    self._collect_finished(running, stats)
+                    if self.stop.is_set():
+                        break
+                    try:
+                        self._dispatch_due(crawl, executor, running, workers, not_before, stats)
+                    except DatabaseError as e:
+                        # 数据库暂时不可用（如 SQLite 锁库），下一轮再检查
+                        self.stdout.write(self.style.ERROR(f"[调度] 检查到期任务失败: {e}"))
+                    if options['once'] and not running:
+                        break
+                    # 有任务结束时提前醒来，派发等待空闲线程的到期任务
+                    self.wake.wait(poll_seconds)
+                    self.wake.clear()
+                if running:
+                    self.stdout.write(f"[调度] 正在停止，等待 {len(running)} 个执行中的任务结束")
+        finally:
+            self._collect_finished(running, stats)
+            crawl.close_pipeline(workers)
+            self.stdout.write(
+                f"[调度] 共执行 {stats['dispatched']} 次，成功 {stats['success']}，失败 {stats['failed']}，"
+                f"保存 {stats['saved']} 篇新文章"
+            )
+
+    def _request_stop(self, signum, frame):
+        self.stop.set()
+        self.wake.set()
+
+    def _scheduled_tasks(self):
+        return CrawlTask.objects.filter(is_active=True, schedule_type__in=SCHEDULE_TYPES).select_related('thinktank')
+
+    def _dispatch_due(self, crawl, executor, running, workers, not_before, stats):
+        """把到期任务交给线程池，最早错过的先执行；超出空闲线程数的留到有任务结束后再派发"""
+        now = timezone.now()
+        due = []
+        for task in self._scheduled_tasks():
+            if task.id in running:
+                continue
+            if task.lease_expires_at and task.lease_expires_at > now and task.lease_owner != crawl.leases.owner:
+                # 正在其他进程中执行，结束后 last_run 会更新，不再到期
+                continue
+            slot = self.schedule.due_slot(task, now)
+            if slot is None or (not_before is not None and slot < not_before) or self.dispatched_slots.get(task.id) == slot:
+                continue
+            due.append((slot, task))
+        due.sort(key=lambda entry: (entry[0], entry[1].id))
+        free = workers - len(running)
+        for index, (slot, task) in enumerate(due[:free], 1):
+            late = (now - slot).total_seconds()
+            self.stdout.write(
+                f"[调度] 执行 {task.task_name} (计划 {timezone.localtime(slot):%Y-%m-%d %H:%M}"
+                f"{f'，补跑，已晚 {late / 3600:.1f} 小时' if late > 3600 else ''})"
+            )
+            future = executor.submit(crawl._run_task_in_worker, task, index, min(len(due), free))
+            future.add_done_callback(lambda _: self.wake.set())
+            running[task.id] = (task, future)
+            self.dispatched_slots[task.id] = slot
+            stats['dispatched'] += 1
+        if len(due) > free:
+            self.stdout.write(f"[调度] 另有 {len(due) - max(free, 0)} 个到期任务等待空闲线程")
+
+    def _collect_finished(self, running, stats):
+        for task_id, (task, future) in list(running.items()):
+            if not future.done():
+                continue
+            del running[task_id]
+            try:
+                ok, saved_count = future.result()
+            except Exception as e:
+                # 任务线程中未捕获的异常只计为该任务失败，调度继续运行
+                self.stdout.write(self.style.ERROR(f"[调度] {task.task_name} 执行出错: {e}"))
+                ok, saved_count = False, 0
+            stats['success' if ok else 'failed'] += 1
+            stats['saved'] += saved_count
+            next_slot = self.schedule.next_slot(task, timezone.now())
+            self.stdout.write(
+                f"[调度] {task.task_name} 已结束，下次运行 {timezone.localtime(next_slot):%Y-%m-%d %H:%M}"
+            )
+
+    def _list_schedule(self):
+        now = timezone.now()
+        tasks = list(self._scheduled_tasks().order_by('id'))
+        if not tasks:
+            self.stdout.write(self.style.WARNING("[调度] 没有设置了定时运行的激活任务"))
+            return
+        self.stdout.write(f"{'ID':>4}  {'任务':<24}{'周期':<9}{'时间/间隔':<7}{'上次运行':<18}{'下次运行':<18}")
+        for task in tasks:
+            if not self.schedule.is_scheduled(task):
+                self.stdout.write(self.style.WARNING(
+                    f"{task.id:>4}  {task.task_name:<24}schedule_time 格式错误: {task.schedule_time!r}，应为 HH:MM"
+                ))
+                continue
+            due = self.schedule.due_slot(task, now) is not None
+            last_run = f"{timezone.localtime(task.last_run):%Y-%m-%d %H:%M}" if task.last_run else '从未运行'
+            next_run = '已到期' if due else f"{timezone.localtime(self.schedule.next_slot(task, now)):%Y-%m-%d %H:%M}"
+            if task.schedule_type == 'adaptive':
+                at = f"{self.schedule.interval(task).total_seconds() / 3600:.0f}h"
+            else:
+                at = task.schedule_time or '00:00'
+            self.stdout.write(
+                f"{task.id:>4}  {task.task_name:<24}{task.schedule_type:<9}{at:<7}{last_run:<18}{next_run:<18}"
+            )
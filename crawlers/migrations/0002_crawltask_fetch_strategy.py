@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crawlers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crawltask",
+            name="fetch_strategy",
+            field=models.CharField(
+                choices=[
+                    ("auto", "Auto"),
+                    ("static", "Static"),
+                    ("browser", "Browser"),
+                ],
+                default="auto",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="crawltask",
+            name="resolved_fetch_strategy",
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crawlers", "0002_crawltask_fetch_strategy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crawltask",
+            name="watermark_publish_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="crawltask",
+            name="watermark_url",
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+    ]
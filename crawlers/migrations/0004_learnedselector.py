@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crawlers", "0003_crawltask_watermark"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LearnedSelector",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("host", models.CharField(max_length=255)),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[("title", "Title"), ("content", "Content")],
+                        max_length=20,
+                    ),
+                ),
+                ("selector", models.CharField(max_length=255)),
+                ("hits", models.IntegerField(default=0)),
+                ("misses", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "learned_selectors",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("host", "field"),
+                        name="learned_selector_host_field_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0005_article_detail_fetch_state"),
+        ("crawlers", "0004_learnedselector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PageSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(max_length=500)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("list", "List Page"), ("detail", "Detail Page")],
+                        max_length=20,
+                    ),
+                ),
+                ("content_hash", models.CharField(db_index=True, max_length=64)),
+                ("fetched_at", models.DateTimeField()),
+                (
+                    "fetch_method",
+                    models.CharField(
+                        choices=[("static", "Static"), ("browser", "Browser")],
+                        max_length=20,
+                    ),
+                ),
+                ("is_fragment", models.BooleanField(default=False)),
+                ("size_in_bytes", models.IntegerField()),
+                ("compressed_size", models.IntegerField()),
+                (
+                    "article",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="articles.article",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="crawlers.crawltask",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "page_snapshots",
+                "indexes": [
+                    models.Index(
+                        fields=["url", "-fetched_at"], name="page_snapshot_url_idx"
+                    ),
+                    models.Index(
+                        fields=["fetched_at"], name="page_snapshot_fetched_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
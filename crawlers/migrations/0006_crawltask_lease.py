@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crawlers", "0005_pagesnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crawltask",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="crawltask",
+            name="lease_owner",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
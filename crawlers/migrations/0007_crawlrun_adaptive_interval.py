@@ -0,0 +1,79 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crawlers", "0006_crawltask_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crawltask",
+            name="adaptive_interval_hours",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="crawltask",
+            name="schedule_type",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("daily", "Daily"),
+                    ("weekly", "Weekly"),
+                    ("monthly", "Monthly"),
+                    ("adaptive", "Adaptive"),
+                    ("manual", "Manual"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="CrawlRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("success", "Success"), ("failed", "Failed")],
+                        max_length=20,
+                    ),
+                ),
+                ("full", models.BooleanField(default=False)),
+                ("pages", models.IntegerField(default=0)),
+                ("items", models.IntegerField(default=0)),
+                ("new_articles", models.IntegerField(default=0)),
+                ("duplicates", models.IntegerField(default=0)),
+                ("interval_hours", models.FloatField(blank=True, null=True)),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="crawlers.crawltask",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "crawl_runs",
+                "indexes": [
+                    models.Index(
+                        fields=["task", "-started_at"], name="crawl_run_task_idx"
+                    )
+                ],
+            },
+        ),
+    ]
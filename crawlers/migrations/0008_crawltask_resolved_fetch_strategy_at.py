@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crawlers", "0007_crawlrun_adaptive_interval"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crawltask",
+            name="resolved_fetch_strategy_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
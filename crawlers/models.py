@@ -5,6 +5,7 @@ class CrawlTask(models.Model):
         ('daily', 'Daily'),
         ('weekly', 'Weekly'),
         ('monthly', 'Monthly'),
+        ('adaptive', 'Adaptive'),
         ('manual', 'Manual'),
     ]
 
@@ -14,6 +15,12 @@ class CrawlTask(models.Model):
         ('running', 'Running'),
     ]
 
+    FETCH_STRATEGY_CHOICES = [
+        ('auto', 'Auto'),
+        ('static', 'Static'),
+        ('browser', 'Browser'),
+    ]
+
     task_name = models.CharField(max_length=100)
     start_url = models.URLField(max_length=500)
     crawler_type = models.CharField(max_length=50)
@@ -26,10 +33,109 @@ class CrawlTask(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     crawler_config = models.TextField(blank=True, null=True)  # JSON 格式
+    fetch_strategy = models.CharField(max_length=20, choices=FETCH_STRATEGY_CHOICES, default='auto')
+    resolved_fetch_strategy = models.CharField(max_length=20, blank=True, null=True)  # auto 模式下缓存的判定结果
+    resolved_fetch_strategy_at = models.DateTimeField(blank=True, null=True)  # 判定时间，判定为 browser 时定期重新判定
+    # 增量爬取水位线：已见过的最新文章
+    watermark_url = models.URLField(max_length=500, blank=True, null=True)
+    watermark_publish_date = models.DateField(blank=True, null=True)
+    # 运行租约：正在执行该任务的进程及租约到期时间，防止同一任务被多个进程同时执行（见 crawlers/utils/task_schedule.py）
+    lease_owner = models.CharField(max_length=100, blank=True, null=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+    # adaptive 任务的当前运行间隔（小时），每次成功运行后按近期新文章数重新计算（见 crawlers/utils/task_schedule.py）
+    adaptive_interval_hours = models.FloatField(blank=True, null=True)
     thinktank = models.ForeignKey('thinktanks.ThinkTank', on_delete=models.CASCADE)
 
     def __str__(self):
         return self.task_name
 
     class Meta:
-        db_table = 'crawl_tasks'
\ No newline at end of file
+        db_table = 'crawl_tasks'
+
+
+class CrawlRun(models.Model):
+    """任务的一次运行记录，adaptive 任务据此计算运行间隔"""
+    STATUS_CHOICES = [
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.ForeignKey(CrawlTask, on_delete=models.CASCADE)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    full = models.BooleanField(default=False)  # 全量爬取（--full），新文章数不代表网站的更新频率
+    pages = models.IntegerField(default=0)
+    items = models.IntegerField(default=0)
+    new_articles = models.IntegerField(default=0)
+    duplicates = models.IntegerField(default=0)
+    interval_hours = models.FloatField(blank=True, null=True)  # 本次运行后计算出的 adaptive 间隔
+
+    def __str__(self):
+        return f"{self.task_id} @ {self.started_at:%Y-%m-%d %H:%M}: {self.new_articles}"
+
+    class Meta:
+        db_table = 'crawl_runs'
+        indexes = [
+            models.Index(fields=['task', '-started_at'], name='crawl_run_task_idx'),
+        ]
+
+
+class LearnedSelector(models.Model):
+    """详情页解析时每个主机上实际命中的选择器，下次优先尝试（见 crawlers/utils/selector_learning.py）"""
+    FIELD_CHOICES = [
+        ('title', 'Title'),
+        ('content', 'Content'),
+    ]
+
+    host = models.CharField(max_length=255)  # 规范化后的主机名，见 detail_extractor.normalize_host
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    selector = models.CharField(max_length=255)  # '*generic*' 表示使用通用兜底规则
+    hits = models.IntegerField(default=0)
+    misses = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.host} {self.field}: {self.selector}"
+
+    class Meta:
+        db_table = 'learned_selectors'
+        constraints = [
+            models.UniqueConstraint(fields=['host', 'field'], name='learned_selector_host_field_unique'),
+        ]
+
+
+
+class PageSnapshot(models.Model):
+    """一次页面抓取的存档记录，HTML 按 content_hash 存放在 PageArchive 目录中（见 crawlers/utils/page_archive.py）"""
+    KIND_CHOICES = [
+        ('list', 'List Page'),
+        ('detail', 'Detail Page'),
+    ]
+
+    FETCH_METHOD_CHOICES = [
+        ('static', 'Static'),
+        ('browser', 'Browser'),
+    ]
+
+    url = models.URLField(max_length=500)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    content_hash = models.CharField(max_length=64, db_index=True)
+    fetched_at = models.DateTimeField()
+    fetch_method = models.CharField(max_length=20, choices=FETCH_METHOD_CHOICES)
+    # 浏览器只取回了列表容器等片段（见 TaskPageFetcher.fragment_selectors），而不是完整页面
+    is_fragment = models.BooleanField(default=False)
+    size_in_bytes = models.IntegerField()
+    compressed_size = models.IntegerField()
+    task = models.ForeignKey(CrawlTask, on_delete=models.SET_NULL, blank=True, null=True)
+    article = models.ForeignKey('articles.Article', on_delete=models.SET_NULL, blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.url} @ {self.fetched_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        db_table = 'page_snapshots'
+        indexes = [
+            models.Index(fields=['url', '-fetched_at'], name='page_snapshot_url_idx'),
+            models.Index(fields=['fetched_at'], name='page_snapshot_fetched_idx'),
+        ]
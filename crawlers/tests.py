@@ -1,3 +1,756 @@
-from django.test import TestCase
+import hashlib
+import re
+import tempfile
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from articles.models import Article
+
+from crawlers.management.commands.crawl_thinktanks import Command as CrawlCommand
+from crawlers.management.commands.run_scheduler import Command as SchedulerCommand
+from crawlers.utils.attachment_text import extract_text
+from crawlers.utils.attachments import AttachmentDownloader, AttachmentStore
+from crawlers.utils.detail_retry import RetryPolicy, classify_error
+from crawlers.utils.host_scheduler import HostParkedError, HostScheduler
+from crawlers.utils.html_parser import available_backends, get_parser_backend
+from crawlers.utils.list_extractor import HANDLER_RULES, extract_list_items
+from crawlers.utils.page_fetcher import TaskPageFetcher
+from crawlers.utils.task_schedule import AdaptiveInterval, TaskSchedule, parse_schedule_time
+from thinktanks.models import ThinkTank
+
+
+class ExtractTextTests(SimpleTestCase):
+    def _extract(self, pages, max_chars):
+        with mock.patch('crawlers.utils.attachment_text.iter_pages', return_value=iter(pages)):
+            return extract_text('report.pdf', max_chars)
+
+    def test_not_truncated_when_text_fits(self):
+        text, pages, truncated = self._extract(['aaa', 'bbb'], 8)
+        self.assertEqual(text, 'aaa\n\nbbb')
+        self.assertEqual(pages, 2)
+        self.assertFalse(truncated)
+
+    def test_truncated_text_never_exceeds_max_chars(self):
+        # 分隔页的空行也计入长度
+        for max_chars in range(1, 12):
+            text, _, truncated = self._extract(['aaa', 'bbb', 'ccc'], max_chars)
+            self.assertLessEqual(len(text), max_chars)
+            self.assertTrue(truncated)
+
+    def test_separator_reaching_cap_adds_no_empty_piece(self):
+        text, pages, truncated = self._extract(['aaa', 'bbb'], 5)
+        self.assertEqual(text, 'aaa')
+        self.assertEqual(pages, 2)
+        self.assertTrue(truncated)
+
+    def test_stops_reading_pages_after_cap(self):
+        text, pages, truncated = self._extract(['aaaa', 'bbbb', 'cccc'], 7)
+        self.assertEqual(text, 'aaaa\n\nb')
+        self.assertEqual(pages, 2)
+        self.assertTrue(truncated)
+
+    def test_blank_pages_are_counted_but_skipped(self):
+        text, pages, truncated = self._extract(['aaa', '  \n ', 'bbb'], 100)
+        self.assertEqual(text, 'aaa\n\nbbb')
+        self.assertEqual(pages, 3)
+        self.assertFalse(truncated)
+
+
+class HostSchedulerTests(SimpleTestCase):
+    def setUp(self):
+        # 固定时钟，令牌不会随测试耗时补充
+        patcher = mock.patch('crawlers.utils.host_scheduler.time.monotonic', return_value=1000.0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = HostScheduler(
+            rate_per_second=2.0, burst=2, min_rate_per_second=0.1, increase_step=0.5, decrease_factor=0.5,
+            slow_response_seconds=10, max_consecutive_failures=3,
+        )
+
+    def rate(self, host='example.com'):
+        return self.scheduler.stats()[host]['rate']
+
+    def test_token_bucket_allows_burst_then_waits(self):
+        self.assertTrue(self.scheduler.try_acquire('example.com'))
+        self.assertTrue(self.scheduler.try_acquire('example.com'))
+        self.assertFalse(self.scheduler.try_acquire('example.com'))
+        self.assertAlmostEqual(self.scheduler.wait_time('example.com'), 0.5)
+        self.clock.return_value += 0.5
+        self.assertTrue(self.scheduler.try_acquire('example.com'))
+
+    def test_host_rates_override_default(self):
+        scheduler = HostScheduler(rate_per_second=2.0, host_rates={'Slow.example.com': 0.5})
+        scheduler.try_acquire('slow.example.com')
+        self.assertEqual(scheduler.stats()['slow.example.com']['configured_rate'], 0.5)
+
+    def test_server_error_halves_rate_down_to_minimum(self):
+        self.scheduler.record('example.com', 0.1, ok=False, status_code=500)
+        self.assertAlmostEqual(self.rate(), 1.0)
+        scheduler = HostScheduler(rate_per_second=0.15, min_rate_per_second=0.1)
+        scheduler.record('example.com', 0.1, ok=False)
+        self.assertAlmostEqual(scheduler.stats()['example.com']['rate'], 0.1)
+
+    def test_success_increases_rate_up_to_configured(self):
+        self.scheduler.record('example.com', 0.1, ok=False, status_code=503)
+        self.scheduler.record('example.com', 0.1, ok=False, status_code=503)
+        self.assertAlmostEqual(self.rate(), 0.5)
+        self.scheduler.record('example.com', 0.1, ok=True)
+        self.assertAlmostEqual(self.rate(), 1.0)
+        for _ in range(5):
+            self.scheduler.record('example.com', 0.1, ok=True)
+        self.assertAlmostEqual(self.rate(), 2.0)
+
+    def test_slow_success_decreases_rate(self):
+        self.scheduler.record('example.com', 11, ok=True)
+        self.assertAlmostEqual(self.rate(), 1.0)
+        self.assertEqual(self.scheduler.stats()['example.com']['slow'], 1)
+
+    def test_client_error_does_not_back_off(self):
+        for _ in range(5):
+            self.scheduler.record('example.com', 0.1, ok=False, status_code=404)
+        self.assertAlmostEqual(self.rate(), 2.0)
+        self.assertFalse(self.scheduler.is_parked('example.com'))
+
+    def test_retry_after_delays_next_request(self):
+        self.scheduler.record('example.com', 0.1, ok=False, status_code=429, retry_after='30')
+        self.assertAlmostEqual(self.scheduler.wait_time('example.com'), 30)
+        self.assertFalse(self.scheduler.try_acquire('example.com'))
+        self.clock.return_value += 30
+        self.assertTrue(self.scheduler.try_acquire('example.com'))
+
+    def test_retry_after_is_capped_and_dates_ignored(self):
+        self.scheduler.record('a.example.com', 0.1, ok=False, status_code=503, retry_after='86400')
+        self.assertAlmostEqual(self.scheduler.wait_time('a.example.com'), 300)
+        self.scheduler.record(
+            'b.example.com', 0.1, ok=False, status_code=503, retry_after='Wed, 21 Oct 2026 07:28:00 GMT'
+        )
+        self.assertEqual(self.scheduler.wait_time('b.example.com'), 0)
+
+    def test_consecutive_failures_park_host(self):
+        for _ in range(2):
+            self.scheduler.record('example.com', 0.1, ok=False)
+        self.assertFalse(self.scheduler.is_parked('example.com'))
+        self.scheduler.record('example.com', 0.1, ok=False, status_code=502)
+        self.assertTrue(self.scheduler.is_parked('example.com'))
+        self.assertEqual(self.scheduler.wait_time('example.com'), float('inf'))
+        with self.assertRaises(HostParkedError):
+            self.scheduler.try_acquire('example.com')
+        # 熔断只影响该主机
+        self.assertTrue(self.scheduler.try_acquire('other.example.com'))
+
+    def test_success_resets_consecutive_failures(self):
+        for _ in range(2):
+            self.scheduler.record('example.com', 0.1, ok=False)
+        self.scheduler.record('example.com', 0.1, ok=True)
+        for _ in range(2):
+            self.scheduler.record('example.com', 0.1, ok=False)
+        self.assertFalse(self.scheduler.is_parked('example.com'))
+
+
+class RetryPolicyTests(SimpleTestCase):
+    def test_delay_doubles_from_base(self):
+        policy = RetryPolicy(base_delay_minutes=60, max_delay_hours=168, max_attempts=6)
+        self.assertEqual(policy.delay(0), timedelta(hours=1))
+        self.assertEqual(policy.delay(1), timedelta(hours=1))
+        self.assertEqual(policy.delay(2), timedelta(hours=2))
+        self.assertEqual(policy.delay(4), timedelta(hours=8))
+
+    def test_delay_capped_at_max(self):
+        policy = RetryPolicy(base_delay_minutes=60, max_delay_hours=5, max_attempts=10)
+        self.assertEqual(policy.delay(3), timedelta(hours=4))
+        self.assertEqual(policy.delay(4), timedelta(hours=5))
+        self.assertEqual(policy.delay(9), timedelta(hours=5))
+
+    def test_next_attempt_until_attempts_exhausted(self):
+        policy = RetryPolicy(base_delay_minutes=30, max_delay_hours=168, max_attempts=3)
+        now = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(policy.next_attempt_at(1, now), now + timedelta(minutes=30))
+        self.assertEqual(policy.next_attempt_at(2, now), now + timedelta(minutes=60))
+        self.assertIsNone(policy.next_attempt_at(3, now))
+        self.assertIsNone(policy.next_attempt_at(4, now))
+
+    def test_from_settings(self):
+        with self.settings(CRAWLER_DETAIL_RETRY={'max_attempts': 2}):
+            self.assertEqual(RetryPolicy.from_settings(), RetryPolicy(max_attempts=2))
+
+
+class ClassifyErrorTests(SimpleTestCase):
+    def http_error(self, status_code):
+        response = requests.Response()
+        response.status_code = status_code
+        return requests.HTTPError(response=response)
+
+    def test_missing_pages_are_permanent(self):
+        self.assertEqual(classify_error(self.http_error(404)), ('HTTPError 404', True))
+        self.assertEqual(classify_error(self.http_error(410)), ('HTTPError 410', True))
+
+    def test_other_status_codes_are_retried(self):
+        self.assertEqual(classify_error(self.http_error(403)), ('HTTPError 403', False))
+        self.assertEqual(classify_error(self.http_error(503)), ('HTTPError 503', False))
+
+    def test_other_errors_classified_by_type(self):
+        self.assertEqual(classify_error(requests.Timeout()), ('Timeout', False))
+        self.assertEqual(classify_error(requests.ConnectionError()), ('ConnectionError', False))
+        self.assertEqual(classify_error(requests.HTTPError()), ('HTTPError', False))
+        self.assertEqual(classify_error(ValueError('bad')), ('ValueError', False))
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def scheduled_task(schedule_type, schedule_time='09:00', last_run=None, adaptive_interval_hours=None):
+    """TaskSchedule 只读取这几个字段"""
+    return SimpleNamespace(
+        schedule_type=schedule_type, schedule_time=schedule_time, last_run=last_run,
+        adaptive_interval_hours=adaptive_interval_hours,
+    )
+
+
+@override_settings(TIME_ZONE='UTC')
+class TaskScheduleTests(SimpleTestCase):
+    def setUp(self):
+        self.schedule = TaskSchedule(weekly_day=0, monthly_day=31, adaptive_initial_hours=24)
+
+    def test_parse_schedule_time(self):
+        self.assertEqual(parse_schedule_time('7:30').isoformat(), '07:30:00')
+        self.assertEqual(parse_schedule_time('09:00:15').isoformat(), '09:00:15')
+        self.assertEqual(parse_schedule_time('').isoformat(), '00:00:00')
+        self.assertIsNone(parse_schedule_time('9am'))
+
+    def test_unscheduled_tasks_have_no_slots(self):
+        now = utc(2026, 3, 4, 8)
+        for task in (scheduled_task('manual'), scheduled_task(None), scheduled_task('daily', 'bad')):
+            self.assertIsNone(self.schedule.due_slot(task, now))
+            self.assertIsNone(self.schedule.next_slot(task, now))
+
+    def test_daily_slots(self):
+        task = scheduled_task('daily')
+        now = utc(2026, 3, 4, 8)
+        self.assertEqual(self.schedule.latest_slot(task, now), utc(2026, 3, 3, 9))
+        self.assertEqual(self.schedule.next_slot(task, now), utc(2026, 3, 4, 9))
+        # 正好到点时算作已到
+        self.assertEqual(self.schedule.latest_slot(task, utc(2026, 3, 4, 9)), utc(2026, 3, 4, 9))
+        self.assertEqual(self.schedule.next_slot(task, utc(2026, 3, 4, 9)), utc(2026, 3, 5, 9))
+
+    def test_due_only_when_slot_after_last_run(self):
+        now = utc(2026, 3, 4, 10)
+        self.assertEqual(self.schedule.due_slot(scheduled_task('daily'), now), utc(2026, 3, 4, 9))
+        ran_after_slot = scheduled_task('daily', last_run=utc(2026, 3, 4, 9, 5))
+        self.assertIsNone(self.schedule.due_slot(ran_after_slot, now))
+        ran_before_slot = scheduled_task('daily', last_run=utc(2026, 3, 4, 8, 55))
+        self.assertEqual(self.schedule.due_slot(ran_before_slot, now), utc(2026, 3, 4, 9))
+
+    def test_missed_slots_run_once(self):
+        # 停机三天，只补跑最近的一个时间点
+        task = scheduled_task('daily', last_run=utc(2026, 3, 1, 9))
+        self.assertEqual(self.schedule.due_slot(task, utc(2026, 3, 4, 10)), utc(2026, 3, 4, 9))
+
+    def test_weekly_slots(self):
+        task = scheduled_task('weekly')
+        wednesday = utc(2026, 3, 4, 8)
+        self.assertEqual(self.schedule.latest_slot(task, wednesday), utc(2026, 3, 2, 9))
+        self.assertEqual(self.schedule.next_slot(task, wednesday), utc(2026, 3, 9, 9))
+        # 周一到点之前，最近的时间点在上一周
+        monday = utc(2026, 3, 9, 8)
+        self.assertEqual(self.schedule.latest_slot(task, monday), utc(2026, 3, 2, 9))
+        self.assertEqual(self.schedule.next_slot(task, monday), utc(2026, 3, 9, 9))
+
+    def test_weekly_slot_on_sunday_across_year_end(self):
+        schedule = TaskSchedule(weekly_day=6)
+        task = scheduled_task('weekly', '23:00')
+        now = utc(2026, 1, 2, 12)
+        self.assertEqual(schedule.latest_slot(task, now), utc(2025, 12, 28, 23))
+        self.assertEqual(schedule.next_slot(task, now), utc(2026, 1, 4, 23))
+
+    def test_monthly_day_clamped_to_month_end(self):
+        task = scheduled_task('monthly')
+        self.assertEqual(self.schedule.next_slot(task, utc(2026, 2, 10)), utc(2026, 2, 28, 9))
+        self.assertEqual(self.schedule.next_slot(task, utc(2028, 2, 10)), utc(2028, 2, 29, 9))
+        self.assertEqual(self.schedule.next_slot(task, utc(2026, 4, 10)), utc(2026, 4, 30, 9))
+        self.assertEqual(self.schedule.latest_slot(task, utc(2026, 3, 10)), utc(2026, 2, 28, 9))
+
+    def test_monthly_slots_across_year_end(self):
+        task = scheduled_task('monthly')
+        self.assertEqual(self.schedule.next_slot(task, utc(2026, 12, 31, 10)), utc(2027, 1, 31, 9))
+        self.assertEqual(self.schedule.latest_slot(task, utc(2027, 1, 15)), utc(2026, 12, 31, 9))
+
+    @override_settings(TIME_ZONE='Asia/Shanghai')
+    def test_slots_use_local_time(self):
+        task = scheduled_task('daily')
+        # 北京时间 3 月 4 日 08:00，当天 09:00 未到
+        self.assertEqual(self.schedule.next_slot(task, utc(2026, 3, 4, 0)), utc(2026, 3, 4, 1))
+        self.assertEqual(self.schedule.latest_slot(task, utc(2026, 3, 4, 0)), utc(2026, 3, 3, 1))
+
+    def test_adaptive_slots(self):
+        now = utc(2026, 3, 4, 12)
+        self.assertEqual(self.schedule.due_slot(scheduled_task('adaptive'), now), now)
+        task = scheduled_task('adaptive', last_run=utc(2026, 3, 4, 0), adaptive_interval_hours=6)
+        self.assertEqual(self.schedule.due_slot(task, now), utc(2026, 3, 4, 6))
+        task = scheduled_task('adaptive', last_run=utc(2026, 3, 4, 0))
+        self.assertIsNone(self.schedule.due_slot(task, now))
+        self.assertEqual(self.schedule.next_slot(task, now), utc(2026, 3, 5, 0))
+
+
+class AdaptiveIntervalTests(SimpleTestCase):
+    def setUp(self):
+        self.adaptive = AdaptiveInterval(
+            min_hours=6, max_hours=96, initial_hours=24, backoff_factor=2.0, target_new_per_run=2, window_runs=10
+        )
+
+    def runs(self, *new_articles, hours_apart=24):
+        """从新到旧的运行记录，相邻两次间隔 hours_apart 小时"""
+        newest = utc(2026, 3, 10)
+        return [
+            SimpleNamespace(new_articles=count, started_at=newest - timedelta(hours=hours_apart * index))
+            for index, count in enumerate(new_articles)
+        ]
+
+    def test_without_history_keeps_current_interval(self):
+        self.assertEqual(self.adaptive.next_interval(12, []), 12)
+        self.assertEqual(self.adaptive.next_interval(None, []), 24)
+        self.assertEqual(self.adaptive.next_interval(500, []), 96)
+
+    def test_no_new_articles_backs_off_up_to_max(self):
+        self.assertEqual(self.adaptive.next_interval(24, self.runs(0, 3)), 48)
+        self.assertEqual(self.adaptive.next_interval(72, self.runs(0, 3)), 96)
+
+    def test_single_run_with_new_articles_shortens_interval(self):
+        self.assertEqual(self.adaptive.next_interval(24, self.runs(5)), 12)
+        self.assertEqual(self.adaptive.next_interval(8, self.runs(5)), 6)
+
+    def test_interval_from_publishing_rate(self):
+        # 最早一次运行的新文章不计入：6 篇 / 48 小时，攒够 2 篇需要 16 小时
+        self.assertAlmostEqual(self.adaptive.next_interval(24, self.runs(4, 2, 9)), 16)
+
+    def test_interval_from_rate_is_clamped(self):
+        self.assertEqual(self.adaptive.next_interval(24, self.runs(40, 40, 1)), 6)
+        self.assertEqual(self.adaptive.next_interval(24, self.runs(1, 0, 0, 0, 0, 5)), 96)
+
+    def test_zero_span_shortens_interval(self):
+        self.assertEqual(self.adaptive.next_interval(24, self.runs(3, 3, hours_apart=0)), 12)
+
+
+class TaskPageFetcherStrategyTests(SimpleTestCase):
+    LIST_PAGE = '<html><body><ul class="list"><li>a</li></ul></body></html>'
+    BLOCKED_PAGE = '<html><body>请稍后再试</body></html>'
+
+    def fetcher(self, pages, resolved_strategy=None):
+        static_fetcher = mock.Mock()
+        static_fetcher.fetch.side_effect = lambda url: pages[url]
+        fetcher = TaskPageFetcher(
+            browser_pool=None, static_fetcher=static_fetcher, strategy='auto',
+            resolved_strategy=resolved_strategy, content_selector='.list',
+        )
+        patcher = mock.patch.object(fetcher, 'fetch_with_browser', return_value=self.LIST_PAGE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return fetcher
+
+    def test_first_page_decides_static(self):
+        fetcher = self.fetcher({'http://a/1': self.LIST_PAGE})
+        self.assertEqual(fetcher.fetch('http://a/1'), self.LIST_PAGE)
+        self.assertEqual(fetcher.last_method, 'static')
+        self.assertEqual(fetcher.resolved_strategy, 'static')
+        self.assertTrue(fetcher.strategy_decided)
+
+    def test_first_page_decides_browser(self):
+        fetcher = self.fetcher({'http://a/1': self.BLOCKED_PAGE})
+        fetcher.fetch('http://a/1')
+        self.assertEqual(fetcher.resolved_strategy, 'browser')
+        self.assertTrue(fetcher.strategy_decided)
+        fetcher.fetch_with_browser.assert_called_once_with('http://a/1')
+
+    def test_extra_page_falls_back_without_changing_decision(self):
+        # 翻页规则生成的页面已超出最后一页
+        fetcher = self.fetcher({'http://a/1': self.LIST_PAGE, 'http://a/9': self.BLOCKED_PAGE})
+        fetcher.fetch('http://a/1')
+        fetcher.fetch('http://a/9', is_extra=True)
+        fetcher.fetch_with_browser.assert_called_once_with('http://a/9')
+        self.assertEqual(fetcher.resolved_strategy, 'static')
+
+    def test_only_first_page_decides(self):
+        fetcher = self.fetcher({'http://a/1': self.LIST_PAGE, 'http://a/2': self.BLOCKED_PAGE})
+        fetcher.fetch('http://a/1')
+        fetcher.fetch('http://a/2')
+        self.assertEqual(fetcher.resolved_strategy, 'static')
+
+    def test_extra_pages_alone_do_not_decide(self):
+        fetcher = self.fetcher({'http://a/2': self.BLOCKED_PAGE}, resolved_strategy='static')
+        fetcher.fetch('http://a/2', is_extra=True)
+        self.assertEqual(fetcher.resolved_strategy, 'static')
+        self.assertFalse(fetcher.strategy_decided)
+
+
+class TaskDatabaseErrorTests(SimpleTestCase):
+    """任务执行中的数据库错误只让该任务失败，不能终止 run_scheduler"""
+
+    def crawl_command(self):
+        command = CrawlCommand(stdout=StringIO())
+        command.leases = mock.Mock()
+        return command
+
+    def test_lease_acquire_error_fails_task_without_running(self):
+        command = self.crawl_command()
+        command.leases.acquire.side_effect = OperationalError('database is locked')
+        task = mock.Mock(id=1, task_name='task')
+        with mock.patch.object(command, '_crawl_single_task') as crawl:
+            self.assertEqual(command._run_task_safely(task, 1, 1), (False, 0))
+        crawl.assert_not_called()
+        task.save.assert_not_called()
+
+    def test_status_save_and_lease_release_errors_are_contained(self):
+        command = self.crawl_command()
+        command.leases.acquire.return_value = True
+        command.leases.release.side_effect = OperationalError('database is locked')
+        task = mock.Mock(id=1, task_name='task')
+        task.save.side_effect = OperationalError('database is locked')
+        with mock.patch.object(command, '_crawl_single_task', side_effect=OperationalError('database is locked')):
+            self.assertEqual(command._run_task_safely(task, 1, 1), (False, 0))
+        command.leases.release.assert_called_once_with(1)
+
+    def test_scheduler_counts_crashed_task_as_failed(self):
+        command = SchedulerCommand(stdout=StringIO())
+        command.schedule = mock.Mock()
+        command.schedule.next_slot.return_value = utc(2026, 3, 5, 9)
+        future = Future()
+        future.set_exception(OperationalError('database is locked'))
+        running = {1: (mock.Mock(task_name='task'), future)}
+        stats = {'dispatched': 1, 'success': 0, 'failed': 0, 'saved': 0}
+        command._collect_finished(running, stats)
+        self.assertEqual(running, {})
+        self.assertEqual(stats['failed'], 1)
+        self.assertIn('database is locked', command.stdout.getvalue())
+
+
+class FakeStreamResponse:
+    def __init__(self, status_code, body, headers, drop_after=None):
+        self.status_code = status_code
+        self.headers = dict(headers, **{'Content-Length': str(len(body))})
+        self.__body = body
+        self.__drop_after = drop_after
+
+    def iter_content(self, chunk_size):
+        # drop_after：连接在发送这么多字节后断开
+        body = self.__body if self.__drop_after is None else self.__body[:self.__drop_after]
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class FakeFileServer:
+    """代替 StaticPageFetcher.open_stream：按 Range / If-Range 返回 206 或完整的 200"""
+
+    def __init__(self, body, etag='"v1"', supports_range=True):
+        self.body = body
+        self.etag = etag
+        self.supports_range = supports_range
+        self.drop_after = None
+        self.requests = []
+
+    def open_stream(self, url, headers=None, slot_acquired=False):
+        headers = headers or {}
+        self.requests.append(headers)
+        drop_after, self.drop_after = self.drop_after, None
+        response_headers = {'ETag': self.etag} if self.etag else {}
+        match = re.match(r'bytes=(\d+)-', headers.get('Range', ''))
+        if match and self.supports_range and headers.get('If-Range') == self.etag:
+            return FakeStreamResponse(206, self.body[int(match.group(1)):], response_headers, drop_after)
+        return FakeStreamResponse(200, self.body, response_headers, drop_after)
+
+
+class AttachmentDownloaderTests(SimpleTestCase):
+    URL = 'http://example.com/files/report.pdf'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = AttachmentStore(directory.name)
+
+    def downloader(self, server):
+        return AttachmentDownloader(self.store, server, chunk_size=4)
+
+    def write_partial(self, data, validator):
+        partial_path = self.store.partial_path(self.URL)
+        partial_path.parent.mkdir(parents=True)
+        partial_path.write_bytes(data)
+        if validator is not None:
+            self.store.validator_path(partial_path).write_text(validator, encoding='utf-8')
+        return partial_path
+
+    def assert_committed(self, result, body):
+        self.assertIsNone(result.error)
+        self.assertEqual(result.content_hash, hashlib.sha256(body).hexdigest())
+        self.assertEqual(self.store.path(result.local_path).read_bytes(), body)
+        self.assertEqual(list((Path(self.store.root) / AttachmentStore.PARTIAL_DIR).iterdir()), [])
+
+    def test_resume_appends_206_response(self):
+        server = FakeFileServer(b'hello world')
+        self.write_partial(b'hello ', '"v1"')
+        result = self.downloader(server).download(1, self.URL, 'example.com')
+        self.assertEqual(server.requests[0]['Range'], 'bytes=6-')
+        self.assertEqual(server.requests[0]['If-Range'], '"v1"')
+        self.assertEqual(result.resumed_bytes, 6)
+        self.assertEqual(result.size_in_bytes, 11)
+        self.assert_committed(result, b'hello world')
+
+    def test_200_response_truncates_and_restarts(self):
+        server = FakeFileServer(b'hello world', supports_range=False)
+        self.write_partial(b'stale bytes', '"v1"')
+        result = self.downloader(server).download(1, self.URL, 'example.com')
+        self.assertEqual(result.resumed_bytes, 0)
+        self.assert_committed(result, b'hello world')
+
+    def test_changed_file_restarts_from_zero(self):
+        # If-Range 不匹配时服务器返回完整的新文件
+        server = FakeFileServer(b'new version', etag='"v2"')
+        self.write_partial(b'old ', '"v1"')
+        result = self.downloader(server).download(1, self.URL, 'example.com')
+        self.assertEqual(server.requests[0]['If-Range'], '"v1"')
+        self.assertEqual(result.resumed_bytes, 0)
+        self.assert_committed(result, b'new version')
+
+    def test_partial_without_validator_is_not_resumed(self):
+        server = FakeFileServer(b'hello world')
+        self.write_partial(b'hello ', None)
+        result = self.downloader(server).download(1, self.URL, 'example.com')
+        self.assertNotIn('Range', server.requests[0])
+        self.assert_committed(result, b'hello world')
+
+    def test_interrupted_download_leaves_resumable_partial(self):
+        server = FakeFileServer(b'hello world')
+        server.drop_after = 6
+        downloader = self.downloader(server)
+        result = downloader.download(1, self.URL, 'example.com')
+        self.assertIsInstance(result.error, IOError)
+        partial_path = self.store.partial_path(self.URL)
+        self.assertEqual(partial_path.read_bytes(), b'hello ')
+        self.assertEqual(self.store.validator_path(partial_path).read_text(encoding='utf-8'), '"v1"')
+
+        result = downloader.download(1, self.URL, 'example.com')
+        self.assertEqual(server.requests[1]['Range'], 'bytes=6-')
+        self.assertEqual(result.resumed_bytes, 6)
+        self.assert_committed(result, b'hello world')
+
+    def test_same_content_is_stored_once(self):
+        server = FakeFileServer(b'same report')
+        downloader = self.downloader(server)
+        first = downloader.download(1, self.URL, 'example.com')
+        second = downloader.download(2, 'http://mirror.example.com/report.pdf', 'mirror.example.com')
+        self.assertFalse(first.deduplicated)
+        self.assertTrue(second.deduplicated)
+        self.assertEqual(first.local_path, second.local_path)
+        self.assert_committed(second, b'same report')
+
+
+def list_item(url, publish_date_str=''):
+    return {'title': f'标题 {url}', 'url': url, 'publish_date_str': publish_date_str}
+
+
+class SaveArticlesTests(TestCase):
+    def setUp(self):
+        self.command = CrawlCommand(stdout=StringIO())
+        self.thinktank = ThinkTank.objects.create(name='测试智库', url='http://example.com/')
+
+    def create_article(self, url):
+        return Article.objects.create(title='已有', url=url, thinktank=self.thinktank, crawl_date=utc(2025, 1, 1))
+
+    def test_mixed_new_and_existing_batch(self):
+        self.create_article('http://example.com/a/1')
+        items = [list_item(f'http://example.com/a/{n}', f'2026-03-0{n}') for n in (1, 2, 3)]
+        self.assertEqual(self.command._save_articles(items, self.thinktank), (2, 1))
+        self.assertEqual(Article.objects.count(), 3)
+        self.assertEqual(Article.objects.get(url='http://example.com/a/3').publish_date, date(2026, 3, 3))
+        # 已有文章不被覆盖
+        self.assertEqual(Article.objects.get(url='http://example.com/a/1').title, '已有')
+
+    def test_duplicate_urls_in_one_batch(self):
+        items = [list_item(f'http://example.com/a/{n}') for n in (1, 1, 2)]
+        self.assertEqual(self.command._save_articles(items, self.thinktank), (2, 1))
+        self.assertEqual(Article.objects.count(), 2)
+
+    def test_counts_across_batches(self):
+        items = [list_item(f'http://example.com/a/{n}') for n in range(5)] + [list_item('http://example.com/a/0')]
+        self.assertEqual(self.command._save_articles(items, self.thinktank, batch_size=2), (5, 1))
+
+    def test_rows_inserted_concurrently_count_as_duplicates(self):
+        # 查重之后、插入之前，另一个任务抢先插入了同一 URL
+        bulk_create = Article.objects.bulk_create
+
+        def racing_bulk_create(articles, **kwargs):
+            self.create_article('http://example.com/a/2')
+            return bulk_create(articles, **kwargs)
+
+        items = [list_item('http://example.com/a/1'), list_item('http://example.com/a/2')]
+        with mock.patch.object(Article.objects, 'bulk_create', side_effect=racing_bulk_create):
+            self.assertEqual(self.command._save_articles(items, self.thinktank), (1, 1))
+        self.assertEqual(Article.objects.get(url='http://example.com/a/2').title, '已有')
+
+    def test_invalid_item_is_skipped(self):
+        items = [list_item('http://example.com/' + 'x' * 300), list_item('http://example.com/a/1')]
+        self.assertEqual(self.command._save_articles(items, self.thinktank), (1, 0))
+
+
+class PageIsKnownTests(TestCase):
+    def setUp(self):
+        self.command = CrawlCommand(stdout=StringIO())
+        thinktank = ThinkTank.objects.create(name='测试智库', url='http://example.com/')
+        Article.objects.create(
+            title='已有', url='http://example.com/a/1', thinktank=thinktank, crawl_date=timezone.now()
+        )
+        self.task = SimpleNamespace(watermark_url='http://example.com/a/9', watermark_publish_date=date(2026, 3, 1))
+
+    def test_saved_urls_are_known(self):
+        self.assertTrue(self.command._page_is_known(self.task, [list_item('http://example.com/a/1', '2026-03-05')]))
+
+    def test_items_older_than_watermark_are_known(self):
+        items = [list_item('http://example.com/a/1'), list_item('http://example.com/a/2', '2026-02-28')]
+        self.assertTrue(self.command._page_is_known(self.task, items))
+
+    def test_watermark_url_is_known(self):
+        self.assertTrue(self.command._page_is_known(self.task, [list_item('http://example.com/a/9', '2026-03-01')]))
+
+    def test_new_item_on_or_after_watermark_date_is_not_known(self):
+        items = [list_item('http://example.com/a/1'), list_item('http://example.com/a/2', '2026-03-01')]
+        self.assertFalse(self.command._page_is_known(self.task, items))
+
+    def test_undated_new_item_is_not_known(self):
+        items = [list_item('http://example.com/a/1'), list_item('http://example.com/a/2')]
+        self.assertFalse(self.command._page_is_known(self.task, items))
+
+    def test_without_watermark_only_saved_urls_are_known(self):
+        task = SimpleNamespace(watermark_url=None, watermark_publish_date=None)
+        self.assertFalse(self.command._page_is_known(task, [list_item('http://example.com/a/2', '2020-01-01')]))
+
+
+LIST_BASE_URL = 'http://www.example.org.cn/list/index.html'
+# 各内置规则的列表页样例及应提取的 (标题, URL, 日期)，与改为规则之前 _crawl_handler1 ~ 7 的结果一致
+LIST_PAGES = {
+    'handler1': (
+        '<html><body><div class="list">'
+        '<record><![CDATA[<div class="news-list"><div class="newscontent">'
+        '<a href="/art/2026/3/5/art_1.html"><h3>咨询评估报告 一</h3></a>'
+        '<p class="newsinfo">摘要一</p></div><span class="newsdate">2026-03-05</span></div>]]></record>'
+        '<record><![CDATA[<div class="news-list"><div class="newscontent">'
+        '<a href="http://www.example.org.cn/art/2026/3/1/art_2.html"><h3>咨询评估报告 二</h3></a>'
+        '</div><span class="newsdate">2026-03-01</span></div>]]></record>'
+        '</div></body></html>',
+        [
+            ('咨询评估报告 一', 'http://www.example.org.cn/art/2026/3/5/art_1.html', '2026-03-05'),
+            ('咨询评估报告 二', 'http://www.example.org.cn/art/2026/3/1/art_2.html', '2026-03-01'),
+        ],
+    ),
+    'handler1_html': (
+        '<html><body><div class="default_pgContainer">'
+        '<div class="newscontent"><a href="a1.html"><h3>标题一</h3></a>'
+        '<span class="newsdate">2026-02-10</span><p class="newsinfo">摘要</p></div>'
+        '<div class="newscontent"><a href="a2.html">标题二</a></div>'
+        '<div class="newscontent"><span>没有链接</span></div>'
+        '</div></body></html>',
+        [
+            ('标题一', 'http://www.example.org.cn/list/a1.html', '2026-02-10'),
+            ('标题二', 'http://www.example.org.cn/list/a2.html', ''),
+        ],
+    ),
+    'handler2': (
+        '<html><body><div class="briefList">'
+        '<div class="briefItem"><a href="/brief/101.html"><h3>研究简报第101期</h3><span>2026-03-02</span></a></div>'
+        '<div class="briefItem"><a href="/brief/100.html"><h3>研究简报第100期</h3></a><span>2026-02-20</span></div>'
+        '<div class="briefItem"><a href="/brief/99.html">没有标题</a></div>'
+        '</div></body></html>',
+        [
+            ('研究简报第101期', 'http://www.example.org.cn/brief/101.html', '2026-03-02'),
+            ('研究简报第100期', 'http://www.example.org.cn/brief/100.html', ''),
+        ],
+    ),
+    'handler3': (
+        '<html><body>'
+        '<div class="re_box"><a href="../yjcg/1.html" title="完整的研究成果标题">研究成果...</a><span>2026-03-03</span></div>'
+        '<div class="re_box"><a href="../yjcg/2.html">第二篇研究成果</a><span>2026-02-27</span></div>'
+        '</body></html>',
+        [
+            ('完整的研究成果标题', 'http://www.example.org.cn/yjcg/1.html', '2026-03-03'),
+            ('第二篇研究成果', 'http://www.example.org.cn/yjcg/2.html', '2026-02-27'),
+        ],
+    ),
+    'handler4': (
+        '<html><body><ul class="gl_list2">'
+        '<li><a href="./202603/t20260304_1.html" title="科研进展标题">科研进展...</a><span>2026-03-04</span></li>'
+        '<li><a href="./202603/t20260301_2.html">另一条科研进展</a><span>2026-03-01</span></li>'
+        '<li><span>2026-02-01</span></li>'
+        '</ul><ul class="other"><li><a href="/x.html">不在列表中</a></li></ul></body></html>',
+        [
+            ('科研进展标题', 'http://www.example.org.cn/list/202603/t20260304_1.html', '2026-03-04'),
+            ('另一条科研进展', 'http://www.example.org.cn/list/202603/t20260301_2.html', '2026-03-01'),
+        ],
+    ),
+    'handler5': (
+        '<html><body><ul class="u-list">'
+        '<li><a href="/xsyj/1.html" title="宏观经济形势分析">宏观经济...</a><span>[2026-03-06]</span></li>'
+        '<li><a href="/xsyj/2.html">产业政策研究</a><span>[2026-02-28]</span></li>'
+        '</ul></body></html>',
+        [
+            ('宏观经济形势分析', 'http://www.example.org.cn/xsyj/1.html', '[2026-03-06]'),
+            ('产业政策研究', 'http://www.example.org.cn/xsyj/2.html', '[2026-02-28]'),
+        ],
+    ),
+    'handler6': (
+        '<html><body><div class="new_list new1"><ul><li><a href="/old.html">其他栏目</a></li></ul></div>'
+        '<div class="new_list new0"><ul>'
+        '<li><a href="/ccid/1.html">赛迪观点一</a><span>2026-03-07</span></li>'
+        '<li><a href="/ccid/2.html"> </a><span>2026-03-06</span></li>'
+        '<li><a href="/ccid/3.html">赛迪观点三</a></li>'
+        '</ul></div></body></html>',
+        [
+            ('赛迪观点一', 'http://www.example.org.cn/ccid/1.html', '2026-03-07'),
+            ('赛迪观点三', 'http://www.example.org.cn/ccid/3.html', ''),
+        ],
+    ),
+    'handler7': (
+        '<html><body><ul class="cols_list clearfix">'
+        '<li><a href="/c/2026-03-08/1.shtml">社科要闻一</a><span class="cols_meta">2026-03-08</span><span>其他</span></li>'
+        '<li><a href="/c/2026-03-05/2.shtml">社科要闻二</a><span class="cols_meta">2026-03-05</span></li>'
+        '</ul></body></html>',
+        [
+            ('社科要闻一', 'http://www.example.org.cn/c/2026-03-08/1.shtml', '2026-03-08'),
+            ('社科要闻二', 'http://www.example.org.cn/c/2026-03-05/2.shtml', '2026-03-05'),
+        ],
+    ),
+}
+
+
+class HandlerRuleTests(SimpleTestCase):
+    def test_every_handler_has_a_sample(self):
+        self.assertEqual({key.split('_')[0] for key in LIST_PAGES}, set(HANDLER_RULES))
+
+    def test_rules_extract_title_url_and_date(self):
+        for backend_name in available_backends():
+            backend = get_parser_backend(backend_name)
+            for key, (html_content, expected) in LIST_PAGES.items():
+                with self.subTest(backend=backend_name, page=key):
+                    items = extract_list_items(html_content, HANDLER_RULES[key.split('_')[0]], LIST_BASE_URL, backend)
+                    extracted = [(item['title'], item['url'], item['publish_date_str']) for item in items]
+                    self.assertEqual(extracted, expected)
+
+    def test_handler1_summary(self):
+        html_content = LIST_PAGES['handler1'][0]
+        for backend_name in available_backends():
+            with self.subTest(backend=backend_name):
+                items = extract_list_items(
+                    html_content, HANDLER_RULES['handler1'], LIST_BASE_URL, get_parser_backend(backend_name)
+                )
+                self.assertEqual([item['summary'] for item in items], ['摘要一', ''])
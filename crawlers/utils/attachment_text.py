@@ -0,0 +1,172 @@
+"""
+从已下载的附件中提取文本，写入 Attachment.extracted_text 供搜索使用。
+
+- 逐页（PDF 页、PPT 幻灯片、Excel 工作表、Word 段落块）提取，累计字数达到 max_chars 后停止，
+  超大报告不会把整份文件的文本都放进内存；
+- 各格式的解析库都是可选依赖：pypdf（PDF）、python-docx（DOCX）、python-pptx（PPTX）、openpyxl（XLSX），
+  未安装时对应格式的附件保持 pending，安装后再运行即可补上；
+- 旧的二进制 Office 格式（DOC/PPT/XLS/WPS）不支持，标记为 unsupported。
+
+extract_file 在进程池中运行（PDF 解析是 CPU 密集型的），只读文件、不访问数据库。
+"""
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+try:
+    import pypdf
+except ImportError:  # pypdf 为可选依赖，缺失时不提取 PDF
+    pypdf = None
+else:
+    # 损坏的 PDF 会输出大量警告，错误已记入 Attachment.text_error
+    logging.getLogger('pypdf').setLevel(logging.ERROR)
+
+try:
+    import docx
+except ImportError:  # python-docx 为可选依赖
+    docx = None
+
+try:
+    import pptx
+except ImportError:  # python-pptx 为可选依赖
+    pptx = None
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl 为可选依赖
+    openpyxl = None
+
+# Word 文档没有固定分页，按这么多段落计为一页
+DOCX_PARAGRAPHS_PER_PAGE = 50
+_WHITESPACE = re.compile(r'[ \t\r\f\v　\xa0]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+class MissingDependency(Exception):
+    """该格式的解析库未安装"""
+
+
+class UnsupportedFormat(Exception):
+    """不支持的文件格式"""
+
+
+class TextResult(NamedTuple):
+    key: str
+    text: str | None
+    pages: int
+    truncated: bool                 # 达到 max_chars 后停止，后面的页未提取
+    error: str | None               # 错误类别：MissingDependency / UnsupportedFormat / 异常类名
+    seconds: float
+
+
+def _pdf_pages(path: Path) -> Iterator[str]:
+    reader = pypdf.PdfReader(path)
+    for page in reader.pages:
+        yield page.extract_text() or ''
+
+
+def _docx_pages(path: Path) -> Iterator[str]:
+    paragraphs = []
+    for paragraph in docx.Document(path).paragraphs:
+        paragraphs.append(paragraph.text)
+        if len(paragraphs) >= DOCX_PARAGRAPHS_PER_PAGE:
+            yield '\n'.join(paragraphs)
+            paragraphs = []
+    if paragraphs:
+        yield '\n'.join(paragraphs)
+
+
+def _pptx_pages(path: Path) -> Iterator[str]:
+    for slide in pptx.Presentation(path).slides:
+        yield '\n'.join(
+            shape.text_frame.text for shape in slide.shapes if shape.has_text_frame and shape.text_frame.text
+        )
+
+
+def _xlsx_pages(path: Path) -> Iterator[str]:
+    # read_only 模式逐行读取，不把整个工作簿载入内存
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            yield '\n'.join(
+                '\t'.join('' if value is None else str(value) for value in row)
+                for row in sheet.iter_rows(values_only=True)
+                if any(value is not None for value in row)
+            )
+    finally:
+        workbook.close()
+
+
+# 扩展名 → (逐页提取函数, 所需模块, 安装包名)
+EXTRACTORS = {
+    'pdf': (_pdf_pages, pypdf, 'pypdf'),
+    'docx': (_docx_pages, docx, 'python-docx'),
+    'pptx': (_pptx_pages, pptx, 'python-pptx'),
+    'xlsx': (_xlsx_pages, openpyxl, 'openpyxl'),
+}
+
+
+def file_extension(path) -> str:
+    return Path(path).suffix.lower().lstrip('.')
+
+
+def missing_package(extension: str) -> str | None:
+    """提取该格式需要但未安装的包名；格式不支持或依赖齐全时返回 None"""
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None or extractor[1] is not None:
+        return None
+    return extractor[2]
+
+
+def iter_pages(path) -> Iterator[str]:
+    """逐页产出文本"""
+    extension = file_extension(path)
+    if extension not in EXTRACTORS:
+        raise UnsupportedFormat(extension)
+    pages, module, package = EXTRACTORS[extension]
+    if module is None:
+        raise MissingDependency(package)
+    return pages(Path(path))
+
+
+def clean_page(text: str) -> str:
+    """合并行内空白，去掉行首尾空白和多余空行；去掉 NUL 字符（部分 PDF 的文字中带有，PostgreSQL 不接受）"""
+    lines = (_WHITESPACE.sub(' ', line).strip() for line in text.replace('\x00', '').split('\n'))
+    return _BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def extract_text(path, max_chars: int = 1_000_000) -> tuple[str, int, bool]:
+    """返回 (文本, 已提取页数, 是否因达到 max_chars 截断)，页之间用空行分隔"""
+    pieces = []
+    length = 0
+    pages = 0
+    for page_text in iter_pages(path):
+        pages += 1
+        page_text = clean_page(page_text)
+        if not page_text:
+            continue
+        # 长度包括与上一页之间的空行
+        separator = 2 if pieces else 0
+        if length + separator + len(page_text) > max_chars:
+            remaining = max_chars - length - separator
+            if remaining > 0:
+                pieces.append(page_text[:remaining])
+            return '\n\n'.join(pieces), pages, True
+        pieces.append(page_text)
+        length += separator + len(page_text)
+    return '\n\n'.join(pieces), pages, False
+
+
+def extract_file(job: tuple) -> TextResult:
+    """进程池任务，job 为 (key, 文件路径, max_chars)；异常转为错误类别返回"""
+    key, path, max_chars = job
+    started = time.perf_counter()
+    try:
+        text, pages, truncated = extract_text(path, max_chars)
+        return TextResult(key, text, pages, truncated, None, time.perf_counter() - started)
+    except (MissingDependency, UnsupportedFormat) as e:
+        return TextResult(key, None, 0, False, type(e).__name__, time.perf_counter() - started)
+    except Exception as e:
+        return TextResult(key, None, 0, False, f"{type(e).__name__}: {e}"[:100], time.perf_counter() - started)
@@ -0,0 +1,243 @@
+"""
+文章附件（PDF/DOC/PPT/XLS 报告等）的发现、下载和存储。
+
+- find_attachment_links 在详情页中找出指向这些文件的链接，fetch_article_detail / reparse_articles 据此创建 Attachment 记录；
+- AttachmentDownloader 用流式请求分块写入临时文件，边写边计算 SHA-256；下载中断时临时文件保留，
+  下次运行用 Range 请求从断点继续，并用 If-Range 带上保存的 ETag / Last-Modified，
+  服务器上的文件已变化或不支持 Range 时从头下载；
+- AttachmentStore 按内容寻址存放：<root>/<哈希前两位>/<哈希>.<扩展名>，不同智库转载的同一份报告只保存一份，
+  Attachment.local_path 记录相对于 root 的路径。
+
+默认参数来自 settings.CRAWLER_ATTACHMENTS，见 AttachmentDownloader.from_settings。
+"""
+import hashlib
+import os
+import re
+from pathlib import Path, PurePosixPath
+from typing import Hashable, NamedTuple
+from urllib.parse import unquote, urljoin, urlparse
+
+import requests
+
+from crawlers.utils.static_fetcher import StaticPageFetcher
+
+# 扩展名 → Attachment.file_type
+ATTACHMENT_EXTENSIONS = {
+    'pdf': 'pdf',
+    'doc': 'doc', 'docx': 'doc', 'wps': 'doc',
+    'ppt': 'ppt', 'pptx': 'ppt',
+    'xls': 'xlsx', 'xlsx': 'xlsx', 'et': 'xlsx',
+}
+# 扩展名可能在路径末尾，也可能在查询参数中（如 download.jsp?file=report.pdf）
+_EXTENSION_PATTERN = re.compile(
+    r'\.(' + '|'.join(sorted(ATTACHMENT_EXTENSIONS, key=len, reverse=True)) + r')(?=$|[?#&;/])', re.I
+)
+FILENAME_MAX_LENGTH = 255
+
+
+class AttachmentLink(NamedTuple):
+    url: str
+    filename: str
+    file_type: str
+    extension: str
+
+
+def attachment_extension(url: str) -> str | None:
+    """URL 指向的附件扩展名（小写，不含点），不是附件时返回 None"""
+    parsed = urlparse(url)
+    match = _EXTENSION_PATTERN.search(unquote(parsed.path)) or _EXTENSION_PATTERN.search(unquote(parsed.query))
+    return match.group(1).lower() if match else None
+
+
+def find_attachment_links(backend, doc, base_url: str) -> list[AttachmentLink]:
+    """页面中指向附件的链接，按出现顺序去重；文件名取 URL 中的文件名，没有时取链接文字"""
+    links = []
+    seen = set()
+    for node in backend.select(doc, 'a[href]'):
+        href = (backend.attr(node, 'href') or '').strip()
+        if not href or href.startswith(('javascript:', 'mailto:', '#')):
+            continue
+        url = urljoin(base_url, href)
+        extension = attachment_extension(url)
+        if extension is None or url in seen or len(url) > 500:
+            continue
+        seen.add(url)
+        name = unquote(PurePosixPath(urlparse(url).path).name)
+        if not name.lower().endswith(f'.{extension}'):
+            text = re.sub(r'\s+', ' ', backend.text(node)).strip() or 'attachment'
+            name = text if text.lower().endswith(f'.{extension}') else f'{text}.{extension}'
+        links.append(AttachmentLink(url, name[-FILENAME_MAX_LENGTH:], ATTACHMENT_EXTENSIONS[extension], extension))
+    return links
+
+
+def build_attachments(article_id: int, links: list[AttachmentLink]) -> list:
+    """由发现的链接构造待下载的 Attachment（未保存，由调用方 bulk_create(ignore_conflicts=True)）"""
+    from articles.models import Attachment
+    return [
+        Attachment(
+            article_id=article_id,
+            original_url=link.url,
+            filename=link.filename,
+            file_type=link.file_type,
+            download_status='pending',
+        )
+        for link in links
+    ]
+
+
+class AttachmentTooLarge(Exception):
+    """文件超过大小上限，不再下载"""
+
+
+class AttachmentStore:
+    """按内容寻址的附件目录，可在多个线程间共享"""
+
+    PARTIAL_DIR = '.partial'
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, relative_path: str) -> Path:
+        return self.root / relative_path
+
+    def partial_path(self, url: str) -> Path:
+        """下载中的临时文件，按 URL 命名，下次运行可以从断点继续"""
+        return self.root / self.PARTIAL_DIR / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.part"
+
+    @staticmethod
+    def validator_path(partial_path: Path) -> Path:
+        """临时文件对应的 ETag / Last-Modified，续传时作为 If-Range 发送"""
+        return partial_path.with_suffix('.validator')
+
+    def discard(self, partial_path: Path) -> None:
+        partial_path.unlink(missing_ok=True)
+        self.validator_path(partial_path).unlink(missing_ok=True)
+
+    def commit(self, partial_path: Path, digest: str, extension: str) -> tuple[str, bool]:
+        """把下载完成的临时文件移入内容寻址目录，返回 (相对路径, 是否已有相同内容的文件)"""
+        relative_path = f"{digest[:2]}/{digest}.{extension}"
+        target = self.path(relative_path)
+        if target.exists():
+            self.discard(partial_path)
+            return relative_path, True
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(partial_path, target)
+        self.validator_path(partial_path).unlink(missing_ok=True)
+        return relative_path, False
+
+
+class DownloadResult(NamedTuple):
+    key: Hashable
+    url: str
+    host: str
+    content_hash: str | None
+    size_in_bytes: int
+    local_path: str | None          # 相对于 AttachmentStore.root
+    resumed_bytes: int              # 从断点继续时已有的字节数
+    deduplicated: bool              # 已有相同内容的文件，本次下载的文件被丢弃
+    error: Exception | None = None
+
+
+class AttachmentDownloader:
+    """配合 ConcurrentPageFetcher.run_all 使用，download 在下载线程中运行"""
+
+    def __init__(
+            self,
+            store: AttachmentStore,
+            static_fetcher: StaticPageFetcher,
+            max_bytes: int = 100 * 1024 * 1024,
+            chunk_size: int = 64 * 1024
+    ):
+        self.store = store
+        self.__static_fetcher = static_fetcher
+        self.__max_bytes = max_bytes
+        self.__chunk_size = chunk_size
+
+    @classmethod
+    def from_settings(cls, static_fetcher: StaticPageFetcher, **overrides) -> 'AttachmentDownloader':
+        """读取 settings.CRAWLER_ATTACHMENTS，overrides 中不为 None 的值优先"""
+        from django.conf import settings
+        options = dict(getattr(settings, 'CRAWLER_ATTACHMENTS', {}))
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(
+            AttachmentStore(options.get('root', 'attachments')),
+            static_fetcher,
+            max_bytes=int(options.get('max_size_mb', 100) * 1024 * 1024),
+            chunk_size=options.get('chunk_size', 64 * 1024),
+        )
+
+    def download(self, key: Hashable, url: str, host: str) -> DownloadResult:
+        try:
+            return self.__download(key, url, host, resume=True)
+        except Exception as e:
+            return DownloadResult(key, url, host, None, 0, None, 0, False, e)
+
+    def __download(self, key, url, host, resume):
+        extension = attachment_extension(url) or 'bin'
+        partial_path = self.store.partial_path(url)
+        partial_path.parent.mkdir(parents=True, exist_ok=True)
+        offset = partial_path.stat().st_size if resume and partial_path.exists() else 0
+        validator_path = self.store.validator_path(partial_path)
+        validator = validator_path.read_text(encoding='utf-8') if offset and validator_path.exists() else ''
+        if not validator:
+            # 无法确认服务器上的文件与临时文件是同一版本，从头下载
+            offset = 0
+        # 断点续传按字节偏移，不能让服务器压缩响应体
+        headers = {'Accept-Encoding': 'identity'}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            # 文件已变化时服务器返回完整的新文件（200），不会把新内容拼接到旧的临时文件后面
+            headers['If-Range'] = validator
+        try:
+            # 第一次请求的限速名额已由 ConcurrentPageFetcher 占用
+            response = self.__static_fetcher.open_stream(url, headers=headers, slot_acquired=resume)
+        except requests.HTTPError as e:
+            if offset and e.response is not None and e.response.status_code == 416:
+                # 断点超出文件长度（文件已变化），丢弃临时文件从头下载
+                self.store.discard(partial_path)
+                return self.__download(key, url, host, resume=False)
+            raise
+
+        with response:
+            if offset and response.status_code != 206:
+                # 服务器不支持 Range 或文件已变化（If-Range 不匹配），从头下载
+                offset = 0
+            if not offset:
+                self.__save_validator(validator_path, response)
+            content_length = response.headers.get('Content-Length', '')
+            if content_length.isdigit() and offset + int(content_length) > self.__max_bytes:
+                self.store.discard(partial_path)
+                raise AttachmentTooLarge(f"{offset + int(content_length)} bytes")
+
+            digest = hashlib.sha256()
+            if offset:
+                with open(partial_path, 'rb') as existing:
+                    for chunk in iter(lambda: existing.read(self.__chunk_size), b''):
+                        digest.update(chunk)
+            size = offset
+            with open(partial_path, 'ab' if offset else 'wb') as partial_file:
+                for chunk in response.iter_content(chunk_size=self.__chunk_size):
+                    size += len(chunk)
+                    if size > self.__max_bytes:
+                        partial_file.close()
+                        self.store.discard(partial_path)
+                        raise AttachmentTooLarge(f"more than {self.__max_bytes} bytes")
+                    partial_file.write(chunk)
+                    digest.update(chunk)
+            if content_length.isdigit() and size != offset + int(content_length):
+                # 连接提前断开，保留临时文件，下次从断点继续
+                raise IOError(f"Incomplete download: {size} of {offset + int(content_length)} bytes")
+
+        content_hash = digest.hexdigest()
+        local_path, deduplicated = self.store.commit(partial_path, content_hash, extension)
+        return DownloadResult(key, url, host, content_hash, size, local_path, offset, deduplicated)
+
+    @staticmethod
+    def __save_validator(validator_path: Path, response) -> None:
+        """保存响应的强 ETag（弱 ETag 不能用于 If-Range），没有时保存 Last-Modified"""
+        etag = response.headers.get('ETag', '')
+        validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified', '')
+        if validator:
+            validator_path.write_text(validator, encoding='utf-8')
+        else:
+            validator_path.unlink(missing_ok=True)
@@ -3,21 +3,179 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 
 import undetected_chromedriver
-from typing import Literal
-from time import sleep
+from contextlib import contextmanager
+from threading import Condition, Lock
+from typing import Callable, Literal, NamedTuple
+from time import monotonic, sleep
 
 from urllib.parse import urlparse as url_parse
 
+try:
+    import psutil
+except ImportError:  # psutil 为可选依赖，缺失时不按内存回收浏览器
+    psutil = None
+
 
 def is_valid_url(url):
     parsed = url_parse(url)
     return (parsed.scheme in ["http", "https"]) and (parsed.netloc != "")
 
 
+def _extension_patterns(*extensions: str) -> list[str]:
+    # 同时匹配带查询参数的地址，如 logo.png?v=2
+    return [pattern for extension in extensions for pattern in (f'*.{extension}', f'*.{extension}?*')]
+
+
+# 可按类型屏蔽的资源 URL 模式（CDP Network.setBlockedURLs，* 为通配符）
+BLOCKABLE_RESOURCE_PATTERNS = {
+    'image': _extension_patterns('png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp'),
+    'media': _extension_patterns('mp4', 'webm', 'mp3', 'm4a', 'ogg', 'flv', 'avi'),
+    'font': _extension_patterns('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'stylesheet': _extension_patterns('css'),
+    'analytics': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+        '*hm.baidu.com*', '*cnzz.com*', '*.51.la/*', '*umeng.com*', '*zhanzhang.baidu.com*',
+    ],
+}
+
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+
+class LaunchProfile(NamedTuple):
+    """需要在启动浏览器时确定的渲染选项，浏览器池按它区分会话"""
+    page_load_strategy: str = 'normal'
+    headless: bool = False
+
+
+def parse_render_options(render_config: dict | None) -> tuple[LaunchProfile, list[str]]:
+    """
+    解析任务 crawler_config 中 config.render 的配置，返回 (启动选项, 需屏蔽的 URL 模式)。
+
+        {
+            'page_load_strategy': 'eager',       # normal（默认）/ eager / none
+            'headless': True,                    # 默认 False
+            'block': ['image', 'font', 'media', 'analytics'],  # 见 BLOCKABLE_RESOURCE_PATTERNS
+            'block_urls': ['*.example.com/ads/*'],            # 额外的 URL 模式
+        }
+    """
+    render_config = render_config or {}
+    page_load_strategy = render_config.get('page_load_strategy', 'normal')
+    if page_load_strategy not in PAGE_LOAD_STRATEGIES:
+        raise ValueError(f"Page load strategy {page_load_strategy} is not supported.")
+    blocked_url_patterns = []
+    for resource_type in render_config.get('block', []):
+        if resource_type not in BLOCKABLE_RESOURCE_PATTERNS:
+            raise ValueError(f"Resource type {resource_type} is not supported.")
+        blocked_url_patterns.extend(BLOCKABLE_RESOURCE_PATTERNS[resource_type])
+    blocked_url_patterns.extend(render_config.get('block_urls', []))
+    launch_profile = LaunchProfile(
+        page_load_strategy=page_load_strategy,
+        headless=bool(render_config.get('headless', False)),
+    )
+    return launch_profile, blocked_url_patterns
+
+
+# 当前页面的传输字节数与导航耗时（跨域资源未返回 Timing-Allow-Origin 时 transferSize 为 0，被屏蔽的请求不计入）
+_PAGE_METRICS_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let transferBytes = navigation ? navigation.transferSize : 0;
+for (const resource of resources) {
+    transferBytes += resource.transferSize || 0;
+}
+let navigationMs = null;
+if (navigation) {
+    const finishedAt = navigation.loadEventEnd || navigation.domContentLoadedEventEnd || navigation.responseEnd;
+    navigationMs = finishedAt - navigation.startTime;
+}
+return {transfer_bytes: transferBytes, resource_count: resources.length, navigation_ms: navigationMs};
+"""
+
+
+# 返回匹配选择器的元素 outerHTML（按文档顺序，已被其他匹配元素包含的节点不重复返回）及整页 HTML 长度
+_EXTRACT_OUTER_HTML_SCRIPT = """
+const rules = arguments[0];
+const matched = [];
+for (const [selectorType, selectorRule] of rules) {
+    if (selectorType === 'xpath') {
+        const snapshot = document.evaluate(
+            selectorRule, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        for (let i = 0; i < snapshot.snapshotLength; i++) matched.push(snapshot.snapshotItem(i));
+    } else {
+        matched.push(...document.querySelectorAll(selectorRule));
+    }
+}
+const elements = matched.filter((node) => node.nodeType === Node.ELEMENT_NODE);
+elements.sort((a, b) => (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING) ? -1 : 1);
+const outermost = [];
+for (const element of elements) {
+    const last = outermost[outermost.length - 1];
+    if (last && (last === element || last.contains(element))) continue;
+    outermost.push(element);
+}
+return {
+    fragments: outermost.map((element) => element.outerHTML),
+    page_length: document.documentElement ? document.documentElement.outerHTML.length : 0
+};
+"""
+
+
+# 在页面内一次性等待一组选择器：先检查一次，之后每次 DOM 变化（及兜底轮询）时重新检查，满足条件立即返回
+_WAIT_FOR_SELECTORS_SCRIPT = """
+const [rules, waitType, mode, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+let finished = false;
+let observer = null;
+let poller = null;
+let timer = null;
+
+function isPresent([selectorType, selectorRule]) {
+    if (selectorType === 'xpath') {
+        return document.evaluate(
+            selectorRule, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue !== null;
+    }
+    return document.querySelector(selectorRule) !== null;
+}
+function isSatisfied(rule) {
+    return waitType === 'appear' ? isPresent(rule) : !isPresent(rule);
+}
+function finish(ready, error) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearInterval(poller);
+    clearTimeout(timer);
+    done({ready: ready, elapsed_ms: performance.now() - started, error: error});
+}
+function check() {
+    try {
+        if (mode === 'all' ? rules.every(isSatisfied) : rules.some(isSatisfied)) finish(true, null);
+    } catch (e) {
+        finish(false, String(e));
+    }
+}
+
+check();
+if (!finished) {
+    observer = new MutationObserver(check);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'id']});
+    poller = setInterval(check, 250);
+    timer = setTimeout(() => finish(false, null), timeoutMs);
+}
+"""
+
+
+# undetected_chromedriver 启动时会修补并覆盖同一个驱动文件，多线程同时启动会互相破坏，需串行化
+_undetected_launch_lock = Lock()
+
+
 class SafeChrome(webdriver.Chrome):
     def __del__(self):
         """Suppress __del__ cleanup to avoid invalid handle errors."""
@@ -41,9 +199,24 @@ class ChromePageRender:
             )
         else:
             # 使用 undetected_chromedriver，自动管理驱动
-            self.__browser = SafeChromeUndetected(
-                options=options
-            )
+            with _undetected_launch_lock:
+                self.__browser = SafeChromeUndetected(
+                    options=options
+                )
+        self.__page_count = 0
+        self.__blocked_url_patterns = []
+        self.__last_wait_seconds = None
+        self.__last_page_length = None
+
+    @property
+    def page_count(self) -> int:
+        """本浏览器会话累计打开过的页面数"""
+        return self.__page_count
+
+    @property
+    def last_wait_seconds(self) -> float | None:
+        """最近一次 wait_for_selectors 的实际等待时间（秒）"""
+        return self.__last_wait_seconds
 
     def goto_url(
             self,
@@ -54,60 +227,157 @@ class ChromePageRender:
         if not is_valid_url(url):
             raise ValueError('Given url is invalid, or it does not start with http or https.')
         self.__browser.get(url)
+        self.__page_count += 1
         return None
 
     def get_page_source(self) -> str:
         return self.__browser.page_source
 
+    def get_current_url(self) -> str:
+        return self.__browser.current_url
+
+    def extract_outer_html(
+            self,
+            selector_types_rules: list[tuple[Literal['css', 'xpath'], str]]
+    ) -> list[str]:
+        """
+        在浏览器内取出匹配选择器的元素 outerHTML 片段，只把这些片段传回，代替完整的 page_source。
+        整页 HTML 的长度记录在 last_page_length 中，便于比较节省的传输量。
+        """
+        for (selector_type, _) in selector_types_rules:
+            if selector_type not in ('css', 'xpath'):
+                raise TypeError(f"Selector type {selector_type} is not supported.")
+        rules = [[selector_type, selector_rule] for (selector_type, selector_rule) in selector_types_rules]
+        result = self.__browser.execute_script(_EXTRACT_OUTER_HTML_SCRIPT, rules)
+        self.__last_page_length = result.get('page_length')
+        return result.get('fragments') or []
+
+    @property
+    def last_page_length(self) -> int | None:
+        """最近一次 extract_outer_html 时整页 HTML 的字符数"""
+        return self.__last_page_length
+
+    def block_urls(self, url_patterns: list[str]) -> None:
+        """通过 CDP 屏蔽匹配这些模式的请求，对之后打开的页面生效；传入空列表取消屏蔽"""
+        if not url_patterns and not self.__blocked_url_patterns:
+            return
+        self.__browser.execute_cdp_cmd('Network.enable', {})
+        self.__browser.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(url_patterns)})
+        self.__blocked_url_patterns = list(url_patterns)
+
+    def get_page_metrics(self) -> dict:
+        """当前页面的 {'transfer_bytes', 'resource_count', 'navigation_ms'}，来自浏览器 Performance API"""
+        return self.__browser.execute_script(_PAGE_METRICS_SCRIPT)
+
     def wait_for_selectors(
             self,
             wait_type: Literal['appear', 'disappear'],
             selector_types_rules: list[tuple[Literal['css', 'xpath'], str]],
             waiting_timeout_in_seconds: float = 0.2,
-            print_error_log_to_console: bool = False
+            print_error_log_to_console: bool = False,
+            mode: Literal['sequential', 'all', 'any'] = 'sequential'
     ) -> bool:  # is_timed_out: bool
+        """
+        等待选择器出现/消失。
+
+        - sequential: 逐个选择器等待，超时时间平均分给每个选择器
+        - all / any:  在页面内一次性检查所有选择器，全部/任一满足即返回，共用同一个超时时间
+        """
         if waiting_timeout_in_seconds <= 0:
             raise TypeError('Waiting timeout in seconds <= 0.')
+        for (selector_type, _) in selector_types_rules:
+            if selector_type not in ('css', 'xpath'):
+                raise TypeError(f"Selector type {selector_type} is not supported.")
+        if wait_type not in ('appear', 'disappear'):
+            raise TypeError(f"Wait type {wait_type} is not supported.")
+        if not selector_types_rules:
+            self.__last_wait_seconds = 0.0
+            return False
+
+        started = monotonic()
+        if mode == 'sequential':
+            is_timed_out = self.__wait_for_selectors_sequentially(
+                wait_type, selector_types_rules, waiting_timeout_in_seconds
+            )
+        elif mode in ('all', 'any'):
+            is_timed_out = self.__wait_for_selectors_in_page(
+                wait_type, selector_types_rules, waiting_timeout_in_seconds, mode
+            )
+        else:
+            raise TypeError(f"Wait mode {mode} is not supported.")
+        self.__last_wait_seconds = monotonic() - started
+
+        if is_timed_out and print_error_log_to_console:
+            print(f"ChromePageRender: wait_for_selectors: Timed out, "
+                  f"failed to fulfill the \"{wait_type}\" selectors.")
+        return is_timed_out
+
+    def __wait_for_selectors_sequentially(
+            self,
+            wait_type: Literal['appear', 'disappear'],
+            selector_types_rules: list[tuple[Literal['css', 'xpath'], str]],
+            waiting_timeout_in_seconds: float
+    ) -> bool:  # is_timed_out: bool
         try:
             patched_timeout_in_seconds = waiting_timeout_in_seconds / len(selector_types_rules)
             for (selector_type, selector_rule) in selector_types_rules:
-                by = None
-                if selector_type == 'css':
-                    by = By.CSS_SELECTOR
-                elif selector_type == 'xpath':
-                    by = By.XPATH
-                else:
-                    raise TypeError(f"Selector type {selector_type} is not supported.")
+                by = By.CSS_SELECTOR if selector_type == 'css' else By.XPATH
                 if wait_type == 'appear':
                     WebDriverWait(self.__browser, patched_timeout_in_seconds).until(
                         expected_conditions.presence_of_element_located((by, selector_rule))
                     )
-                elif wait_type == 'disappear':
+                else:
                     WebDriverWait(self.__browser, patched_timeout_in_seconds).until_not(
                         expected_conditions.presence_of_element_located((by, selector_rule))
                     )
-                else:
-                    raise TypeError(f"Wait type {wait_type} is not supported.")
             return False
         except TimeoutException:
-            if print_error_log_to_console:
-                print(f"ChromePageRender: wait_for_selectors: Timed out, "
-                      f"failed to fulfill the \"{wait_type}\" selectors.")
             return True
 
+    def __wait_for_selectors_in_page(
+            self,
+            wait_type: Literal['appear', 'disappear'],
+            selector_types_rules: list[tuple[Literal['css', 'xpath'], str]],
+            waiting_timeout_in_seconds: float,
+            mode: Literal['all', 'any']
+    ) -> bool:  # is_timed_out: bool
+        deadline = monotonic() + waiting_timeout_in_seconds
+        rules = [[selector_type, selector_rule] for (selector_type, selector_rule) in selector_types_rules]
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return True
+            # 脚本自身在 remaining 后结束，WebDriver 的脚本超时只作兜底
+            self.__browser.set_script_timeout(remaining + 5)
+            try:
+                result = self.__browser.execute_async_script(
+                    _WAIT_FOR_SELECTORS_SCRIPT, rules, wait_type, mode, remaining * 1000
+                )
+            except TimeoutException:
+                return True
+            except WebDriverException:
+                # 页面在等待期间跳转（如重定向）会销毁脚本上下文，在新页面上继续等待
+                sleep(0.1)
+                continue
+            if result.get('error'):
+                raise ValueError(f"Invalid selector: {result['error']}")
+            return not result.get('ready')
+
     def goto_url_waiting_for_selectors(
             self,
             url: str,
             selector_types_rules: list[tuple[Literal['css', 'xpath'], str]],
             waiting_timeout_in_seconds: float = 0.2,
-            print_error_log_to_console: bool = False
+            print_error_log_to_console: bool = False,
+            mode: Literal['sequential', 'all', 'any'] = 'sequential'
     ) -> bool:  # is_timed_out: bool
         self.goto_url(url=url)
         return self.wait_for_selectors(
             wait_type='appear',
             selector_types_rules=selector_types_rules,
             waiting_timeout_in_seconds=waiting_timeout_in_seconds,
-            print_error_log_to_console=print_error_log_to_console
+            print_error_log_to_console=print_error_log_to_console,
+            mode=mode
         )
 
     def click_on_html_element(
@@ -153,6 +423,44 @@ class ChromePageRender:
                 print(f"ChromePageRender: click_on_html_element: Timed out, failed to click on element.")
             return True
 
+    def reset_state(self) -> None:
+        """清理会话状态（多余标签页、Cookie、站点存储），以便交给下一个使用者"""
+        handles = self.__browser.window_handles
+        for handle in handles[1:]:
+            self.__browser.switch_to.window(handle)
+            self.__browser.close()
+        self.__browser.switch_to.window(handles[0])
+        self.block_urls([])
+        self.__browser.get('about:blank')
+        # delete_all_cookies 只清理当前域名，这里通过 CDP 清理所有域名
+        self.__browser.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        self.__browser.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': '*', 'storageTypes': 'all'})
+
+    def is_alive(self) -> bool:
+        try:
+            self.__browser.window_handles
+            return True
+        except Exception:
+            return False
+
+    def get_memory_rss(self) -> int | None:
+        """浏览器进程树的常驻内存（字节），未安装 psutil 时返回 None"""
+        if psutil is None:
+            return None
+        pid = getattr(self.__browser, 'browser_pid', None) or self.__browser.service.process.pid
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss
+
     # def take_screenshot(self, save_path: str):
     #     self.__browser.save_screenshot(save_path)
 
@@ -165,3 +473,134 @@ class ChromePageRender:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+class BrowserPool:
+    """
+    可复用的 ChromePageRender 会话池。
+
+    通过 lease(profile) 上下文管理器租用浏览器，归还时清理状态后放回池中；
+    会话打开页面数达到 max_pages_per_session 或内存超过 max_rss_in_mb 时关闭并在下次租用时重新启动。
+    页面加载策略、无头模式只能在启动时设置，空闲会话按 LaunchProfile 区分，
+    池满且没有同配置的空闲会话时关闭一个其他配置的空闲会话，再按所需配置启动。
+    """
+
+    def __init__(
+            self,
+            browser_factory: Callable[[LaunchProfile], ChromePageRender],
+            max_size: int = 1,
+            max_pages_per_session: int = 50,
+            max_rss_in_mb: float | None = None
+    ):
+        if max_size <= 0:
+            raise ValueError('max_size <= 0.')
+        self.__browser_factory = browser_factory
+        self.__max_size = max_size
+        self.__max_pages_per_session = max_pages_per_session
+        self.__max_rss_in_bytes = max_rss_in_mb * 1024 * 1024 if max_rss_in_mb else None
+        self.__idle = []
+        self.__size = 0
+        self.__closed = False
+        self.__condition = Condition()
+        self.launched_count = 0
+        self.recycled_count = 0
+        self.lease_count = 0
+
+    @contextmanager
+    def lease(self, profile: LaunchProfile = LaunchProfile()):
+        browser = self.__acquire(profile)
+        try:
+            yield browser
+        finally:
+            self.__release(profile, browser)
+
+    def __acquire(self, profile: LaunchProfile) -> ChromePageRender:
+        evicted = None
+        with self.__condition:
+            while True:
+                if self.__closed:
+                    raise RuntimeError('BrowserPool is closed.')
+                for i, (idle_profile, idle_browser) in enumerate(self.__idle):
+                    if idle_profile == profile:
+                        del self.__idle[i]
+                        self.lease_count += 1
+                        return idle_browser
+                if self.__size < self.__max_size:
+                    self.__size += 1
+                    self.lease_count += 1
+                    break
+                if self.__idle:
+                    # 用其他配置的空闲会话的名额启动所需配置的浏览器
+                    _, evicted = self.__idle.pop(0)
+                    self.recycled_count += 1
+                    self.lease_count += 1
+                    break
+                self.__condition.wait()
+        # 在锁外关闭/启动浏览器，避免阻塞其他线程归还会话
+        if evicted is not None:
+            self.__quit(evicted)
+        try:
+            browser = self.__browser_factory(profile)
+        except Exception:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+        with self.__condition:
+            self.launched_count += 1
+        return browser
+
+    def __release(self, profile: LaunchProfile, browser: ChromePageRender) -> None:
+        reusable = False
+        recycled = False
+        if not self.__closed:
+            if self.__should_recycle(browser):
+                recycled = True
+            else:
+                try:
+                    browser.reset_state()
+                    reusable = True
+                except Exception:
+                    recycled = True
+        with self.__condition:
+            if recycled:
+                self.recycled_count += 1
+            if reusable and not self.__closed:
+                self.__idle.append((profile, browser))
+                browser = None
+            else:
+                self.__size -= 1
+            self.__condition.notify()
+        if browser is not None:
+            self.__quit(browser)
+
+    def __should_recycle(self, browser: ChromePageRender) -> bool:
+        if self.__max_pages_per_session and browser.page_count >= self.__max_pages_per_session:
+            return True
+        if self.__max_rss_in_bytes:
+            rss = browser.get_memory_rss()
+            if rss is not None and rss > self.__max_rss_in_bytes:
+                return True
+        return not browser.is_alive()
+
+    @staticmethod
+    def __quit(browser: ChromePageRender) -> None:
+        try:
+            browser.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self.__condition:
+            self.__closed = True
+            idle, self.__idle = self.__idle, []
+            self.__size -= len(idle)
+            self.__condition.notify_all()
+        for _, browser in idle:
+            self.__quit(browser)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,224 @@
+"""
+详情页解析：按主机名查找解析配置，所有网站共用同一套提取逻辑。
+
+每个网站用一条配置描述（字典，键为主机名）：
+
+    'www.drc.gov.cn': {
+        'name': '国务院发展研究中心',             # 智库名称，也作为默认作者
+        'author': '...',                          # 可选，作者与智库名称不同时填写
+        'title': ['.article-title', '.title', 'h1'],      # 候选选择器，取第一个存在的节点的文本
+        'content': ['.article-content', '.content'],
+        'fallback': True,                         # 可选，标题/正文为空时用通用规则兜底（meta/h1、常见正文容器、文本密度）
+        'clean_content': True,                    # 可选，正文是否合并空白字符
+    }
+
+主机名统一转为小写并去掉端口和开头的 "www."，查找是一次字典访问。
+除内置的 DETAIL_PROFILES 外，还可以在 settings.CRAWLER_DETAIL_PROFILES 中添加或覆盖配置，
+或由其他已安装的包通过入口点组 DETAIL_PROFILE_ENTRY_POINT_GROUP 提供（入口点对象为同样格式的字典）。
+"""
+import re
+from functools import lru_cache
+from importlib.metadata import entry_points
+from urllib.parse import urlparse
+
+from crawlers.utils.selector_learning import GENERIC_SELECTOR
+from crawlers.utils.text_density import extract_main_text
+
+DETAIL_PROFILE_ENTRY_POINT_GROUP = 'thinktank_crawler.detail_profiles'
+
+# 内置的详情页配置
+DETAIL_PROFILES = {
+    'www.ciecc.com.cn': {
+        'name': '中国国际工程咨询有限公司',
+        'author': '中国国际工程咨询有限公司（智库建议）',
+        'title': ['.comnewsl.fl tr'],
+        'content': ['.bt_content'],
+        'fallback': False,
+        'clean_content': False,
+    },
+    'nads.ruc.edu.cn': {
+        'name': '中国人民大学国家发展与战略研究院',
+        'title': ['h1.title', '.article-title h1', '.content-title h1', 'h1', '.title'],
+        'content': ['.article-content', '.content-text', '.article-text', '.content', '.text'],
+    },
+    'www.drc.gov.cn': {
+        'name': '国务院发展研究中心',
+        'title': ['.article-title', '.title', 'h1', '.headline'],
+        'content': ['.article-content', '.content', '.text', '.article-text', '.main-content'],
+    },
+    'www.cas.cn': {
+        'name': '中国科学院',
+        'title': ['.article-title', '.title', 'h1', '.headline', '.news-title'],
+        'content': ['.article-content', '.content', '.text', '.article-text', '.news-content', '.main-content'],
+    },
+    'www.amr.org.cn': {
+        'name': '中国宏观经济研究院',
+        'title': ['.article-title', '.title', 'h1', '.headline', '.news-title'],
+        'content': ['.article-content', '.content', '.text', '.article-text', '.news-content', '.main-content'],
+    },
+    'www.ccidgroup.com': {
+        'name': 'CCiD赛迪研究院',
+        'title': ['.article-title', '.title', 'h1', '.headline', '.news-title'],
+        'content': ['.article-content', '.content', '.text', '.article-text', '.news-content', '.main-content'],
+    },
+    'www.sass.org.cn': {
+        'name': '上海社会科学院',
+        'title': ['.article-title', '.title', 'h1', '.headline', '.news-title'],
+        'content': ['.article-content', '.content', '.text', '.article-text', '.news-content', '.main-content'],
+    },
+}
+
+# 通用兜底规则
+GENERIC_TITLE_SELECTORS = ['h1', '.title h1', '.article-title h1', '.arti_title', '.wp_article_title', 'h2']
+GENERIC_CONTENT_SELECTORS = [
+    '.TRS_Editor', '.v_news_content', '.wp_articlecontent', '.article-content',
+    '.content', '.article', '.text', '.detail-content', '#content', '.read', '.articleText'
+]
+
+
+def normalize_host(host: str) -> str:
+    """小写，去掉端口、末尾的点和开头的 www."""
+    host = (host or '').lower().rsplit('@', 1)[-1].split(':', 1)[0].rstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+
+def clean_text(text: str) -> str:
+    """清理文本内容，去除多余空白字符"""
+    if text:
+        return re.sub(r'\s+', ' ', text.strip())
+    return ''
+
+
+class DetailParserRegistry:
+    """主机名 → 详情页配置"""
+
+    def __init__(self, profiles: dict = None):
+        self.__profiles = {}
+        for host, profile in (profiles or {}).items():
+            self.register(host, profile)
+
+    def register(self, host: str, profile: dict) -> None:
+        if not profile.get('name'):
+            raise ValueError(f"Detail profile for {host} must have a name.")
+        self.__profiles[normalize_host(host)] = profile
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        return normalize_host(urlparse(url).netloc)
+
+    def get(self, url: str) -> dict | None:
+        """按 URL 的主机名查找配置，没有时返回 None"""
+        return self.__profiles.get(self.host_key(url))
+
+    def hosts(self) -> list[str]:
+        return sorted(self.__profiles)
+
+    def profiles(self) -> dict:
+        """规范化主机名 → 配置，可用于在其他进程中重建同样的注册表"""
+        return dict(self.__profiles)
+
+
+@lru_cache(maxsize=1)
+def get_detail_registry() -> DetailParserRegistry:
+    """内置配置 → 入口点 → settings.CRAWLER_DETAIL_PROFILES，后者覆盖前者"""
+    from django.conf import settings
+    registry = DetailParserRegistry(DETAIL_PROFILES)
+    for entry_point in entry_points(group=DETAIL_PROFILE_ENTRY_POINT_GROUP):
+        for host, profile in entry_point.load().items():
+            registry.register(host, profile)
+    for host, profile in getattr(settings, 'CRAWLER_DETAIL_PROFILES', {}).items():
+        registry.register(host, profile)
+    return registry
+
+
+def generic_title(backend, doc) -> str:
+    # meta 优先
+    meta_title = backend.select_one(doc, 'meta[property="og:title"][content]')
+    if meta_title is None:
+        meta_title = backend.select_one(doc, 'meta[name="title"][content]')
+    if meta_title is not None and backend.attr(meta_title, 'content'):
+        return clean_text(backend.attr(meta_title, 'content'))
+    # h1/h2 次之
+    for selector in GENERIC_TITLE_SELECTORS:
+        node = backend.select_one(doc, selector)
+        if node is not None and backend.text(node).strip():
+            return clean_text(backend.text(node))
+    # 最后用 <title>
+    title_node = backend.select_one(doc, 'title')
+    if title_node is not None and backend.text(title_node).strip():
+        return clean_text(backend.text(title_node))
+    return ''
+
+
+def generic_content(backend, doc) -> str:
+    # 移除无关节点
+    backend.remove(doc, ['script', 'style', 'noscript'])
+    # 常见正文容器优先
+    for selector in GENERIC_CONTENT_SELECTORS:
+        node = backend.select_one(doc, selector)
+        if node is not None and backend.text(node).strip():
+            return clean_text(backend.text(node, "\n"))
+    # 兜底：一次遍历按文本密度选出正文块，保留分段
+    return extract_main_text(backend, doc)
+
+
+GENERIC_EXTRACTORS = {'title': generic_title, 'content': generic_content}
+
+
+def _node_text(backend, node, field: str, profile: dict) -> str:
+    text = backend.text(node)
+    return clean_text(text) if field == 'title' or profile.get('clean_content', True) else text
+
+
+def _extract_field(backend, doc, field: str, profile: dict, learner, host: str) -> str:
+    selectors = profile.get(field, [])
+    fallback = profile.get('fallback', True)
+
+    # 先只试学习到的选择器（配置中已没有该选择器时忽略）
+    learned = learner.get(host, field) if learner is not None else None
+    # 通用规则几乎不会失效，定期跳过它按配置顺序重新尝试，配置的选择器恢复命中时改用配置的选择器
+    if learned == GENERIC_SELECTOR and fallback and not (selectors and learner.recheck_due(host, field)):
+        text = GENERIC_EXTRACTORS[field](backend, doc)
+        if text:
+            learner.record_hit(host, field)
+            return text
+        learner.record_miss(host, field)
+    elif learned in selectors:
+        node = backend.select_one(doc, learned)
+        text = _node_text(backend, node, field, profile) if node is not None else ''
+        if text:
+            learner.record_hit(host, field)
+            return text
+        learner.record_miss(host, field)
+
+    # 按配置顺序取第一个存在的节点（即使文本为空），为空时用通用规则兜底
+    text, winner = '', None
+    for selector in selectors:
+        node = backend.select_one(doc, selector)
+        if node is not None:
+            text = _node_text(backend, node, field, profile)
+            winner = selector if text else None
+            break
+    if not text and fallback:
+        text = GENERIC_EXTRACTORS[field](backend, doc)
+        winner = GENERIC_SELECTOR if text else None
+    if learner is not None:
+        learner.learn(host, field, winner)
+    return text
+
+
+def extract_detail(backend, doc, profile: dict, learner=None, host: str = None) -> dict | None:
+    """
+    按配置提取标题和正文，任一为空时返回 None。
+    传入 learner（SelectorLearner）和 host（DetailParserRegistry.host_key）时优先使用该主机学到的选择器。
+    """
+    title = _extract_field(backend, doc, 'title', profile, learner, host)
+    content = _extract_field(backend, doc, 'content', profile, learner, host)
+    if not title or not content:
+        return None
+    return {
+        'title': title,
+        'content': content,
+        'authors': profile.get('author') or profile['name'],
+        'thinktank_name': profile['name'],
+    }
@@ -0,0 +1,116 @@
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Hashable, Iterable, Iterator, NamedTuple
+
+from crawlers.utils.host_scheduler import HostParkedError, get_host
+from crawlers.utils.static_fetcher import StaticPageFetcher
+
+
+class FetchResult(NamedTuple):
+    key: Hashable
+    url: str
+    host: str
+    html: str | None
+    size_in_bytes: int
+    elapsed_in_seconds: float
+    error: Exception | None = None
+
+
+class ConcurrentPageFetcher:
+    """
+    在线程池中并发抓取一批页面，共享 StaticPageFetcher 的 keep-alive 连接池。
+
+    同时进行的请求不超过 concurrency 个，同一主机不超过 per_host 个；
+    各主机的待抓队列轮流派发，某个主机慢不会占满所有线程。
+    static_fetcher 带有 HostScheduler 时，只派发已拿到限速名额的主机，等待名额不占用线程；
+    已熔断主机的剩余页面直接以 HostParkedError 结果返回。
+    结果按完成顺序产出，调用方处理结果期间不会派发新的请求。
+    给定 deadline（time.monotonic() 时间）时，到期后不再派发新请求，只等待进行中的请求完成，
+    未派发的页面不产出结果。
+    """
+
+    def __init__(self, static_fetcher: StaticPageFetcher, concurrency: int = 8, per_host: int = 2):
+        if concurrency <= 0 or per_host <= 0:
+            raise ValueError('concurrency and per_host must be positive.')
+        self.__static_fetcher = static_fetcher
+        self.__concurrency = concurrency
+        self.__per_host = per_host
+
+    def fetch_all(self, jobs: Iterable[tuple[Hashable, str]], deadline: float = None) -> Iterator[FetchResult]:
+        """jobs 为 (key, url) 序列，key 原样带回结果中"""
+        return self.run_all(jobs, self.__fetch, deadline)
+
+    def run_all(self, jobs: Iterable[tuple[Hashable, str]], function, deadline: float = None) -> Iterator:
+        """
+        同 fetch_all，但每个任务由 function(key, url, host) 在线程池中执行（如下载附件），产出其返回值；
+        function 需自行捕获异常，请求前不必再占用限速名额（slot_acquired=True）。
+        已熔断主机的任务不调用 function，产出 error 为 HostParkedError 的 FetchResult。
+        """
+        queues = defaultdict(deque)
+        for key, url in jobs:
+            queues[get_host(url)].append((key, url))
+        hosts = deque(queues)
+        active = Counter()
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.__concurrency, thread_name_prefix='detail') as executor:
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    queues.clear()
+                    hosts.clear()
+                yield from self.__dispatch(executor, function, queues, hosts, active, in_flight)
+                if not in_flight:
+                    if not hosts:
+                        return
+                    # 所有主机都在等待限速名额
+                    time.sleep(min(self.__next_ready_in(hosts), 1.0))
+                    continue
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED, timeout=self.__next_ready_in(hosts))
+                for future in done:
+                    host = in_flight.pop(future)
+                    active[host] -= 1
+                    yield future.result()
+
+    def __next_ready_in(self, hosts) -> float | None:
+        scheduler = self.__static_fetcher.scheduler
+        if scheduler is None or not hosts:
+            return None
+        return max(min(scheduler.wait_time(host) for host in hosts), 0.01)
+
+    def __dispatch(self, executor, function, queues, hosts, active, in_flight):
+        # 轮询各主机，直到全局并发已满或没有主机还能派发；产出已熔断主机的失败结果
+        scheduler = self.__static_fetcher.scheduler
+        idle_rounds = 0
+        while hosts and len(in_flight) < self.__concurrency and idle_rounds < len(hosts):
+            host = hosts[0]
+            hosts.rotate(-1)
+            if active[host] >= self.__per_host:
+                idle_rounds += 1
+                continue
+            if scheduler is not None:
+                try:
+                    if not scheduler.try_acquire(host):
+                        idle_rounds += 1
+                        continue
+                except HostParkedError as e:
+                    for key, url in queues.pop(host):
+                        yield FetchResult(key, url, host, None, 0, 0.0, e)
+                    hosts.remove(host)
+                    continue
+            key, url = queues[host].popleft()
+            if not queues[host]:
+                del queues[host]
+                hosts.remove(host)
+            active[host] += 1
+            in_flight[executor.submit(function, key, url, host)] = host
+            idle_rounds = 0
+
+    def __fetch(self, key: Hashable, url: str, host: str) -> FetchResult:
+        started = time.perf_counter()
+        slot_acquired = self.__static_fetcher.scheduler is not None
+        try:
+            response = self.__static_fetcher.fetch_response(url, slot_acquired=slot_acquired)
+            return FetchResult(key, url, host, response.text, len(response.content), time.perf_counter() - started)
+        except Exception as e:
+            return FetchResult(key, url, host, None, 0, time.perf_counter() - started, e)
@@ -0,0 +1,44 @@
+"""
+详情页抓取失败后的重试策略。
+
+每次失败后按指数退避推迟下次抓取：base_delay_minutes × 2^(attempts-1)，不超过 max_delay_hours；
+404/410 或失败次数达到 max_attempts 后标记为 dead，不再抓取。
+默认参数来自 settings.CRAWLER_DETAIL_RETRY，见 RetryPolicy.from_settings。
+"""
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+import requests
+
+# 说明页面已不存在的状态码，不再重试
+PERMANENT_STATUS_CODES = (404, 410)
+
+
+class RetryPolicy(NamedTuple):
+    base_delay_minutes: float = 60
+    max_delay_hours: float = 168
+    max_attempts: int = 6
+
+    @classmethod
+    def from_settings(cls) -> 'RetryPolicy':
+        from django.conf import settings
+        return cls(**getattr(settings, 'CRAWLER_DETAIL_RETRY', {}))
+
+    def delay(self, attempts: int) -> timedelta:
+        """第 attempts 次失败后的等待时间"""
+        minutes = self.base_delay_minutes * 2 ** max(attempts - 1, 0)
+        return min(timedelta(minutes=minutes), timedelta(hours=self.max_delay_hours))
+
+    def next_attempt_at(self, attempts: int, now: datetime) -> datetime | None:
+        """第 attempts 次失败后的下次抓取时间，重试次数用尽时返回 None"""
+        if attempts >= self.max_attempts:
+            return None
+        return now + self.delay(attempts)
+
+
+def classify_error(error: Exception) -> tuple[str, bool]:
+    """返回 (错误类别, 是否永久失败)，错误类别写入 Article.detail_last_error"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status_code = error.response.status_code
+        return f'HTTPError {status_code}', status_code in PERMANENT_STATUS_CODES
+    return type(error).__name__, False
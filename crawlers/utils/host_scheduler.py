@@ -0,0 +1,214 @@
+"""
+按主机的请求调度：令牌桶限速、AIMD 自适应退避和熔断。
+
+- 每个主机一个令牌桶，默认每秒 rate_per_second 个请求，可在 host_rates 中为单个主机单独设置
+- 请求成功且不慢时速率加性恢复（+increase_step，不超过配置值）；
+  连接错误、超时、429/5xx 或响应慢于 slow_response_seconds 时速率乘性下降（×decrease_factor，不低于 min_rate_per_second）
+- 429/503 带 Retry-After 时在该时间之前不再请求该主机
+- 连续 max_consecutive_failures 次失败后熔断：本次运行剩余时间内不再请求该主机
+
+默认参数来自 settings.CRAWLER_HOST_SCHEDULER，见 HostScheduler.from_settings。
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+# Retry-After 最长遵守的秒数
+MAX_RETRY_AFTER_SECONDS = 300
+
+
+def get_host(url: str) -> str:
+    return (urlparse(url).hostname or '').lower()
+
+
+class HostParkedError(Exception):
+    """主机已熔断，本次运行不再请求"""
+
+
+class _HostState:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.configured_rate = rate
+        self.rate = rate
+        self.tokens = burst
+        self.updated_at = now
+        self.not_before = 0.0
+        self.consecutive_failures = 0
+        self.parked_reason = None
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.throttled = 0
+        self.slow = 0
+        self.total_latency = 0.0
+        self.total_wait = 0.0
+
+
+class HostScheduler:
+    """线程安全，一次运行中由所有抓取线程共享"""
+
+    def __init__(
+            self,
+            rate_per_second: float = 2.0,
+            burst: float = 4,
+            host_rates: dict = None,
+            min_rate_per_second: float = 0.1,
+            increase_step: float = 0.1,
+            decrease_factor: float = 0.5,
+            slow_response_seconds: float = 10,
+            max_consecutive_failures: int = 5
+    ):
+        if rate_per_second <= 0 or min_rate_per_second <= 0:
+            raise ValueError('rate_per_second and min_rate_per_second must be positive.')
+        if not 0 < decrease_factor < 1:
+            raise ValueError('decrease_factor must be between 0 and 1.')
+        self.__rate_per_second = rate_per_second
+        self.__burst = max(1, burst)
+        self.__host_rates = {host.lower(): rate for host, rate in (host_rates or {}).items()}
+        self.__min_rate_per_second = min_rate_per_second
+        self.__increase_step = increase_step
+        self.__decrease_factor = decrease_factor
+        self.__slow_response_seconds = slow_response_seconds
+        self.__max_consecutive_failures = max_consecutive_failures
+        self.__hosts = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, **overrides) -> 'HostScheduler':
+        """读取 settings.CRAWLER_HOST_SCHEDULER，overrides 中不为 None 的参数优先"""
+        from django.conf import settings
+        options = dict(getattr(settings, 'CRAWLER_HOST_SCHEDULER', {}))
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**options)
+
+    def __state(self, host: str, now: float) -> _HostState:
+        state = self.__hosts.get(host)
+        if state is None:
+            rate = self.__host_rates.get(host, self.__rate_per_second)
+            state = self.__hosts[host] = _HostState(rate, self.__burst, now)
+        # 补充令牌
+        state.tokens = min(self.__burst, state.tokens + (now - state.updated_at) * state.rate)
+        state.updated_at = now
+        return state
+
+    @staticmethod
+    def __seconds_until_ready(state: _HostState, now: float) -> float:
+        if state.parked_reason is not None:
+            return float('inf')
+        wait = max(state.not_before - now, 0.0)
+        if state.tokens < 1:
+            wait = max(wait, (1 - state.tokens) / state.rate)
+        return wait
+
+    def wait_time(self, host: str) -> float:
+        """距离该主机可以发出下一个请求的秒数，已熔断时为 inf"""
+        with self.__lock:
+            now = time.monotonic()
+            return self.__seconds_until_ready(self.__state(host, now), now)
+
+    def try_acquire(self, host: str) -> bool:
+        """不等待：有令牌时占用并返回 True；主机已熔断时抛出 HostParkedError"""
+        with self.__lock:
+            now = time.monotonic()
+            state = self.__state(host, now)
+            if state.parked_reason is not None:
+                raise HostParkedError(f"{host} 已熔断: {state.parked_reason}")
+            if self.__seconds_until_ready(state, now) > 0:
+                return False
+            state.tokens -= 1
+            state.requests += 1
+            return True
+
+    def acquire(self, host: str) -> None:
+        """等待直到可以请求该主机；主机已熔断时抛出 HostParkedError"""
+        started = time.monotonic()
+        while not self.try_acquire(host):
+            time.sleep(min(self.wait_time(host), 1.0))
+        with self.__lock:
+            self.__hosts[host].total_wait += time.monotonic() - started
+
+    def record(
+            self,
+            host: str,
+            elapsed_in_seconds: float,
+            ok: bool,
+            status_code: int = None,
+            retry_after: str = None
+    ) -> None:
+        """记录一次请求的结果，据此调整该主机的速率和熔断状态"""
+        with self.__lock:
+            now = time.monotonic()
+            state = self.__state(host, now)
+            state.total_latency += elapsed_in_seconds
+
+            if ok:
+                state.successes += 1
+                state.consecutive_failures = 0
+                if elapsed_in_seconds > self.__slow_response_seconds:
+                    state.slow += 1
+                    self.__decrease(state)
+                else:
+                    state.rate = min(state.configured_rate, state.rate + self.__increase_step)
+                return
+
+            state.failures += 1
+            # 404 等客户端错误说明不了主机的负载情况，不参与退避和熔断
+            if status_code is not None and status_code < 500 and status_code != 429:
+                return
+            if status_code in (429, 503):
+                state.throttled += 1
+                retry_after_seconds = self.__parse_retry_after(retry_after)
+                if retry_after_seconds:
+                    state.not_before = max(state.not_before, now + retry_after_seconds)
+            self.__decrease(state)
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= self.__max_consecutive_failures and state.parked_reason is None:
+                state.parked_reason = f'连续 {state.consecutive_failures} 次请求失败'
+
+    def __decrease(self, state: _HostState) -> None:
+        state.rate = max(self.__min_rate_per_second, state.rate * self.__decrease_factor)
+
+    @staticmethod
+    def __parse_retry_after(retry_after: str | None) -> float | None:
+        # 只处理秒数形式，HTTP 日期形式忽略
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER_SECONDS) if retry_after else None
+        except ValueError:
+            return None
+
+    def is_parked(self, host: str) -> bool:
+        with self.__lock:
+            state = self.__hosts.get(host)
+            return state is not None and state.parked_reason is not None
+
+    def stats(self) -> dict[str, dict]:
+        """各主机的统计信息快照"""
+        with self.__lock:
+            return {
+                host: {
+                    'requests': state.requests,
+                    'successes': state.successes,
+                    'failures': state.failures,
+                    'throttled': state.throttled,
+                    'slow': state.slow,
+                    'average_latency': state.total_latency / max(state.successes + state.failures, 1),
+                    'total_wait': state.total_wait,
+                    'rate': state.rate,
+                    'configured_rate': state.configured_rate,
+                    'parked_reason': state.parked_reason,
+                }
+                for host, state in self.__hosts.items()
+            }
+
+    def report_lines(self) -> list[str]:
+        """按请求数排序的各主机统计，供管理命令在运行结束时输出"""
+        lines = []
+        for host, stat in sorted(self.stats().items(), key=lambda entry: -entry[1]['requests']):
+            line = (
+                f"{host or '(无效 URL)'}: 请求 {stat['requests']}，成功 {stat['successes']}，失败 {stat['failures']}"
+                f" (限流 {stat['throttled']}，慢响应 {stat['slow']})，平均 {stat['average_latency'] * 1000:.0f} ms，"
+                f"排队 {stat['total_wait']:.1f} s，速率 {stat['rate']:.2f}/{stat['configured_rate']:.2f} 次/秒"
+            )
+            if stat['parked_reason']:
+                line += f"，已熔断: {stat['parked_reason']}"
+            lines.append(line)
+        return lines
@@ -0,0 +1,175 @@
+"""
+可插拔的 HTML 解析后端。
+
+列表页解析和详情页解析都只通过这里的接口访问 DOM，以便在不同解析库之间切换：
+
+- lxml: lxml.html 解析，CSS 选择器经 cssselect 编译为 XPath 并缓存（默认）
+- soup: BeautifulSoup + html.parser，lxml/cssselect 不可用时的兜底
+
+通过 settings.CRAWLER_HTML_PARSER 或 get_parser_backend(name) 选择后端。
+"""
+import threading
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, PreformattedString, Tag
+
+try:
+    import lxml.html
+    from cssselect import HTMLTranslator
+    from lxml import etree
+except ImportError:  # 缺少 lxml 或 cssselect 时只能使用 BeautifulSoup
+    lxml = None
+
+
+class LxmlBackend:
+    name = 'lxml'
+
+    def __init__(self):
+        # lxml 的解析器实例不能跨线程共享，每个线程各持有一个
+        self.__local = threading.local()
+
+    def parse(self, html_content: str):
+        """解析 HTML 字符串，空文档返回 None"""
+        if not html_content or not html_content.strip():
+            return None
+        # 以 bytes 传入，避免带 encoding 声明的 XHTML 字符串被 lxml 拒绝；
+        # 总是构造完整文档，片段（如 CDATA 记录）的最外层节点也能被后代选择器匹配
+        parser = getattr(self.__local, 'parser', None)
+        if parser is None:
+            parser = self.__local.parser = lxml.html.HTMLParser(encoding='utf-8')
+        try:
+            return lxml.html.document_fromstring(html_content.encode('utf-8'), parser=parser)
+        except etree.ParserError:
+            return None
+
+    def select(self, node, css_selector: str) -> list:
+        return _compile_selector(css_selector)(node)
+
+    def select_one(self, node, css_selector: str):
+        matches = _compile_selector(css_selector)(node)
+        return matches[0] if matches else None
+
+    def text(self, node, separator: str = '') -> str:
+        if not separator:
+            return node.text_content()
+        return separator.join(node.itertext())
+
+    def attr(self, node, name: str, default: str = '') -> str:
+        return node.get(name, default)
+
+    def remove(self, root, tag_names: list) -> None:
+        """删除指定标签及其内容（保留节点后面的文本）"""
+        for node in list(root.iter(*tag_names)):
+            node.drop_tree()
+
+    def tag(self, node) -> str:
+        # 注释、处理指令的 tag 不是字符串
+        return node.tag if isinstance(node.tag, str) else ''
+
+    def walk(self, root):
+        """按文档顺序产出 ('start', 节点)、('text', 文本)、('end', 节点)，不包含注释"""
+        yield 'start', root
+        if root.text:
+            yield 'text', root.text
+        stack = [(root, iter(root))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield 'end', node
+                # 节点后面的文本属于父节点，根节点的 tail 不在子树内
+                if stack and node.tail:
+                    yield 'text', node.tail
+            elif isinstance(child.tag, str):
+                yield 'start', child
+                if child.text:
+                    yield 'text', child.text
+                stack.append((child, iter(child)))
+            elif child.tail:
+                yield 'text', child.tail
+
+
+class SoupBackend:
+    name = 'soup'
+
+    def __init__(self, features: str = 'html.parser'):
+        self.__features = features
+
+    def parse(self, html_content: str):
+        if not html_content or not html_content.strip():
+            return None
+        return BeautifulSoup(html_content, self.__features)
+
+    def select(self, node, css_selector: str) -> list:
+        return node.select(css_selector)
+
+    def select_one(self, node, css_selector: str):
+        return node.select_one(css_selector)
+
+    def text(self, node, separator: str = '') -> str:
+        return node.get_text(separator)
+
+    def attr(self, node, name: str, default: str = '') -> str:
+        value = node.get(name, default)
+        # class 等多值属性在 BeautifulSoup 中是列表
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def remove(self, root, tag_names: list) -> None:
+        for node in root(tag_names):
+            node.extract()
+
+    def tag(self, node) -> str:
+        return node.name or ''
+
+    def walk(self, root):
+        """按文档顺序产出 ('start', 节点)、('text', 文本)、('end', 节点)，不包含注释"""
+        yield 'start', root
+        stack = [(root, iter(root.contents))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield 'end', node
+            elif isinstance(child, Tag):
+                yield 'start', child
+                stack.append((child, iter(child.contents)))
+            elif isinstance(child, NavigableString) and not isinstance(child, PreformattedString):
+                yield 'text', str(child)
+
+
+if lxml is not None:
+    _css_translator = HTMLTranslator()
+
+    @lru_cache(maxsize=512)
+    def _compile_selector(css_selector: str):
+        """把 CSS 选择器编译为只匹配后代节点的 XPath（与 BeautifulSoup.select 语义一致）"""
+        return etree.XPath(_css_translator.css_to_xpath(css_selector, prefix='descendant::'))
+
+
+PARSER_BACKENDS = {
+    'lxml': LxmlBackend,
+    'soup': SoupBackend,
+}
+
+_backend_instances = {}
+
+
+def available_backends() -> list[str]:
+    return [name for name in PARSER_BACKENDS if name != 'lxml' or lxml is not None]
+
+
+def get_parser_backend(name: str = None):
+    """返回解析后端实例；未指定时读取 settings.CRAWLER_HTML_PARSER，lxml 不可用时退回 soup"""
+    if name is None:
+        from django.conf import settings
+        name = getattr(settings, 'CRAWLER_HTML_PARSER', 'lxml')
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {name}")
+    if name == 'lxml' and lxml is None:
+        name = 'soup'
+    if name not in _backend_instances:
+        _backend_instances[name] = PARSER_BACKENDS[name]()
+    return _backend_instances[name]
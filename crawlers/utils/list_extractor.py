@@ -0,0 +1,227 @@
+"""
+规则驱动的列表页解析。
+
+每种列表页用一条规则描述（字典，可直接写进 CrawlTask.crawler_config 的 config.extract）：
+
+    {
+        'container': 'ul.gl_list2',          # 可选，列表容器；字符串或按顺序逐层查找的列表，找不到容器时返回空
+        'item': 'li',                        # 每条文章的节点
+        'link': 'a',                         # 条目中的链接，取 href；缺失时跳过该条目
+        'title': [{'scope': 'link', 'attr': 'title'}, {'scope': 'link'}],
+        'date': [{'selector': 'span'}],
+        'summary': [{'selector': 'p.newsinfo'}],
+        'summary_max_length': 300,
+        'records': {                         # 可选，页面把条目放在 <record><![CDATA[...]]></record> 中时使用
+            'pattern': r'<record><!\[CDATA\[(.*?)\]\]></record>',
+            'rule': {...},                   # 每个记录片段使用的规则，格式同上
+        },
+    }
+
+字段（title/date/summary）是候选列表，按顺序取第一个非空值：
+scope 为 item（默认）、link 或 container，表示从哪个节点开始查找；
+selector 省略时使用 scope 节点本身；attr 省略时取文本。title 为空的条目会被跳过。
+
+规则在第一次使用时编译并缓存，选择器由解析后端（默认 lxml，见 html_parser）编译为 XPath 并缓存，
+之后每页只走同一条解析路径。
+"""
+import json
+import re
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from crawlers.utils.html_parser import get_parser_backend
+
+
+# 内置的列表页规则，对应 init_thinktanks 中的 handler1 ~ handler7
+HANDLER_RULES = {
+    # 中国国际工程咨询有限公司
+    'handler1': {
+        'records': {
+            'pattern': r'<record><!\[CDATA\[(.*?)\]\]></record>',
+            'rule': {
+                'container': 'div.news-list',
+                'item': 'div.newscontent',
+                'link': 'a',
+                'title': [{'scope': 'link', 'selector': 'h3'}],
+                'date': [{'scope': 'container', 'selector': 'span.newsdate'}],
+                'summary': [{'selector': 'p.newsinfo'}],
+                'summary_max_length': 300,
+            },
+        },
+        'container': 'div.default_pgContainer',
+        'item': 'div.newscontent',
+        'link': 'a',
+        'title': [{'scope': 'link', 'selector': 'h3'}, {'scope': 'link'}],
+        'date': [{'selector': 'span.newsdate'}],
+        'summary': [{'selector': 'p.newsinfo'}],
+        'summary_max_length': 300,
+    },
+    # 中国人民大学国家发展与战略研究院
+    'handler2': {
+        'item': 'div.briefItem',
+        'link': 'a',
+        'title': [{'scope': 'link', 'selector': 'h3'}],
+        'date': [{'scope': 'link', 'selector': 'span'}],
+    },
+    # 国务院发展研究中心
+    'handler3': {
+        'item': 'div.re_box',
+        'link': 'a',
+        'title': [{'scope': 'link', 'attr': 'title'}, {'scope': 'link'}],
+        'date': [{'selector': 'span'}],
+    },
+    # 中国科学院
+    'handler4': {
+        'container': 'ul.gl_list2',
+        'item': 'li',
+        'link': 'a',
+        'title': [{'scope': 'link', 'attr': 'title'}, {'scope': 'link'}],
+        'date': [{'selector': 'span'}],
+    },
+    # 中国宏观经济研究院
+    'handler5': {
+        'container': 'ul.u-list',
+        'item': 'li',
+        'link': 'a',
+        'title': [{'scope': 'link', 'attr': 'title'}, {'scope': 'link'}],
+        'date': [{'selector': 'span'}],
+    },
+    # CCiD赛迪研究院
+    'handler6': {
+        'container': ['div.new_list.new0', 'ul'],
+        'item': 'li',
+        'link': 'a',
+        'title': [{'scope': 'link'}],
+        'date': [{'selector': 'span'}],
+    },
+    # 上海社会科学院
+    'handler7': {
+        'container': 'ul.cols_list.clearfix',
+        'item': 'li',
+        'link': 'a',
+        'title': [{'scope': 'link'}],
+        'date': [{'selector': 'span.cols_meta'}],
+    },
+}
+
+def get_list_rule(crawler_type: str, crawler_settings: dict = None) -> dict | None:
+    """任务配置中的 extract 规则优先，否则使用 crawler_type 对应的内置规则"""
+    if crawler_settings and crawler_settings.get('extract'):
+        return crawler_settings['extract']
+    return HANDLER_RULES.get(crawler_type)
+
+
+def get_fragment_selectors(rule: dict) -> list[str]:
+    """
+    规则实际读取的最外层节点的 CSS 选择器：有 container 时为第一层容器，否则为条目本身。
+    浏览器渲染时只需取回这些节点的 HTML；records 规则要在原始 HTML 上匹配，返回空列表表示不能裁剪。
+    """
+    if rule.get('records'):
+        return []
+    container = rule.get('container')
+    if container:
+        return [container if isinstance(container, str) else container[0]]
+    return [rule['item']]
+
+
+def extract_list_items(html_content: str, rule: dict, base_url: str, backend=None) -> list[dict]:
+    """按规则解析列表页，返回 [{'title', 'url', 'publish_date_str', 'summary'}, ...]"""
+    backend = backend or get_parser_backend()
+    compiled = compile_rule(rule)
+    if compiled.records_pattern is not None:
+        records = compiled.records_pattern.findall(html_content)
+        if records:
+            items = []
+            for record_html in records:
+                record_root = backend.parse(record_html)
+                if record_root is not None:
+                    items.extend(compiled.record_rule.extract(backend, record_root, base_url))
+            return items
+    root = backend.parse(html_content)
+    if root is None:
+        return []
+    return compiled.extract(backend, root, base_url)
+
+
+def compile_rule(rule: dict) -> 'CompiledListRule':
+    # 规则是普通字典，序列化后作为缓存键
+    return _compile_rule_cached(json.dumps(rule, sort_keys=True, ensure_ascii=False))
+
+
+@lru_cache(maxsize=128)
+def _compile_rule_cached(rule_json: str) -> 'CompiledListRule':
+    return CompiledListRule(json.loads(rule_json))
+
+
+def _clean_text(text: str) -> str:
+    return ' '.join(text.split()) if text else ''
+
+
+class _CompiledField:
+    def __init__(self, candidate: dict):
+        self.scope = candidate.get('scope', 'item')
+        self.selector = candidate.get('selector')
+        self.attr = candidate.get('attr')
+
+    def value(self, backend, nodes: dict) -> str:
+        node = nodes.get(self.scope)
+        if node is None:
+            return ''
+        if self.selector:
+            node = backend.select_one(node, self.selector)
+            if node is None:
+                return ''
+        if self.attr:
+            return _clean_text(backend.attr(node, self.attr))
+        return _clean_text(backend.text(node))
+
+
+class CompiledListRule:
+    def __init__(self, rule: dict):
+        container = rule.get('container') or []
+        if isinstance(container, str):
+            container = [container]
+        self.container_selectors = container
+        self.item_selector = rule['item']
+        self.link_selector = rule.get('link', 'a')
+        self.title_fields = [_CompiledField(candidate) for candidate in rule.get('title', [{'scope': 'link'}])]
+        self.date_fields = [_CompiledField(candidate) for candidate in rule.get('date', [])]
+        self.summary_fields = [_CompiledField(candidate) for candidate in rule.get('summary', [])]
+        self.summary_max_length = rule.get('summary_max_length', 300)
+
+        records = rule.get('records')
+        self.records_pattern = re.compile(records['pattern'], re.DOTALL) if records else None
+        self.record_rule = CompiledListRule(records['rule']) if records else None
+
+    def extract(self, backend, root, base_url: str) -> list[dict]:
+        container = root
+        for selector in self.container_selectors:
+            container = backend.select_one(container, selector)
+            if container is None:
+                return []
+
+        items = []
+        for item_node in backend.select(container, self.item_selector):
+            link = backend.select_one(item_node, self.link_selector)
+            if link is None:
+                continue
+            nodes = {'item': item_node, 'link': link, 'container': container}
+
+            title = self.__first_value(backend, self.title_fields, nodes)
+            if not title:
+                continue
+            items.append({
+                'title': title,
+                'url': urljoin(base_url, backend.attr(link, 'href')),
+                'publish_date_str': self.__first_value(backend, self.date_fields, nodes),
+                'summary': self.__first_value(backend, self.summary_fields, nodes)[:self.summary_max_length],
+            })
+        return items
+
+    @staticmethod
+    def __first_value(backend, fields: list, nodes: dict) -> str:
+        for field in fields:
+            value = field.value(backend, nodes)
+            if value:
+                return value
+        return ''
@@ -0,0 +1,129 @@
+"""
+抓取到的原始 HTML 按内容寻址压缩存档，修复解析规则后可以直接在本地重新解析，不必再访问网站。
+
+- 以 UTF-8 编码后的 SHA-256 作为文件名，存放在 <root>/<前两位>/<哈希>.html.zst（或 .html.gz）；
+  内容相同的页面只存一份，已存在时不再写入
+- 每次抓取在 PageSnapshot 表中记录一行（URL、抓取时间、哈希、抓取方式等），多行可以指向同一个文件
+- 压缩优先使用 zstd（需要可选依赖 zstandard），不可用时使用 gzip；读取时按扩展名解压
+- 过期记录和不再被引用的文件由 prune_page_archive 命令清理
+
+默认参数来自 settings.CRAWLER_PAGE_ARCHIVE，见 PageArchive.from_settings。
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # zstandard 为可选依赖，缺失时使用 gzip
+    zstandard = None
+
+CODEC_EXTENSIONS = {'zstd': '.html.zst', 'gzip': '.html.gz'}
+
+
+class PageArchive:
+    """文件写入是原子的（先写临时文件再改名），可在多个线程、进程间共享同一个目录"""
+
+    def __init__(self, root, codec: str = 'zstd', level: int = None):
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown archive codec: {codec}")
+        if codec == 'zstd' and zstandard is None:
+            codec = 'gzip'
+        self.root = Path(root)
+        self.codec = codec
+        self.__level = level
+
+    @classmethod
+    def from_settings(cls) -> 'PageArchive | None':
+        """读取 settings.CRAWLER_PAGE_ARCHIVE，未启用时返回 None"""
+        from django.conf import settings
+        options = getattr(settings, 'CRAWLER_PAGE_ARCHIVE', {})
+        if not options.get('enabled', True) or not options.get('root'):
+            return None
+        return cls(options['root'], codec=options.get('codec', 'zstd'), level=options.get('level'))
+
+    def __path(self, digest: str, codec: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{CODEC_EXTENSIONS[codec]}"
+
+    def find(self, digest: str) -> Path | None:
+        """哈希对应的存档文件，任一压缩格式存在即可"""
+        for codec in CODEC_EXTENSIONS:
+            path = self.__path(digest, codec)
+            if path.exists():
+                return path
+        return None
+
+    def __compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=self.__level or 10).compress(data)
+        return gzip.compress(data, compresslevel=self.__level or 6)
+
+    def put(self, html_content: str) -> tuple[str, int, int]:
+        """存档页面，返回 (哈希, 原始字节数, 压缩后字节数)；内容已存在时不重复写入"""
+        data = html_content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.find(digest)
+        if existing is not None:
+            # 更新修改时间：文件可能暂未被任何记录引用，prune_page_archive 不删除最近写入或复用过的文件
+            os.utime(existing)
+            return digest, len(data), existing.stat().st_size
+
+        path = self.__path(digest, self.codec)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = self.__compress(data)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(compressed)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return digest, len(data), len(compressed)
+
+    def get(self, digest: str) -> str:
+        """读取并解压存档页面，不存在时抛出 FileNotFoundError"""
+        path = self.find(digest)
+        if path is None:
+            raise FileNotFoundError(f"Archived page not found: {digest}")
+        data = path.read_bytes()
+        if path.name.endswith(CODEC_EXTENSIONS['zstd']):
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read {path}")
+            return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+        return gzip.decompress(data).decode('utf-8')
+
+    def iter_files(self):
+        """产出 (哈希, 文件路径)，包括没有任何记录引用的文件"""
+        if not self.root.exists():
+            return
+        for path in self.root.glob('??/*'):
+            name = path.name
+            for extension in CODEC_EXTENSIONS.values():
+                if name.endswith(extension):
+                    yield name[:-len(extension)], path
+                    break
+
+    def snapshot(self, url: str, html_content: str, kind: str, fetch_method: str, **fields):
+        """存档页面并返回对应的 PageSnapshot（未保存，由调用方 save 或 bulk_create）"""
+        return self.make_snapshot(url, self.put(html_content), kind, fetch_method, **fields)
+
+    @staticmethod
+    def make_snapshot(url: str, archived: tuple, kind: str, fetch_method: str, **fields):
+        """由 put 的结果构造 PageSnapshot（未保存），用于文件在其他线程或进程中写入的情况"""
+        from django.utils import timezone
+        from crawlers.models import PageSnapshot
+
+        digest, size, compressed_size = archived
+        return PageSnapshot(
+            url=url[:500],
+            kind=kind,
+            content_hash=digest,
+            fetched_at=timezone.now(),
+            fetch_method=fetch_method,
+            size_in_bytes=size,
+            compressed_size=compressed_size,
+            **fields,
+        )
@@ -0,0 +1,209 @@
+from contextlib import ExitStack, contextmanager
+from time import perf_counter, sleep
+
+from crawlers.utils.browser_renderer import BrowserPool, LaunchProfile
+from crawlers.utils.host_scheduler import get_host
+from crawlers.utils.html_parser import get_parser_backend
+from crawlers.utils.static_fetcher import StaticPageFetcher
+
+
+class TaskPageFetcher:
+    """
+    按任务的抓取策略获取列表页 HTML。
+
+    - static:  只用 requests 静态请求
+    - browser: 只用浏览器渲染
+    - auto:    先静态请求，页面中匹配不到 content_selector 时回退到浏览器；
+               只按本次运行第一个配置的列表页（非翻页规则生成的页面）判定，结果记录在 resolved_strategy 中，
+               strategy_decided 为 True，供任务缓存后续复用；其他页面匹配不到时只对该页回退
+    浏览器只在第一次需要时才从浏览器池按 launch_profile 租用，整个任务期间复用同一个会话，
+    租用后设置 blocked_url_patterns 屏蔽不需要的资源。
+    配置了 fragment_selectors 时，渲染后只从浏览器取回匹配节点的 HTML，匹配不到时再取完整 page_source。
+    静态请求由 static_fetcher 的 HostScheduler 限速，浏览器打开页面和点击翻页也占用同一主机的请求名额。
+    """
+
+    def __init__(
+            self,
+            browser_pool: BrowserPool,
+            static_fetcher: StaticPageFetcher,
+            strategy: str = 'auto',
+            resolved_strategy: str = None,
+            html_backend=None,
+            content_selector: str = None,
+            selectors_to_wait: list = None,
+            waiting_timeout: float = 10,
+            wait_mode: str = 'all',
+            fragment_selectors: list = None,
+            launch_profile: LaunchProfile = None,
+            blocked_url_patterns: list = None
+    ):
+        self.__browser_pool = browser_pool
+        self.__static_fetcher = static_fetcher
+        self.__exit_stack = ExitStack()
+        self.__browser = None
+        self.__browser_host = None
+        self.strategy = strategy
+        self.resolved_strategy = resolved_strategy
+        self.strategy_decided = False
+        self.html_backend = html_backend or get_parser_backend()
+        self.content_selector = content_selector
+        self.selectors_to_wait = selectors_to_wait or []
+        self.waiting_timeout = waiting_timeout
+        self.wait_mode = wait_mode
+        self.fragment_selectors = fragment_selectors or []
+        self.launch_profile = launch_profile or LaunchProfile()
+        self.blocked_url_patterns = blocked_url_patterns or []
+        # 最近一次 fetch 的结果信息，供调用方输出日志
+        self.last_method = None
+        self.last_timed_out = False
+        self.last_fallback_reason = None
+        self.last_page_metrics = None
+        self.last_fragment_only = False
+
+    def fetch(self, url: str, is_extra: bool = False) -> str:
+        """is_extra: 翻页规则生成的页面，可能已超出最后一页，不参与抓取方式的判定"""
+        self.__reset_page_state()
+
+        if self.strategy == 'static':
+            self.last_method = 'static'
+            return self.__static_fetcher.fetch(url)
+
+        fallback_reason = None
+        if self.strategy == 'auto' and self.resolved_strategy != 'browser':
+            try:
+                html_content = self.__static_fetcher.fetch(url)
+            except Exception as e:
+                # 网络错误可能是暂时的，只对本页回退，不改变缓存的判定
+                fallback_reason = f'静态请求失败: {e}'
+            else:
+                if self.__matches_content_selector(html_content):
+                    self.__decide('static', is_extra)
+                    self.last_method = 'static'
+                    return html_content
+                self.__decide('browser', is_extra)
+                fallback_reason = f'静态页面中未找到 {self.content_selector}'
+
+        html_content = self.fetch_with_browser(url)
+        self.last_fallback_reason = fallback_reason
+        return html_content
+
+    def __decide(self, strategy: str, is_extra: bool) -> None:
+        if is_extra or self.strategy_decided:
+            return
+        self.resolved_strategy = strategy
+        self.strategy_decided = True
+
+    def __matches_content_selector(self, html_content: str) -> bool:
+        if not self.content_selector:
+            return False
+        root = self.html_backend.parse(html_content)
+        return root is not None and self.html_backend.select_one(root, self.content_selector) is not None
+
+    def fetch_with_browser(self, url: str) -> str:
+        """不论抓取策略，用浏览器打开页面（点击翻页需要浏览器停留在列表页上）"""
+        self.__reset_page_state()
+        browser = self.get_browser()
+        self.last_method = 'browser'
+        self.__browser_host = get_host(url)
+        # 只有页面加载计入主机响应时间，等待元素的时间不算
+        with self.__scheduled_navigation(self.__browser_host):
+            browser.goto_url(url=url)
+        self.last_timed_out = browser.wait_for_selectors(
+            wait_type='appear',
+            selector_types_rules=self.selectors_to_wait,
+            waiting_timeout_in_seconds=self.waiting_timeout,
+            print_error_log_to_console=True,
+            mode=self.wait_mode
+        )
+        return self.__read_rendered_page(browser)
+
+    def fetch_next_page(self, next_button: tuple, page_wait: float = 1) -> str | None:
+        """
+        在当前浏览器页面上点击"下一页"并返回新页面内容；找不到可点击的按钮时返回 None。
+        next_button 为 (selector_type, selector_rule)。
+        """
+        self.__reset_page_state()
+        browser = self.get_browser()
+        self.last_method = 'browser'
+        selector_type, selector_rule = next_button
+        with self.__scheduled_navigation(self.__browser_host):
+            click_timed_out = browser.click_on_html_element(
+                click_element_selector_type=selector_type,
+                click_element_selector_rule=selector_rule,
+                use_javascript=True,
+                max_trials_for_unstable_page=3,
+                click_waiting_timeout_in_seconds=max(self.waiting_timeout, 1)
+            )
+        if click_timed_out:
+            return None
+        if page_wait > 0:
+            sleep(page_wait)
+        self.last_timed_out = browser.wait_for_selectors(
+            wait_type='appear',
+            selector_types_rules=self.selectors_to_wait,
+            waiting_timeout_in_seconds=self.waiting_timeout,
+            print_error_log_to_console=True,
+            mode=self.wait_mode
+        )
+        return self.__read_rendered_page(browser)
+
+    @contextmanager
+    def __scheduled_navigation(self, host: str):
+        """浏览器导航前占用主机请求名额，结束后回报耗时；异常视为该主机请求失败"""
+        scheduler = self.__static_fetcher.scheduler
+        if scheduler is None or not host:
+            yield
+            return
+        scheduler.acquire(host)
+        started = perf_counter()
+        try:
+            yield
+        except Exception:
+            scheduler.record(host, perf_counter() - started, ok=False)
+            raise
+        scheduler.record(host, perf_counter() - started, ok=True)
+
+    def get_current_url(self) -> str | None:
+        return self.__browser.get_current_url() if self.__browser is not None else None
+
+    def __reset_page_state(self) -> None:
+        self.last_timed_out = False
+        self.last_fallback_reason = None
+        self.last_page_metrics = None
+        self.last_fragment_only = False
+
+    def __read_rendered_page(self, browser) -> str:
+        try:
+            page_metrics = browser.get_page_metrics() or {}
+        except Exception:
+            # 统计信息仅用于日志，获取失败不影响抓取
+            page_metrics = {}
+        if browser.last_wait_seconds is not None:
+            page_metrics['ready_ms'] = browser.last_wait_seconds * 1000
+        self.last_page_metrics = page_metrics or None
+
+        if self.fragment_selectors:
+            fragments = browser.extract_outer_html([('css', selector) for selector in self.fragment_selectors])
+            if fragments:
+                self.last_fragment_only = True
+                if self.last_page_metrics is not None and browser.last_page_length is not None:
+                    self.last_page_metrics['page_length'] = browser.last_page_length
+                return '<html><body>' + '\n'.join(fragments) + '</body></html>'
+        return browser.get_page_source()
+
+    def get_browser(self):
+        if self.__browser is None:
+            browser = self.__exit_stack.enter_context(self.__browser_pool.lease(self.launch_profile))
+            browser.block_urls(self.blocked_url_patterns)
+            self.__browser = browser
+        return self.__browser
+
+    def close(self) -> None:
+        self.__browser = None
+        self.__exit_stack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,157 @@
+"""
+列表页翻页。
+
+任务 crawler_config 的 config.pagination：
+
+    {
+        'next_button': 'a.p-next.p-elem',    # 点击"下一页"翻页（需要浏览器）；也可写成 ['xpath', '//a[text()="下一页"]']
+        'page_wait': 1,                       # 点击后先等待的秒数，之后再等待 selectors
+        'url_template': 'https://www.cas.cn/yw/index_{n}.shtml',  # 按页号拼接 URL，{n} 从 start 开始递增
+        'start': 1,
+        'max_pages': 5,                       # 最多访问的页数（包含 urls 中的页面）
+        'stop_on_known': True,                # 增量爬取时某页全部为已知文章即停止
+    }
+
+点击翻页用浏览器打开 urls[0] 后在同一页面上反复点击（不再访问 urls 中的其他页面）；
+URL 模板先访问 urls 中的页面，再按页号继续生成，已访问过的 URL 会跳过。
+兼容旧配置：pagination 为 True（无翻页方式）时只访问 urls，config.pages_needed 视为 max_pages。
+"""
+import time
+from itertools import count
+from typing import NamedTuple
+
+# 配置了翻页方式但没有 max_pages 时最多访问的页数
+DEFAULT_MAX_PAGES = 10
+
+
+class PaginationPolicy(NamedTuple):
+    next_button: tuple | None = None
+    page_wait: float = 1
+    url_template: str | None = None
+    start: int = 1
+    max_pages: int | None = None
+    stop_on_known: bool = True
+
+
+class ListPage(NamedTuple):
+    number: int
+    url: str
+    html: str | None
+    error: Exception | None = None
+    # 由翻页规则生成（而非 urls 中配置）的页面，空页面说明已经翻到底
+    is_extra: bool = False
+    fetch_seconds: float = 0
+
+
+def parse_pagination(crawler_settings: dict) -> PaginationPolicy:
+    pagination = crawler_settings.get('pagination')
+    if not isinstance(pagination, dict):
+        pagination = {}
+
+    next_button = pagination.get('next_button')
+    if isinstance(next_button, str):
+        next_button = ('css', next_button)
+    elif next_button:
+        next_button = tuple(next_button)
+        if len(next_button) != 2 or next_button[0] not in ('css', 'xpath'):
+            raise ValueError(f"Invalid next_button: {pagination['next_button']}")
+
+    url_template = pagination.get('url_template')
+    if url_template and '{n}' not in url_template:
+        raise ValueError(f"url_template must contain {{n}}: {url_template}")
+    if next_button and url_template:
+        raise ValueError('next_button and url_template cannot be used together.')
+
+    max_pages = pagination.get('max_pages') or crawler_settings.get('pages_needed')
+    if max_pages is None and (next_button or url_template):
+        max_pages = DEFAULT_MAX_PAGES
+
+    return PaginationPolicy(
+        next_button=next_button,
+        page_wait=pagination.get('page_wait', 1),
+        url_template=url_template,
+        start=pagination.get('start', 1),
+        max_pages=max_pages,
+        stop_on_known=pagination.get('stop_on_known', True),
+    )
+
+
+class ListPaginator:
+    """
+    按翻页策略逐页获取列表页，每获取一页立即交给调用方处理，不在内存中保留页面 HTML。
+    调用方可随时停止迭代（如增量爬取遇到已知文章）；迭代自行结束时 stop_reason 说明原因。
+    """
+
+    def __init__(self, fetcher, urls: list[str], policy: PaginationPolicy, max_pages: int = None):
+        self.__fetcher = fetcher
+        self.__urls = urls
+        self.__policy = policy
+        self.max_pages = max_pages or policy.max_pages
+        self.stop_reason = None
+
+    def __iter__(self):
+        if self.__policy.next_button:
+            return self.__click_through()
+        return self.__visit_urls()
+
+    def __reached_limit(self, page_count: int) -> bool:
+        if self.max_pages is not None and page_count >= self.max_pages:
+            self.stop_reason = f'已达到最大页数 {self.max_pages}'
+            return True
+        return False
+
+    def __candidate_urls(self):
+        yield from ((url, False) for url in self.__urls)
+        if self.__policy.url_template:
+            for n in count(self.__policy.start):
+                yield self.__policy.url_template.format(n=n), True
+
+    def __visit_urls(self):
+        visited = set()
+        page_count = 0
+        for url, is_extra in self.__candidate_urls():
+            if url in visited:
+                continue
+            if self.__reached_limit(page_count):
+                return
+            visited.add(url)
+            page_count += 1
+            started = time.perf_counter()
+            try:
+                html_content = self.__fetcher.fetch(url, is_extra=is_extra)
+            except Exception as e:
+                yield ListPage(page_count, url, None, e, is_extra, time.perf_counter() - started)
+                if is_extra:
+                    # 模板生成的页面请求失败，通常是已经超出最后一页
+                    self.stop_reason = f'第 {page_count} 页获取失败'
+                    return
+                continue
+            yield ListPage(page_count, url, html_content, None, is_extra, time.perf_counter() - started)
+
+    def __click_through(self):
+        first_url = self.__urls[0]
+        started = time.perf_counter()
+        try:
+            html_content = self.__fetcher.fetch_with_browser(first_url)
+        except Exception as e:
+            yield ListPage(1, first_url, None, e, False, time.perf_counter() - started)
+            self.stop_reason = '首页获取失败'
+            return
+        yield ListPage(1, first_url, html_content, None, False, time.perf_counter() - started)
+
+        page_count = 1
+        while not self.__reached_limit(page_count):
+            page_count += 1
+            started = time.perf_counter()
+            try:
+                html_content = self.__fetcher.fetch_next_page(self.__policy.next_button, self.__policy.page_wait)
+            except Exception as e:
+                page_url = self.__fetcher.get_current_url() or first_url
+                yield ListPage(page_count, page_url, None, e, True, time.perf_counter() - started)
+                self.stop_reason = f'第 {page_count} 页翻页失败'
+                return
+            if html_content is None:
+                self.stop_reason = '找不到下一页按钮'
+                return
+            page_url = self.__fetcher.get_current_url() or first_url
+            yield ListPage(page_count, page_url, html_content, None, True, time.perf_counter() - started)
@@ -0,0 +1,242 @@
+"""
+解析阶段：把 CPU 密集的 HTML 解析与等待网络/浏览器的抓取分开，两个爬虫命令共用。
+
+- processes=0（默认）时解析在一个单独的线程中运行，与抓取线程并行，但所有解析共用一个 CPU 核；
+- processes>0 时在进程池中运行，可以用满多个 CPU 核。子进程用 spawn 方式启动，不继承抓取线程和数据库连接，
+  也不需要 Django：解析后端名称、详情页配置、已学到的选择器和存档目录在启动时传入。
+  子进程中的选择器学习事件（命中/失效/新学到的选择器）随解析结果返回，由主进程记入 SelectorLearner。
+
+解析结果只包含可序列化的简单对象。存档文件由解析方写入（写入是原子的），数据库由调用方统一写入。
+StageMeter 统计各阶段的忙碌时间和队列深度，运行结束时输出利用率，用于判断瓶颈在哪个阶段。
+"""
+import multiprocessing
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Hashable, NamedTuple
+
+from crawlers.utils.attachments import find_attachment_links
+from crawlers.utils.detail_extractor import DetailParserRegistry, extract_detail
+from crawlers.utils.html_parser import get_parser_backend
+from crawlers.utils.list_extractor import extract_list_items
+from crawlers.utils.page_archive import PageArchive
+from crawlers.utils.selector_learning import GENERIC_RECHECK_EVERY
+
+
+class DetailParseResult(NamedTuple):
+    key: Hashable
+    fields: dict | None            # extract_detail 的结果加上 attachments（附件链接），未提取到标题或正文时为 None
+    archived: tuple | None         # PageArchive.put 的结果 (哈希, 原始字节数, 压缩后字节数)
+    error: str | None              # 解析抛出异常时为异常类名
+    messages: list[str]            # 需要输出的提示（未知网站、页面为空、存档失败等）
+    learner_events: list[tuple]    # 子进程中的选择器学习事件，见 SelectorLearner.apply_events
+    seconds: float
+
+
+class RecordingLearner:
+    """子进程中代替 SelectorLearner：按启动时的学习结果选择选择器，并记下学习事件交给主进程"""
+
+    def __init__(self, learned: dict):
+        self.__learned = dict(learned)
+        self.__events = []
+        self.__generic_uses = Counter()
+
+    def get(self, host: str, field: str) -> str | None:
+        return self.__learned.get((host, field))
+
+    def recheck_due(self, host: str, field: str) -> bool:
+        self.__generic_uses[host, field] += 1
+        return self.__generic_uses[host, field] % GENERIC_RECHECK_EVERY == 0
+
+    def record_hit(self, host: str, field: str) -> None:
+        self.__events.append(('hit', host, field, None))
+
+    def record_miss(self, host: str, field: str) -> None:
+        self.__events.append(('miss', host, field, None))
+
+    def learn(self, host: str, field: str, selector: str | None) -> None:
+        self.__events.append(('learn', host, field, selector))
+        if selector is not None:
+            self.__learned[host, field] = selector
+
+    def drain(self) -> list[tuple]:
+        events, self.__events = self.__events, []
+        return events
+
+
+class DetailParser:
+    """存档并解析单个详情页，在解析线程或子进程中运行"""
+
+    def __init__(self, backend, registry: DetailParserRegistry, learner=None, archive: PageArchive = None):
+        self.backend = backend
+        self.registry = registry
+        self.learner = learner
+        self.archive = archive
+
+    def parse(self, key: Hashable, url: str, html_content: str) -> DetailParseResult:
+        started = time.perf_counter()
+        messages = []
+        archived = None
+        if self.archive is not None:
+            # 先存档再解析，解析出错时存档照常保留，修复解析规则后可以用 reparse_articles 重新解析
+            try:
+                archived = self.archive.put(html_content)
+            except OSError as e:
+                messages.append(f"[存档] 页面存档失败 {url}: {e}")
+        fields = error = None
+        try:
+            fields = self.__extract(url, html_content, messages)
+        except Exception as e:
+            error = type(e).__name__
+            messages.append(f"解析失败 {url}: {e}")
+        events = self.learner.drain() if isinstance(self.learner, RecordingLearner) else []
+        return DetailParseResult(key, fields, archived, error, messages, events, time.perf_counter() - started)
+
+    def __extract(self, url, html_content, messages):
+        profile = self.registry.get(url)
+        if profile is None:
+            messages.append(f"未知网站，无法解析: {url}")
+            return None
+        doc = self.backend.parse(html_content)
+        if doc is None:
+            messages.append(f"页面为空: {url}")
+            return None
+        try:
+            fields = extract_detail(self.backend, doc, profile, self.learner, self.registry.host_key(url))
+        except Exception as e:
+            messages.append(f"解析{profile['name']}页面 {url} 失败: {e}")
+            return None
+        if fields is None:
+            messages.append(f"{profile['name']}文章解析失败，标题或内容为空: {url}")
+            return None
+        fields['attachments'] = find_attachment_links(self.backend, doc, url)
+        return fields
+
+
+# 子进程中的解析器，由 _init_detail_worker 创建
+_worker_parser = None
+
+
+def _init_detail_worker(parser_name, profiles, learned, archive_root, archive_codec):
+    global _worker_parser
+    archive = PageArchive(archive_root, codec=archive_codec) if archive_root else None
+    _worker_parser = DetailParser(
+        get_parser_backend(parser_name), DetailParserRegistry(profiles), RecordingLearner(learned), archive
+    )
+
+
+def _parse_detail_in_worker(key, url, html_content):
+    return _worker_parser.parse(key, url, html_content)
+
+
+class DetailParseStage:
+    """详情页解析阶段：submit 返回结果为 DetailParseResult 的 Future"""
+
+    def __init__(self, parser: DetailParser, processes: int = 0):
+        self.__parser = parser
+        self.workers = max(1, processes)
+        if processes > 0:
+            archive = parser.archive
+            self.__executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_detail_worker,
+                initargs=(
+                    parser.backend.name,
+                    parser.registry.profiles(),
+                    parser.learner.learned() if parser.learner is not None else {},
+                    str(archive.root) if archive is not None else None,
+                    archive.codec if archive is not None else None,
+                ),
+            )
+            self.__function = _parse_detail_in_worker
+        else:
+            self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='detail-parse')
+            self.__function = parser.parse
+
+    def submit(self, key: Hashable, url: str, html_content: str):
+        return self.__executor.submit(self.__function, key, url, html_content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+
+def _parse_list_in_worker(html_content, rule, base_url, parser_name):
+    started = time.perf_counter()
+    items = extract_list_items(html_content, rule, base_url=base_url, backend=get_parser_backend(parser_name))
+    return items, time.perf_counter() - started
+
+
+class ListParseStage:
+    """
+    列表页解析阶段，可由多个任务线程共享。
+    增量爬取要根据本页的解析结果决定是否翻页，因此同一任务内仍是获取一页、解析一页；
+    并行来自多个任务（--workers）同时把解析交给进程池，不再争用 GIL。
+    """
+
+    def __init__(self, backend, processes: int = 0):
+        self.__backend = backend
+        self.workers = max(1, processes)
+        self.__executor = ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context('spawn')
+        ) if processes > 0 else None
+
+    def parse(self, html_content: str, rule: dict, base_url: str) -> tuple[list[dict], float]:
+        """返回 (条目列表, 解析耗时秒数)"""
+        if self.__executor is None:
+            return _parse_list_in_worker(html_content, rule, base_url, self.__backend.name)
+        return self.__executor.submit(_parse_list_in_worker, html_content, rule, base_url, self.__backend.name).result()
+
+    def close(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class StageMeter:
+    """各阶段的忙碌时间、处理数和队列深度，线程安全"""
+
+    def __init__(self):
+        self.__busy = Counter()
+        self.__items = Counter()
+        self.__depth_sum = Counter()
+        self.__depth_samples = Counter()
+        self.__depth_max = Counter()
+        self.__lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, items: int = 1) -> None:
+        with self.__lock:
+            self.__busy[stage] += seconds
+            self.__items[stage] += items
+
+    def sample(self, queue: str, depth: int) -> None:
+        with self.__lock:
+            self.__depth_sum[queue] += depth
+            self.__depth_samples[queue] += 1
+            self.__depth_max[queue] = max(self.__depth_max[queue], depth)
+
+    def report_lines(self, elapsed: float, capacity: dict) -> list[str]:
+        """capacity: 阶段 → 并行数（线程或进程数），利用率 = 忙碌时间 / (并行数 × 总耗时)"""
+        with self.__lock:
+            lines = []
+            for stage, workers in capacity.items():
+                busy = self.__busy[stage]
+                utilization = busy / (workers * elapsed) if elapsed else 0.0
+                lines.append(
+                    f"{stage}: {self.__items[stage]} 次，忙碌 {busy:.1f} s，"
+                    f"利用率 {utilization:.0%} ({workers} 个并行)"
+                )
+            for queue, samples in self.__depth_samples.items():
+                lines.append(
+                    f"队列 {queue}: 平均 {self.__depth_sum[queue] / samples:.1f}，最大 {self.__depth_max[queue]}"
+                )
+            return lines
@@ -0,0 +1,56 @@
+"""
+离线重新解析：从页面存档读取 HTML，在进程池中重新运行列表页/详情页解析规则。
+
+HTML 解析是 CPU 密集型的，线程受 GIL 限制，因此放在子进程中运行。子进程不访问数据库：
+主进程查出要处理的存档记录，连同解析规则/详情页配置一起分批发给子进程，
+子进程按哈希从存档目录读取页面、解析后只返回结果，由主进程批量写回数据库。
+"""
+from crawlers.utils.attachments import find_attachment_links
+from crawlers.utils.detail_extractor import extract_detail
+from crawlers.utils.html_parser import get_parser_backend
+from crawlers.utils.list_extractor import extract_list_items
+from crawlers.utils.page_archive import PageArchive
+
+# 子进程中的存档和解析后端，由 init_worker 创建
+_archive = None
+_backend = None
+
+
+def init_worker(archive_root: str, codec: str, parser_name: str) -> None:
+    """进程池的 initializer，每个子进程运行一次"""
+    global _archive, _backend
+    _archive = PageArchive(archive_root, codec=codec)
+    _backend = get_parser_backend(parser_name)
+
+
+def reparse_details(jobs: list[tuple]) -> list[tuple]:
+    """
+    jobs: [(文章 ID, 内容哈希, 详情页配置, 页面 URL), ...]
+    返回 [(文章 ID, {'title', 'content', 'authors', 'thinktank_name', 'attachments'} 或 None, 错误信息或 None), ...]
+    """
+    results = []
+    for article_id, digest, profile, url in jobs:
+        try:
+            doc = _backend.parse(_archive.get(digest))
+            fields = extract_detail(_backend, doc, profile) if doc is not None else None
+            if fields is not None:
+                fields['attachments'] = find_attachment_links(_backend, doc, url)
+            results.append((article_id, fields, None))
+        except Exception as e:
+            results.append((article_id, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def reparse_lists(jobs: list[tuple]) -> list[tuple]:
+    """
+    jobs: [(存档记录 ID, 内容哈希, 列表页规则, 页面 URL), ...]
+    返回 [(存档记录 ID, 条目列表, 错误信息或 None), ...]，条目格式同 extract_list_items
+    """
+    results = []
+    for snapshot_id, digest, rule, base_url in jobs:
+        try:
+            items = extract_list_items(_archive.get(digest), rule, base_url=base_url, backend=_backend)
+            results.append((snapshot_id, items, None))
+        except Exception as e:
+            results.append((snapshot_id, [], f"{type(e).__name__}: {e}"))
+    return results
@@ -0,0 +1,126 @@
+"""
+详情页选择器学习：记录每个主机上标题/正文实际命中的选择器，之后优先只尝试这一个。
+
+- 学到的选择器命中（节点存在且提取到文本）记为 hit；
+- 不再命中时记为 miss，重新按配置顺序逐个尝试，并以新的命中者替换（重新学习）；
+- 配置中的选择器都不命中、由通用兜底规则提取到内容时，记住 GENERIC_SELECTOR，之后直接走兜底规则。
+  兜底规则几乎总能提取到内容、不会失效，因此每 GENERIC_RECHECK_EVERY 页重新按配置顺序尝试一次，
+  网站恢复原来的页面结构后能重新学到配置的选择器。
+
+学习结果保存在 LearnedSelector 表中，运行开始时 load() 一次读入，结束时 save() 写回本次变化。
+"""
+import threading
+from collections import Counter
+
+GENERIC_SELECTOR = '*generic*'
+GENERIC_RECHECK_EVERY = 20
+
+
+class SelectorLearner:
+    """线程安全，一次运行中由所有解析线程共享"""
+
+    def __init__(self, learned: dict = None):
+        # (host, field) -> selector
+        self.__learned = dict(learned or {})
+        self.__hits = Counter()
+        self.__misses = Counter()
+        # 没有可用的学习结果，按配置顺序逐个尝试的次数
+        self.__cascades = Counter()
+        # 学习结果为 GENERIC_SELECTOR 时各主机、字段的提取次数，用于定期重新尝试配置的选择器
+        self.__generic_uses = Counter()
+        self.__changed = set()
+        # 已经写回数据库的命中/失效次数，save() 只写增量
+        self.__saved_hits = Counter()
+        self.__saved_misses = Counter()
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> 'SelectorLearner':
+        from crawlers.models import LearnedSelector
+        return cls({
+            (host, field): selector
+            for host, field, selector in LearnedSelector.objects.values_list('host', 'field', 'selector')
+        })
+
+    def save(self) -> int:
+        """写回本次有变化的条目（选择器和累计命中数），返回写入条数"""
+        from django.db import transaction
+        from django.db.models import F
+        from crawlers.models import LearnedSelector
+
+        with self.__lock:
+            hits = self.__hits - self.__saved_hits
+            misses = self.__misses - self.__saved_misses
+            rows = [
+                (host, field, self.__learned.get((host, field)), hits[host, field], misses[host, field])
+                for host, field in set(self.__changed) | set(hits) | set(misses)
+            ]
+            self.__changed.clear()
+            self.__saved_hits = self.__hits.copy()
+            self.__saved_misses = self.__misses.copy()
+        with transaction.atomic():
+            for host, field, selector, hits, misses in rows:
+                if selector is None:
+                    continue
+                updated = LearnedSelector.objects.filter(host=host, field=field).update(
+                    selector=selector, hits=F('hits') + hits, misses=F('misses') + misses
+                )
+                if not updated:
+                    LearnedSelector.objects.create(host=host, field=field, selector=selector, hits=hits, misses=misses)
+        return len(rows)
+
+    def learned(self) -> dict:
+        """(host, field) → selector 的副本，传给解析子进程"""
+        with self.__lock:
+            return dict(self.__learned)
+
+    def apply_events(self, events: list[tuple]) -> None:
+        """重放解析子进程记录的学习事件 (类型, host, field, selector)，见 parse_pool.RecordingLearner"""
+        for kind, host, field, selector in events:
+            if kind == 'hit':
+                self.record_hit(host, field)
+            elif kind == 'miss':
+                self.record_miss(host, field)
+            else:
+                self.learn(host, field, selector)
+
+    def get(self, host: str, field: str) -> str | None:
+        with self.__lock:
+            return self.__learned.get((host, field))
+
+    def recheck_due(self, host: str, field: str) -> bool:
+        """学习结果为 GENERIC_SELECTOR 时每次提取前调用，每 GENERIC_RECHECK_EVERY 次返回 True 一次"""
+        with self.__lock:
+            self.__generic_uses[host, field] += 1
+            return self.__generic_uses[host, field] % GENERIC_RECHECK_EVERY == 0
+
+    def record_hit(self, host: str, field: str) -> None:
+        with self.__lock:
+            self.__hits[host, field] += 1
+
+    def record_miss(self, host: str, field: str) -> None:
+        with self.__lock:
+            self.__misses[host, field] += 1
+
+    def learn(self, host: str, field: str, selector: str | None) -> None:
+        """按配置顺序尝试后得到的命中者，都不命中时为 None"""
+        with self.__lock:
+            self.__cascades[host, field] += 1
+            if selector is not None and self.__learned.get((host, field)) != selector:
+                self.__learned[host, field] = selector
+                self.__changed.add((host, field))
+
+    def report_lines(self) -> list[str]:
+        """本次运行各主机、各字段的学习命中率"""
+        with self.__lock:
+            keys = sorted(set(self.__hits) | set(self.__misses) | set(self.__cascades))
+            lines = []
+            for host, field in keys:
+                hits = self.__hits[host, field]
+                # 每次提取要么学习结果命中，要么按配置顺序逐个尝试
+                total = hits + self.__cascades[host, field]
+                lines.append(
+                    f"{host} {field}: {self.__learned.get((host, field), '-')}，"
+                    f"命中 {hits}/{total} ({hits / total:.0%})，失效重学 {self.__misses[host, field]}"
+                )
+            return lines
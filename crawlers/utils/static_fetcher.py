@@ -0,0 +1,106 @@
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crawlers.utils.browser_renderer import is_valid_url
+from crawlers.utils.host_scheduler import HostScheduler, get_host
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    # requests 默认不带 brotli 解码，不能声明 br
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+class StaticPageFetcher:
+    """
+    基于 requests.Session 的静态页面抓取器，复用 keep-alive 连接，可在多个线程间共享。
+    传入 scheduler 时每个请求先按主机限速，结果回报给 scheduler 用于退避和熔断。
+    """
+
+    def __init__(
+            self,
+            headers: dict = None,
+            pool_size: int = 10,
+            timeout_in_seconds: float = 15,
+            scheduler: HostScheduler = None
+    ):
+        self.__timeout_in_seconds = timeout_in_seconds
+        self.scheduler = scheduler
+        self.__session = requests.Session()
+        self.__session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+
+    def fetch(self, url: str) -> str:
+        return self.fetch_response(url).text
+
+    def fetch_response(self, url: str, slot_acquired: bool = False) -> requests.Response:
+        """
+        请求页面并检查状态码，返回已修正编码的 Response（需要响应大小等信息时使用）。
+        调用方已通过 scheduler.try_acquire 占用请求名额时传入 slot_acquired=True。
+        """
+        if not is_valid_url(url):
+            raise ValueError('Given url is invalid, or it does not start with http or https.')
+        response = self.__get(url, slot_acquired)
+        # 服务器未声明编码时 requests 会退回 ISO-8859-1，中文站点需要按内容探测
+        if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+        return response
+
+    def open_stream(self, url: str, headers: dict = None, slot_acquired: bool = False) -> requests.Response:
+        """
+        流式请求（用于下载文件）：收到响应头即返回，响应体由调用方用 iter_content 分块读取，读完后 close()。
+        状态码检查和限速同 fetch_response，限速只统计到收到响应头为止。
+        """
+        if not is_valid_url(url):
+            raise ValueError('Given url is invalid, or it does not start with http or https.')
+        try:
+            return self.__get(url, slot_acquired, headers=headers, stream=True)
+        except requests.HTTPError as e:
+            # 错误响应不读响应体，直接归还连接
+            e.response.close()
+            raise
+
+    def __get(self, url: str, slot_acquired: bool, **kwargs) -> requests.Response:
+        if self.scheduler is None:
+            response = self.__session.get(url, timeout=self.__timeout_in_seconds, **kwargs)
+            response.raise_for_status()
+            return response
+        return self.__scheduled_get(url, slot_acquired, **kwargs)
+
+    def __scheduled_get(self, url: str, slot_acquired: bool, **kwargs) -> requests.Response:
+        host = get_host(url)
+        if not slot_acquired:
+            self.scheduler.acquire(host)
+        started = time.perf_counter()
+        try:
+            response = self.__session.get(url, timeout=self.__timeout_in_seconds, **kwargs)
+        except requests.RequestException:
+            self.scheduler.record(host, time.perf_counter() - started, ok=False)
+            raise
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.scheduler.record(
+                host, elapsed, ok=False,
+                status_code=response.status_code, retry_after=response.headers.get('Retry-After')
+            )
+            response.raise_for_status()
+        self.scheduler.record(host, elapsed, ok=True)
+        return response
+
+    def close(self) -> None:
+        self.__session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,270 @@
+"""
+爬取任务的定时调度与运行租约，供 run_scheduler 和 crawl_thinktanks 使用。
+
+TaskSchedule 按 CrawlTask.schedule_type / schedule_time 计算运行时间点（按 settings.TIME_ZONE 的本地时间）：
+- daily：每天 schedule_time；weekly：每周 weekly_day（0=周一）的 schedule_time；
+  monthly：每月 monthly_day 日（超过当月天数时取月末）的 schedule_time；manual 或为空：不定时运行
+- adaptive：上次运行后经过 adaptive_interval_hours 小时（尚未计算时取 initial_hours），schedule_time 不起作用
+- 最近一个已到的时间点晚于 last_run 即为到期。停机期间错过的多个时间点只补跑一次。
+
+AdaptiveInterval 在每次成功运行后按近期的新文章数重新计算 adaptive 间隔（记录在 CrawlRun 中）：
+本次没有新文章时间隔乘以 backoff_factor（指数退避）；有新文章时按近几次运行的平均发文速度，
+取预计攒够 target_new_per_run 篇新文章所需的时间。结果限制在 [min_hours, max_hours] 之间。
+
+TaskLeases 用条件 UPDATE 在数据库中获取任务租约（lease_owner / lease_expires_at）：
+只有租约为空或已过期时才能获取，多个调度进程或手动运行不会同时执行同一任务。
+持有期间后台线程定期续约；进程崩溃时租约到期后自动失效。
+
+默认参数来自 settings.CRAWLER_SCHEDULER，见 from_settings。
+"""
+import calendar
+import os
+import socket
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from crawlers.models import CrawlTask
+
+SCHEDULE_TYPES = ('daily', 'weekly', 'monthly', 'adaptive')
+
+
+def parse_schedule_time(value: str | None) -> time | None:
+    """'HH:MM' 或 'HH:MM:SS'，为空时取 00:00，格式错误时返回 None"""
+    if not value or not value.strip():
+        return time(0, 0)
+    try:
+        return time.fromisoformat(value.strip().zfill(5))
+    except ValueError:
+        return None
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class AdaptiveInterval:
+    def __init__(
+            self,
+            min_hours: float = 6,
+            max_hours: float = 24 * 14,
+            initial_hours: float = 24,
+            backoff_factor: float = 2.0,
+            target_new_per_run: float = 2,
+            window_runs: int = 10
+    ):
+        self.min_hours = min_hours
+        self.max_hours = max_hours
+        self.initial_hours = initial_hours
+        self.backoff_factor = backoff_factor
+        self.target_new_per_run = target_new_per_run
+        self.window_runs = window_runs
+
+    @classmethod
+    def from_settings(cls) -> 'AdaptiveInterval':
+        """读取 settings.CRAWLER_SCHEDULER 中的 adaptive"""
+        from django.conf import settings
+        return cls(**getattr(settings, 'CRAWLER_SCHEDULER', {}).get('adaptive', {}))
+
+    def __clamp(self, hours: float) -> float:
+        return min(self.max_hours, max(self.min_hours, hours))
+
+    def next_interval(self, current_hours: float | None, runs: list) -> float:
+        """
+        runs: 最近的成功运行（CrawlRun，不含全量爬取和没有解析到条目的运行），从新到旧，最多 window_runs 条。
+        第 i 次运行的新文章发布于第 i+1 次与第 i 次运行之间，因此发文速度 = 除最早一次外的新文章数 / 最早到最新一次的时长
+        """
+        current = self.__clamp(current_hours or self.initial_hours)
+        if not runs:
+            return current
+        if runs[0].new_articles == 0:
+            return self.__clamp(current * self.backoff_factor)
+        span_hours = (runs[0].started_at - runs[-1].started_at).total_seconds() / 3600
+        new_articles = sum(run.new_articles for run in runs[:-1])
+        if len(runs) < 2 or span_hours <= 0 or new_articles == 0:
+            # 历史不足以估计发文速度，先缩短间隔
+            return self.__clamp(current / self.backoff_factor)
+        return self.__clamp(self.target_new_per_run / (new_articles / span_hours))
+
+    def record(self, task: CrawlTask, run) -> None:
+        """
+        保存运行记录；成功的增量运行后重新计算任务的 adaptive 间隔。
+        列表页一条都没解析到的运行（页面改版、被拦截等）不代表网站没有更新，不参与计算
+        """
+        from crawlers.models import CrawlRun
+        if run.status == 'success' and not run.full and run.items:
+            runs = list(
+                CrawlRun.objects.filter(task=task, status='success', full=False, items__gt=0)
+                .order_by('-started_at')[:self.window_runs - 1]
+            )
+            run.interval_hours = self.next_interval(task.adaptive_interval_hours, [run, *runs])
+            task.adaptive_interval_hours = run.interval_hours
+            task.save(update_fields=['adaptive_interval_hours'])
+        run.save()
+
+
+class TaskSchedule:
+    def __init__(self, weekly_day: int = 0, monthly_day: int = 1, adaptive_initial_hours: float = 24):
+        self.weekly_day = weekly_day
+        self.monthly_day = monthly_day
+        self.adaptive_initial_hours = adaptive_initial_hours
+
+    @classmethod
+    def from_settings(cls) -> 'TaskSchedule':
+        from django.conf import settings
+        options = getattr(settings, 'CRAWLER_SCHEDULER', {})
+        return cls(
+            weekly_day=options.get('weekly_day', 0),
+            monthly_day=options.get('monthly_day', 1),
+            adaptive_initial_hours=options.get('adaptive', {}).get('initial_hours', 24),
+        )
+
+    @staticmethod
+    def is_scheduled(task: CrawlTask) -> bool:
+        if task.schedule_type == 'adaptive':
+            return True
+        return task.schedule_type in SCHEDULE_TYPES and parse_schedule_time(task.schedule_time) is not None
+
+    def interval(self, task: CrawlTask) -> timedelta:
+        """adaptive 任务当前的运行间隔"""
+        return timedelta(hours=task.adaptive_interval_hours or self.adaptive_initial_hours)
+
+    def __period_start(self, schedule_type: str, day: date) -> date:
+        if schedule_type == 'weekly':
+            return day - timedelta(days=day.weekday())
+        if schedule_type == 'monthly':
+            return day.replace(day=1)
+        return day
+
+    def __shift_period(self, schedule_type: str, period: date, count: int) -> date:
+        if schedule_type == 'weekly':
+            return period + timedelta(weeks=count)
+        if schedule_type == 'monthly':
+            return _add_months(period, count)
+        return period + timedelta(days=count)
+
+    def __slot_in_period(self, schedule_type: str, period: date, at: time, tzinfo) -> datetime:
+        if schedule_type == 'weekly':
+            day = period + timedelta(days=self.weekly_day)
+        elif schedule_type == 'monthly':
+            day = period.replace(day=min(self.monthly_day, calendar.monthrange(period.year, period.month)[1]))
+        else:
+            day = period
+        return datetime.combine(day, at, tzinfo=tzinfo)
+
+    def latest_slot(self, task: CrawlTask, now: datetime) -> datetime | None:
+        """不晚于 now 的最近一个运行时间点，不定时运行的任务返回 None"""
+        return self.__slot(task, now, latest=True)
+
+    def next_slot(self, task: CrawlTask, now: datetime) -> datetime | None:
+        """晚于 now 的下一个运行时间点，不定时运行的任务返回 None"""
+        return self.__slot(task, now, latest=False)
+
+    def __slot(self, task, now, latest):
+        if not self.is_scheduled(task):
+            return None
+        if task.schedule_type == 'adaptive':
+            # 从未运行过的任务立即到期
+            slot = task.last_run + self.interval(task) if task.last_run else now
+            if latest:
+                return slot if slot <= now else None
+            return slot if slot > now else now
+        at = parse_schedule_time(task.schedule_time)
+        local_now = timezone.localtime(now)
+        period = self.__period_start(task.schedule_type, local_now.date())
+        slot = self.__slot_in_period(task.schedule_type, period, at, local_now.tzinfo)
+        if latest and slot > local_now:
+            slot = self.__slot_in_period(
+                task.schedule_type, self.__shift_period(task.schedule_type, period, -1), at, local_now.tzinfo
+            )
+        elif not latest and slot <= local_now:
+            slot = self.__slot_in_period(
+                task.schedule_type, self.__shift_period(task.schedule_type, period, 1), at, local_now.tzinfo
+            )
+        return slot
+
+    def due_slot(self, task: CrawlTask, now: datetime) -> datetime | None:
+        """任务到期时返回错过的时间点（最近一个），未到期返回 None"""
+        slot = self.latest_slot(task, now)
+        if slot is None or (task.last_run is not None and task.last_run >= slot):
+            return None
+        return slot
+
+
+class TaskLeases:
+    """当前进程持有的任务租约，可在多个线程间共享；start 后在后台线程中续约，也可用作上下文管理器"""
+
+    def __init__(self, ttl_seconds: float = 1800, owner: str | None = None):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[-100:]
+        self.__held = set()
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__heartbeat = None
+
+    @classmethod
+    def from_settings(cls) -> 'TaskLeases':
+        from django.conf import settings
+        return cls(ttl_seconds=getattr(settings, 'CRAWLER_SCHEDULER', {}).get('lease_seconds', 1800))
+
+    def acquire(self, task_id: int) -> bool:
+        """租约为空、已过期或已由本进程持有时获取成功"""
+        now = timezone.now()
+        acquired = CrawlTask.objects.filter(id=task_id).filter(
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now) | Q(lease_owner=self.owner)
+        ).update(lease_owner=self.owner, lease_expires_at=now + self.ttl) == 1
+        if acquired:
+            with self.__lock:
+                self.__held.add(task_id)
+        return acquired
+
+    def release(self, task_id: int) -> None:
+        with self.__lock:
+            self.__held.discard(task_id)
+        CrawlTask.objects.filter(id=task_id, lease_owner=self.owner).update(lease_owner=None, lease_expires_at=None)
+
+    def renew(self) -> None:
+        with self.__lock:
+            held = list(self.__held)
+        if held:
+            CrawlTask.objects.filter(id__in=held, lease_owner=self.owner).update(
+                lease_expires_at=timezone.now() + self.ttl
+            )
+
+    def __run_heartbeat(self):
+        try:
+            while not self.__stop.wait(self.ttl.total_seconds() / 3):
+                try:
+                    self.renew()
+                except DatabaseError:
+                    # 数据库暂时不可写（如 SQLite 锁库）时下一轮再续约，租约时长留有余量
+                    pass
+        finally:
+            connections.close_all()
+
+    def start(self) -> 'TaskLeases':
+        """启动续约线程"""
+        self.__heartbeat = threading.Thread(target=self.__run_heartbeat, name='task-lease', daemon=True)
+        self.__heartbeat.start()
+        return self
+
+    def close(self) -> None:
+        """停止续约并释放仍持有的租约"""
+        self.__stop.set()
+        if self.__heartbeat is not None:
+            self.__heartbeat.join()
+        with self.__lock:
+            held = list(self.__held)
+        for task_id in held:
+            self.release(task_id)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,161 @@
+"""
+基于文本密度的正文提取，一次遍历 DOM 完成打分，耗时与页面大小成线性关系。
+
+遍历时自底向上累计每个节点的文本长度和链接文本长度：
+- 文本归属于最近的块级祖先，块级节点直接包含的文本（含行内子节点）视为一个段落；
+- 段落得分 = 非链接字数 + 标点数 × PUNCTUATION_WEIGHT，短于 MIN_PARAGRAPH_CHARS 的段落不计分；
+- 段落得分全部计入父节点、一半计入祖父节点（段落本身是 div 等容器时也计入自身）；
+- 容器节点的最终得分再乘以标签权重、class/id 权重和 (1 - 子树链接密度)。
+
+取得分最高的容器，按块级边界分段输出其文本（段落之间用换行分隔）。
+只通过解析后端的 walk/tag/attr 接口访问 DOM，lxml 和 soup 后端都可用。
+"""
+import re
+
+# 文本归属和分段的边界
+BLOCK_TAGS = frozenset({
+    'html', 'body', 'div', 'p', 'section', 'article', 'main', 'header', 'footer', 'nav', 'aside',
+    'table', 'tbody', 'thead', 'tr', 'td', 'th', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'blockquote', 'pre', 'figure', 'figcaption', 'form', 'center',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+})
+# 可能作为正文容器的节点
+CANDIDATE_TAGS = frozenset({'body', 'div', 'section', 'article', 'main', 'td', 'blockquote'})
+# 不含正文的节点，其中的文本忽略
+SKIP_TAGS = frozenset({
+    'head', 'script', 'style', 'noscript', 'template', 'iframe', 'svg', 'select', 'option', 'button', 'textarea',
+})
+
+TAG_WEIGHTS = {'article': 1.5, 'main': 1.3, 'section': 1.1, 'td': 0.9, 'body': 0.6}
+POSITIVE_HINT = re.compile(r'article|content|text|detail|main|body|editor|news|post|entry|zw', re.I)
+NEGATIVE_HINT = re.compile(
+    r'comment|footer|foot|nav|menu|sidebar|side|header|share|relate|copyright|crumb|banner|login|recommend|rank',
+    re.I,
+)
+POSITIVE_WEIGHT = 1.5
+NEGATIVE_WEIGHT = 0.2
+
+MIN_PARAGRAPH_CHARS = 10
+PUNCTUATION_WEIGHT = 3
+_PUNCTUATION = re.compile(r'[，。；：！？、,.;:!?]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class _NodeStats:
+    __slots__ = ('node', 'tag', 'block', 'chars', 'link_chars', 'direct_chars', 'direct_link_chars',
+                 'direct_punctuation', 'score')
+
+    def __init__(self, node, tag: str, block):
+        self.node = node
+        self.tag = tag
+        # 最近的块级祖先（块级节点为自身），直接文本计入该节点
+        self.block = block if block is not None else self
+        self.chars = 0
+        self.link_chars = 0
+        self.direct_chars = 0
+        self.direct_link_chars = 0
+        self.direct_punctuation = 0
+        self.score = 0.0
+
+
+def _hint_weight(backend, node) -> float:
+    hint = f"{backend.attr(node, 'class')} {backend.attr(node, 'id')}"
+    if NEGATIVE_HINT.search(hint):
+        return NEGATIVE_WEIGHT
+    if POSITIVE_HINT.search(hint):
+        return POSITIVE_WEIGHT
+    return 1.0
+
+
+def find_content_node(backend, root):
+    """返回文本密度得分最高的容器节点，页面没有可用文本时返回 None"""
+    stack = []
+    skip_depth = 0
+    link_depth = 0
+    best_node = None
+    best_score = 0.0
+
+    for event, value in backend.walk(root):
+        if event == 'text':
+            if skip_depth or not stack:
+                continue
+            chars = len(_WHITESPACE.sub('', value))
+            if not chars:
+                continue
+            current = stack[-1]
+            current.chars += chars
+            block = current.block
+            block.direct_chars += chars
+            block.direct_punctuation += len(_PUNCTUATION.findall(value))
+            if link_depth:
+                current.link_chars += chars
+                block.direct_link_chars += chars
+            continue
+
+        tag = backend.tag(value)
+        if event == 'start':
+            if skip_depth or tag in SKIP_TAGS:
+                skip_depth += 1
+                continue
+            if tag == 'a':
+                link_depth += 1
+            parent_block = stack[-1].block if stack else None
+            stack.append(_NodeStats(value, tag, None if tag in BLOCK_TAGS or parent_block is None else parent_block))
+            continue
+
+        # end
+        if skip_depth:
+            skip_depth -= 1
+            continue
+        if tag == 'a':
+            link_depth -= 1
+        stats = stack.pop()
+        parent = stack[-1] if stack else None
+        if parent is not None:
+            parent.chars += stats.chars
+            parent.link_chars += stats.link_chars
+
+        if stats.block is stats and stats.direct_chars >= MIN_PARAGRAPH_CHARS:
+            paragraph_score = (stats.direct_chars - stats.direct_link_chars) \
+                + stats.direct_punctuation * PUNCTUATION_WEIGHT
+            if stats.tag in CANDIDATE_TAGS:
+                stats.score += paragraph_score
+            if parent is not None:
+                parent.score += paragraph_score
+                if len(stack) > 1:
+                    stack[-2].score += paragraph_score / 2
+
+        if stats.tag in CANDIDATE_TAGS and stats.score > 0:
+            link_density = stats.link_chars / stats.chars if stats.chars else 1.0
+            score = stats.score * TAG_WEIGHTS.get(stats.tag, 1.0) * _hint_weight(backend, stats.node) \
+                * (1 - link_density)
+            # 后序遍历中子节点先结束，得分相同时保留更内层的节点
+            if score > best_score:
+                best_node, best_score = stats.node, score
+
+    return best_node
+
+
+def node_paragraphs(backend, node) -> str:
+    """按块级边界和 <br> 分段取节点文本，每段合并空白字符，段落之间用换行分隔"""
+    pieces = []
+    skip_depth = 0
+    for event, value in backend.walk(node):
+        if event == 'text':
+            if not skip_depth:
+                pieces.append(value)
+            continue
+        tag = backend.tag(value)
+        if skip_depth or tag in SKIP_TAGS:
+            skip_depth += 1 if event == 'start' else -1
+            continue
+        if tag in BLOCK_TAGS or tag == 'br':
+            pieces.append('\n')
+    lines = (_WHITESPACE.sub(' ', line).strip() for line in ''.join(pieces).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def extract_main_text(backend, root) -> str:
+    """文本密度最高的内容块的分段文本，找不到时返回空字符串"""
+    node = find_content_node(backend, root)
+    return node_paragraphs(backend, node) if node is not None else ''
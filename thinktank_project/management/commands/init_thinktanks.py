@@ -59,8 +59,7 @@ URL_DATA = {
                 'urls': ['https://www.drc.gov.cn/Leaf.aspx?leafid=1346'],
                 'crawler_type': 'handler3',
                 'special_config': {
-                    'pagination': True,
-                    'pages_needed': 2
+                    'pagination': {'max_pages': 2}
                 }
             }
         ],
@@ -141,6 +140,12 @@ URL_DATA = {
     }
 }
 
+# 列表页只需要 DOM 文本：DOMContentLoaded 后即可开始等待元素，并屏蔽图片、字体、音视频和统计脚本
+LIST_PAGE_RENDER = {
+    'page_load_strategy': 'eager',
+    'block': ['image', 'media', 'font', 'analytics'],
+}
+
 # 爬虫配置模板
 CRAWLER_CONFIGS = {
     'handler1': {
@@ -151,6 +156,7 @@ CRAWLER_CONFIGS = {
             ('css', 'div.newscontent')
         ],
         'waiting_timeout': 30,
+        'render': LIST_PAGE_RENDER,
         'content_selector': 'div.newscontent'
     },
     'handler2': {
@@ -161,6 +167,7 @@ CRAWLER_CONFIGS = {
             ('css', 'div.briefItem')
         ],
         'waiting_timeout': 30,
+        'render': LIST_PAGE_RENDER,
         'content_selector': 'div.briefItem'
     },
     'handler3': {
@@ -172,6 +179,7 @@ CRAWLER_CONFIGS = {
             ('css', 'div.re_box')
         ],
         'waiting_timeout': 30,
+        'render': LIST_PAGE_RENDER,
         'content_selector': 'div.re_box',
         'pagination': {
             'next_button': 'a.p-next.p-elem',
@@ -186,6 +194,7 @@ CRAWLER_CONFIGS = {
             ('css', 'div#content')
         ],
         'waiting_timeout': 30,
+        'render': LIST_PAGE_RENDER,
         'content_selector': 'ul.gl_list2 li'
     },
     'handler5': {
@@ -195,6 +204,7 @@ CRAWLER_CONFIGS = {
             ('css', 'ul.u-list')
         ],
         'waiting_timeout': 30,
+        'render': LIST_PAGE_RENDER,
         'content_selector': 'ul.u-list li'
     },
     'handler6': {
@@ -203,6 +213,7 @@ CRAWLER_CONFIGS = {
             ('css', 'div.new_list.new0')
         ],
         'waiting_timeout': 30,
+        'render': LIST_PAGE_RENDER,
         'content_selector': 'div.new_list.new0 ul li'
     },
     'handler7': {
@@ -212,6 +223,7 @@ CRAWLER_CONFIGS = {
             ('css', 'ul.cols_list.clearfix')
         ],
         'waiting_timeout': 30,
+        'render': LIST_PAGE_RENDER,
         'content_selector': 'ul.cols_list.clearfix li'
     }
 }
@@ -301,8 +313,11 @@ class Command(BaseCommand):
             # 创建任务
             for task_info in info['tasks']:
                 crawler_config = CRAWLER_CONFIGS.get(task_info['crawler_type'], {}).copy()
-                if 'special_config' in task_info:
-                    crawler_config.update(task_info['special_config'])
+                for key, value in task_info.get('special_config', {}).items():
+                    # 字典类型的配置（如 pagination）与模板合并，而不是整体替换
+                    if isinstance(value, dict) and isinstance(crawler_config.get(key), dict):
+                        value = {**crawler_config[key], **value}
+                    crawler_config[key] = value
 
                 full_config = {
                     'urls': [url.strip() for url in task_info['urls']],
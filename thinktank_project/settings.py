@@ -83,6 +83,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'thinktank.db',  # 指向你的旧数据库
+        'OPTIONS': {
+            # 并行爬取时多个线程同时写库，等待锁释放而不是立即报 "database is locked"
+            'timeout': 30,
+        },
     }
 }
 
@@ -123,6 +127,74 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# 爬虫 HTML 解析后端: 'lxml'（默认，lxml + cssselect）或 'soup'（BeautifulSoup + html.parser）
+CRAWLER_HTML_PARSER = 'lxml'
+
+# auto 抓取策略判定为 browser 后，经过这么多小时重新尝试静态请求（判定可能来自临时的拦截或维护页面）
+CRAWLER_FETCH_STRATEGY_RECHECK_HOURS = 24 * 7
+
+# 详情页解析配置（crawlers/utils/detail_extractor.py），按主机名添加或覆盖内置配置
+CRAWLER_DETAIL_PROFILES = {
+    # 'www.example.org.cn': {'name': '示例智库', 'title': ['h1'], 'content': ['.article-content']},
+}
+
+# 爬虫按主机限速与退避（crawlers/utils/host_scheduler.py），两个爬虫命令共用
+CRAWLER_HOST_SCHEDULER = {
+    'rate_per_second': 2.0,          # 每个主机每秒请求数，可用 --host-rate 覆盖
+    'burst': 4,
+    'host_rates': {
+        # 'www.drc.gov.cn': 0.5,
+    },
+    'min_rate_per_second': 0.1,
+    'slow_response_seconds': 10,     # 响应慢于该值时降低速率
+    'max_consecutive_failures': 5,   # 连续失败次数达到该值时本次运行不再请求该主机
+}
+
+# 详情页抓取失败后的指数退避（crawlers/utils/detail_retry.py）
+CRAWLER_DETAIL_RETRY = {
+    'base_delay_minutes': 60,        # 第一次失败后 1 小时重试，之后每次翻倍
+    'max_delay_hours': 168,
+    'max_attempts': 6,               # 失败次数达到该值后不再抓取（404/410 直接不再抓取）
+}
+
+# 抓取到的原始 HTML 存档（crawlers/utils/page_archive.py），按内容哈希去重并压缩保存
+CRAWLER_PAGE_ARCHIVE = {
+    'enabled': True,                 # 也可以用命令的 --no-archive 临时关闭
+    'root': BASE_DIR / 'page_archive',
+    'codec': 'zstd',                 # 未安装 zstandard 时自动改用 gzip
+    'retention_days': 180,           # prune_page_archive 默认清理该天数之前的记录（每个 URL 保留最新一份）
+}
+
+# 文章附件下载（crawlers/utils/attachments.py），文件按内容哈希存放，相同文件只保存一份
+CRAWLER_ATTACHMENTS = {
+    'root': BASE_DIR / 'attachments',
+    'max_size_mb': 100,              # 超过该大小的附件不下载，可用 --max-size-mb 覆盖
+    'chunk_size': 64 * 1024,         # 流式写入的块大小（字节）
+}
+
+# 定时爬取（run_scheduler，crawlers/utils/task_schedule.py），schedule_time 按 TIME_ZONE 的本地时间计算
+CRAWLER_SCHEDULER = {
+    'poll_seconds': 60,              # 检查到期任务的间隔，可用 --poll-interval 覆盖
+    'weekly_day': 0,                 # weekly 任务在周几运行（0=周一）
+    'monthly_day': 1,                # monthly 任务在每月几号运行，超过当月天数时取月末
+    'lease_seconds': 1800,           # 任务租约时长，执行期间每 1/3 时长续约一次，进程崩溃后最多这么久可被重新执行
+    # schedule_type 为 adaptive 的任务按近期新文章数调整运行间隔（小时）
+    'adaptive': {
+        'min_hours': 6,
+        'max_hours': 24 * 14,
+        'initial_hours': 24,         # 还没有运行记录时的间隔
+        'backoff_factor': 2.0,       # 没有新文章时间隔乘以该值，有新文章但历史不足时除以该值
+        'target_new_per_run': 2,     # 按发文速度估算，每次运行大约能抓到这么多篇新文章
+        'window_runs': 10,           # 估算发文速度使用的最近运行次数
+    },
+}
+
+# 附件文本提取（extract_attachment_text），各格式的解析库为可选依赖，见 crawlers/utils/attachment_text.py
+CRAWLER_ATTACHMENT_TEXT = {
+    'max_chars': 1_000_000,          # 每个附件最多保存的字数，超过后不再提取后面的页，可用 --max-chars 覆盖
+    'max_tasks_per_child': 200,      # 子进程处理这么多个文件后重启，释放解析库累积的内存
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -3,7 +3,7 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse, HttpResponseNotAllowed
 from django.contrib import messages
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Count, Q
+from django.db.models import Count, Exists, OuterRef, Q
 from django.utils import timezone
 from django.conf import settings
 from django.views.decorators.http import require_http_methods
@@ -15,7 +15,7 @@ import threading
 import os
 import json
 
-from articles.models import Article, Digest
+from articles.models import Article, Attachment, Digest
 from thinktanks.models import ThinkTank
 from crawlers.models import CrawlTask
 from users.models import User # 如果需要用户信息
@@ -466,9 +466,14 @@ def search_view(request):
     
     articles = []
     if query:
-        # 在标题中搜索
-        articles = Article.objects.filter(title__icontains=query).select_related('thinktank').order_by('-crawl_date')[:50]
+        # 在标题和附件文本（extract_attachment_text 提取）中搜索
+        in_attachments = Attachment.objects.filter(
+            article=OuterRef('pk'), text_status='done', extracted_text__icontains=query
+        )
+        articles = Article.objects.filter(
+            Q(title__icontains=query) | Exists(in_attachments)
+        ).select_related('thinktank').order_by('-crawl_date')[:50]
         if not articles:
-             messages.info(request, f'未找到标题包含 "{query}" 的文章。')
+             messages.info(request, f'未找到标题或附件中包含 "{query}" 的文章。')
 
     return render(request, 'search.html', {'articles': articles, 'query': query})